@@ -0,0 +1,247 @@
+"""
+Microbenchmarks of the geometry hot paths.
+
+Each benchmark is timed on the scalar classes (Quaternion, Pose, ...) and on the
+batched ones (QuaternionArray, PoseArray, ...) for every batch size. The results
+are written as JSON and can be compared against a stored baseline:
+
+    python -m benchmarks.bench_geometry --output results.json
+    python -m benchmarks.bench_geometry --baseline baseline.json --save-baseline
+    python -m benchmarks.bench_geometry --baseline baseline.json
+
+The comparison exits with a non zero status when a benchmark is slower than
+the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from quaternion_sim.geometry import kernels
+from quaternion_sim.geometry.quaternion import Quaternion, slerp, log_interpolation
+from quaternion_sim.geometry.quaternion_array import QuaternionArray, slerp_array, log_interpolation_array
+from quaternion_sim.geometry.pose import Pose
+from quaternion_sim.geometry.pose_array import PoseArray
+from quaternion_sim.geometry.rotation_matrix import RMatrix
+
+SCALAR = "scalar"
+DEFAULT_SIZES = [1, 100, 10000, 1000000]
+DEFAULT_TOLERANCE = 0.2
+
+
+def _random_quats(size: int, seed: int) -> np.ndarray:
+    quats = np.random.RandomState(seed).normal(size=(size, 4))
+    return quats / np.linalg.norm(quats, axis=1).reshape(-1, 1)
+
+
+def _random_positions(size: int, seed: int) -> np.ndarray:
+    return np.random.RandomState(seed).normal(size=(size, 3))
+
+
+def _random_quat(seed: int) -> Quaternion:
+    return Quaternion(_random_quats(1, seed)[0])
+
+
+def _random_pose(seed: int) -> Pose:
+    return Pose(_random_quat(seed), _random_positions(1, seed)[0])
+
+
+def _random_poses(size: int, seed: int) -> PoseArray:
+    return PoseArray(_random_quats(size, seed), _random_positions(size, seed))
+
+
+def mul_scalar() -> Callable:
+    quat_1, quat_2 = _random_quat(0), _random_quat(1)
+    return lambda: quat_1 * quat_2
+
+
+def mul_batch(size: int) -> Callable:
+    quats_1, quats_2 = QuaternionArray(_random_quats(size, 0)), QuaternionArray(_random_quats(size, 1))
+    return lambda: quats_1 * quats_2
+
+
+def to_rot_matrix_scalar() -> Callable:
+    quat = _random_quat(0)
+
+    def run():
+        # the rotation matrix is memoized, forget it to time the computation
+        quat._rot_key = None
+        quat.to_rot_matrix()
+    return run
+
+
+def to_rot_matrix_batch(size: int) -> Callable:
+    return QuaternionArray(_random_quats(size, 0)).to_rot_matrix
+
+
+def to_euler_angles_scalar() -> Callable:
+    return _random_quat(0).to_euler_angles
+
+
+def to_euler_angles_batch(size: int) -> Callable:
+    return QuaternionArray(_random_quats(size, 0)).to_euler_angles
+
+
+def slerp_scalar() -> Callable:
+    quat_1, quat_2 = _random_quat(0), _random_quat(1)
+    return lambda: slerp(quat_1, quat_2, 0.3, True)
+
+
+def slerp_batch(size: int) -> Callable:
+    quats_1, quats_2 = QuaternionArray(_random_quats(size, 0)), QuaternionArray(_random_quats(size, 1))
+    coeffs = np.linspace(0, 1, size)
+    return lambda: slerp_array(quats_1, quats_2, coeffs, True)
+
+
+def log_interpolation_scalar() -> Callable:
+    quat_1, quat_2 = _random_quat(0), _random_quat(1)
+    return lambda: log_interpolation(quat_1, quat_2, 0.3)
+
+
+def log_interpolation_batch(size: int) -> Callable:
+    quats_1, quats_2 = QuaternionArray(_random_quats(size, 0)), QuaternionArray(_random_quats(size, 1))
+    coeffs = np.linspace(0, 1, size)
+    return lambda: log_interpolation_array(quats_1, quats_2, coeffs)
+
+
+def compose_scalar() -> Callable:
+    pose_1, pose_2 = _random_pose(0), _random_pose(1)
+    return lambda: pose_1.compose(pose_2)
+
+
+def compose_batch(size: int) -> Callable:
+    poses_1, poses_2 = _random_poses(size, 0), _random_poses(size, 1)
+    return lambda: poses_1.compose(poses_2)
+
+
+def rot_matrix_scalar() -> Callable:
+    axis = _random_positions(1, 0)[0]
+    return lambda: RMatrix(axis, 0.3)
+
+
+def rot_matrix_batch(size: int) -> Callable:
+    axes, thetas = _random_positions(size, 0), np.linspace(-3, 3, size)
+    return lambda: RMatrix(axes, thetas)
+
+
+# name: (scalar setup, batch setup), each setup returns the function to time
+BENCHMARKS = {
+    "quaternion.mul": (mul_scalar, mul_batch),
+    "quaternion.to_rot_matrix": (to_rot_matrix_scalar, to_rot_matrix_batch),
+    "quaternion.to_euler_angles": (to_euler_angles_scalar, to_euler_angles_batch),
+    "quaternion.slerp": (slerp_scalar, slerp_batch),
+    "quaternion.log_interpolation": (log_interpolation_scalar, log_interpolation_batch),
+    "pose.compose": (compose_scalar, compose_batch),
+    "rotation_matrix.RMatrix": (rot_matrix_scalar, rot_matrix_batch),
+}
+
+
+def time_function(func: Callable, repeat: int) -> float:
+    """
+    Returns the best time of one call of func (seconds) over repeat measures
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_benchmarks(sizes: List[int] = None, repeat: int = 5, name_filter: str = "") -> Dict:
+    """
+    Runs the benchmarks whose name contains name_filter
+    :param sizes: batch sizes, the scalar classes are always timed
+    :param repeat: number of measures of each benchmark, the best one is kept
+    :param name_filter: only the benchmarks whose name contains it are run
+    :return: dict {"metadata": {...}, "results": {key: {"benchmark", "size", "seconds", "seconds_per_element"}}}
+    """
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    results = {}
+    for name, (scalar_setup, batch_setup) in BENCHMARKS.items():
+        if name_filter not in name:
+            continue
+
+        cases = [(SCALAR, scalar_setup)] + [(size, lambda size=size: batch_setup(size)) for size in sizes]
+        for size, setup in cases:
+            seconds = time_function(setup(), repeat)
+            results["{0}[{1}]".format(name, size)] = {
+                "benchmark": name,
+                "size": size,
+                "seconds": seconds,
+                "seconds_per_element": seconds / (1 if size == SCALAR else size),
+            }
+
+    return {"metadata": {"python": platform.python_version(),
+                         "numpy": np.__version__,
+                         "backend": kernels.get_backend(),
+                         "machine": platform.machine(),
+                         "platform": platform.platform()},
+            "results": results}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> Dict:
+    """
+    Compares the results to the baseline, a benchmark regresses when its ratio
+    seconds / baseline seconds is larger than 1 + tolerance
+    :return: dict {key: {"ratio", "regression"}} of the benchmarks present in both
+    """
+    comparison = {}
+    for key, result in results["results"].items():
+        if key not in baseline["results"]:
+            continue
+        ratio = result["seconds"] / baseline["results"][key]["seconds"]
+        comparison[key] = {"ratio": ratio, "regression": ratio > 1.0 + tolerance}
+    return comparison
+
+
+def format_table(results: Dict, comparison: Dict = None) -> str:
+    lines = ["{0:<45} {1:>14} {2:>14} {3:>10}".format("benchmark", "seconds", "s/element", "vs base")]
+    for key, result in results["results"].items():
+        ratio = ""
+        if comparison is not None and key in comparison:
+            ratio = "{0:.2f}x{1}".format(comparison[key]["ratio"], " !" if comparison[key]["regression"] else "")
+        lines.append("{0:<45} {1:>14.3e} {2:>14.3e} {3:>10}".format(
+            key, result["seconds"], result["seconds_per_element"], ratio))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the geometry package")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="batch sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="measures per benchmark (best is kept)")
+    parser.add_argument("--filter", default="", help="only run the benchmarks whose name contains it")
+    parser.add_argument("--output", help="JSON file receiving the results")
+    parser.add_argument("--baseline", help="JSON file of the baseline results")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown above which a benchmark regresses")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.filter)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as output:
+            json.dump(results, output, indent=2)
+        print(format_table(results))
+        return 0
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            comparison = compare(results, json.load(baseline), args.tolerance)
+
+    print(format_table(results, comparison))
+    if comparison is not None and any(value["regression"] for value in comparison.values()):
+        print("Regressions (more than {0:.0%} slower than the baseline) are marked with !".format(args.tolerance))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ from OpenGL.GLU import gluNewQuadric, gluQuadricDrawStyle, gluQuadricTexture, \
 
 from .frames import Frame
 from .geometry.quaternion import quaternion_x, quaternion_y, Quaternion
+from .geometry.pose import Pose
 
 
 class Axis(object):
@@ -21,18 +22,24 @@ class Axis(object):
                      quaternion_y(90, False),
                      Quaternion()]
 
-    def draw(self, from_fixed_frame: bool = True):
+    def draw(self, from_fixed_frame: bool = True, pose: Pose = None):
+        """
+        Draws the axes at pose (the pose of the frame if None)
+        """
+        if pose is None:
+            pose = self.frame.pose
+
         if from_fixed_frame:
             # Reset init view
             glLoadIdentity()
 
         # Translate to the right position
-        glTranslatef(self.frame.pose.position[0],
-                     self.frame.pose.position[1],
-                     self.frame.pose.position[2])
+        glTranslatef(pose.position[0],
+                     pose.position[1],
+                     pose.position[2])
 
         # Rotate to the right orientation
-        self.glRotateQ(self.frame.pose.orientation)
+        self.glRotateQ(pose.orientation)
 
         for i in range(0, 3):
             self.draw_arrow(self.colors[i])
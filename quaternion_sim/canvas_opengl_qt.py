@@ -56,15 +56,16 @@ class glWidget(QGLWidget):
                 axis.draw()
 
         else:
-            frame_poses = self.frame_mgr.get_all_frame_poses()
+            # the snapshot stays consistent while other threads modify the frames
+            frame_poses = self.frame_mgr.snapshot().get_all_frame_poses()
 
+            # the world poses of the frames of the solids and axes come from the snapshot,
+            # their live poses are not read
             for solid in self.solids:
-                self.move_to_pose(frame_poses[solid.ref_frame])
-                solid.draw(False)
+                solid.draw(pose=frame_poses[solid.frame.name])
 
             for axis in self.axes:
-                self.move_to_pose(frame_poses[axis.frame.name])
-                axis.draw(False)
+                axis.draw(pose=frame_poses[axis.frame.name])
 
         # REMOVED FOR LINUX
         # glutSwapBuffers()
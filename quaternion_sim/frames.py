@@ -1,19 +1,207 @@
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
 from .geometry.pose import Pose
 from .geometry.pose import Quaternion
-from numpy import array
-from typing import List, Dict
+from .geometry.quaternion import slerp
+from .geometry.pose_array import PoseArray
+from .geometry import kernels
+from typing import List, Dict, Callable, Iterator
+
+class PoseHistory(object):
+    def __init__(self, capacity: int) -> None:
+        """
+        PoseHistory keeps the last capacity timestamped poses in a ring buffer
+        of preallocated arrays: the oldest pose is overwritten when it is full
+        """
+        assert capacity >= 1, "The capacity should be at least 1"
+        self._times = np.zeros(capacity, dtype=float)
+        self._orientations = np.zeros((capacity, 4), dtype=float)
+        self._positions = np.zeros((capacity, 3), dtype=float)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._times.size
+
+    @property
+    def times(self) -> np.ndarray:
+        """
+        The recorded times from the oldest to the newest
+        """
+        return np.roll(self._times, -self._start)[0:self._size]
+
+    def _index(self, position: int) -> int:
+        """
+        Returns the index in the arrays of the position-th oldest pose
+        """
+        return (self._start + position) % self.capacity
+
+    def record(self, time: float, pose: Pose) -> None:
+        """
+        record copies the pose, the times have to be recorded in increasing order
+        """
+        assert self._size == 0 or time >= self._times[self._index(self._size - 1)], \
+            "The times should be recorded in increasing order"
+
+        if self._size < self.capacity:
+            index = self._index(self._size)
+            self._size += 1
+        else:
+            index = self._start
+            self._start = self._index(1)
+
+        self._times[index] = time
+        self._orientations[index] = pose.orientation[:]
+        self._positions[index] = pose.position.ravel()
+
+    def pose_at(self, time: float) -> Pose:
+        """
+        pose_at returns the pose at time interpolated between the two recorded poses around it
+        (binary search then slerp of the orientations and linear interpolation of the positions)
+        """
+        assert self._size > 0, "The history is empty"
+        assert self._times[self._index(0)] <= time <= self._times[self._index(self._size - 1)], \
+            "The time {0} is out of the history".format(time)
+
+        # first recorded pose after time
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._times[self._index(middle)] <= time:
+                low = middle + 1
+            else:
+                high = middle
+
+        before = self._index(low - 1)
+        if low == self._size:
+            return Pose(Quaternion(self._orientations[before]), self._positions[before])
+
+        after = self._index(low)
+        coeff = (time - self._times[before]) / (self._times[after] - self._times[before])
+        orientation = slerp(Quaternion(self._orientations[before]), Quaternion(self._orientations[after]),
+                            coeff, True)
+        return Pose._wrap(orientation, (self._positions[before] * (1.0 - coeff) +
+                                        self._positions[after] * coeff).reshape(3, 1))
+
 
 class Frame(object):
-    def __init__(self, name: str, pose: Pose, ref_frame: str="") -> None:
+    def __init__(self, name: str, pose: Pose, ref_frame: str="", history_size: int = 0,
+                 static: bool = False) -> None:
         self.name = name
-        self.pose = pose
+        self._pose = pose
         self.ref_frame = ref_frame
+        # a static frame is not expected to move relatively to its reference frame,
+        # the FrameManager precomposes the chains of static frames
+        self.static = static
+        # FrameManager the frame is added to, notified when the pose changes
+        self._manager = None
+        # SolidRegistry whose arrays are viewed by the pose, set when the solid of the frame is registered
+        self._registry = None
+        # the last history_size poses recorded with record
+        self.history = PoseHistory(history_size) if history_size > 0 else None
+
+    def copy(self) -> 'Frame':
+        """
+        Returns a copy of the frame with a copy of its pose. The copy is not part of any FrameManager
+        and has no history (a deep copy would otherwise walk to the manager and its lock)
+        :return: Frame
+        """
+        return Frame(self.name, self._pose.copy(), self.ref_frame, static=self.static)
+
+    def __copy__(self) -> 'Frame':
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> 'Frame':
+        return self.copy()
+
+    def record(self, time: float) -> None:
+        """
+        Records the current pose at time in the history of the frame
+        """
+        self.history.record(time, self._pose)
+
+    @property
+    def pose(self) -> Pose:
+        return self._pose
+
+    @pose.setter
+    def pose(self, pose: Pose) -> None:
+        if self._manager is not None:
+            self._manager._assign_pose(self, pose)
+        else:
+            self._pose = pose
+        self.mark_dirty()
 
     def translate(self, vector) -> None:
-        self.pose.translate(vector)
+        self._pose.translate(vector)
+        self.mark_dirty()
 
     def rotate(self, quat: Quaternion) -> None:
-        self.pose.rotate(quat)
+        self._pose.rotate(quat)
+        self.mark_dirty()
+
+    def mark_dirty(self) -> None:
+        """
+        Notifies the FrameManager that the pose of the frame changed. It is called by
+        the methods of the frame and has to be called after modifying the pose in place directly
+        """
+        if self._manager is not None:
+            self._manager.mark_dirty(self.name)
+
+
+class FrameSnapshot(object):
+    def __init__(self, frame_names: List[str], orientations: np.ndarray, positions: np.ndarray, version: int) -> None:
+        """
+        FrameSnapshot is an immutable copy of the world poses (expressed in the fixed frame) of all the frames
+        published by a FrameManager: it can be read from any thread while the frames are modified
+        """
+        self.frame_names = tuple(frame_names)
+        self.frame_ids = {frame_name: frame_id for frame_id, frame_name in enumerate(frame_names)}
+        self.version = version
+
+        self._orientations = np.array(orientations, dtype=float).reshape(-1, 4)
+        self._positions = np.array(positions, dtype=float).reshape(-1, 3)
+        self._orientations.flags.writeable = False
+        self._positions.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.frame_names)
+
+    def __contains__(self, frame_name: str) -> bool:
+        return frame_name in self.frame_ids
+
+    @property
+    def world_poses(self) -> PoseArray:
+        """
+        The read-only world poses indexed by frame id
+        """
+        return PoseArray._wrap(self._orientations, self._positions)
+
+    def get_world_pose(self, frame_name: str) -> Pose:
+        """
+        Returns the read-only world pose of the frame
+        """
+        return self.world_poses[self.frame_ids[frame_name]]
+
+    def get_all_frame_poses(self) -> Dict[str, Pose]:
+        """
+        Returns the read-only world poses of all the frames
+        """
+        world_poses = self.world_poses
+        return {frame_name: world_poses[frame_id] for frame_id, frame_name in enumerate(self.frame_names)}
+
+    def get_relative_pose(self, from_frame_name: str, to_frame_name: str) -> Pose:
+        """
+        Returns the pose of the frame to_frame_name expressed in the frame from_frame_name
+        """
+        return self.get_world_pose(from_frame_name).inverse().compose(self.get_world_pose(to_frame_name))
 
 
 class FrameManager(object):
@@ -30,6 +218,30 @@ class FrameManager(object):
         self.fixed_frame = fixed_frame
         self.max_depth = 1
 
+        # World poses (expressed in the fixed frame) are cached, a frame is dirty when
+        # its world pose has to be recomputed. The descendants of a dirty frame are dirty
+        self.children = {fixed_frame.name: []}
+        self._world_poses = {}
+        self._dirty = {fixed_frame.name}
+        fixed_frame._manager = self
+
+        # Index of the tree: integer ids in order of addition, parent ids (-1 for the fixed frame),
+        # depths and for binary lifting the 2^k-th ancestors of each frame (as long as they exist)
+        self.frame_ids = {fixed_frame.name: 0}
+        self.frame_names = [fixed_frame.name]
+        self.parent_ids = [-1]
+        self.depths = [0]
+        self._ancestor_ids = [[]]
+
+        # Writers modify the frames holding the lock (see updating) and publish the world poses
+        # in an immutable snapshot, readers of other threads only read the last published snapshot
+        self._lock = threading.RLock()
+        self._snapshot = None
+
+        # Pose of each static frame expressed in its anchor: the closest ancestor
+        # which is not static (or the fixed frame), computed when first needed
+        self._static_chains = {}
+
     def add_frame(self, frame: Frame) -> None:
         """
         add_frame adds the frame to the frames list and check if the frame is already present
@@ -41,6 +253,11 @@ class FrameManager(object):
                 raise Exception("The frame \"{0}\" already exists".format(frame.ref_frame))
             else:
                 self.frames[frame.name] = frame
+                self.children[frame.name] = []
+                self.children[frame.ref_frame].append(frame.name)
+                self._dirty.add(frame.name)
+                frame._manager = self
+                self._index_frame(frame)
 
                 depth = 1 + self.frame_depth_dict[frame.ref_frame]
 
@@ -54,91 +271,504 @@ class FrameManager(object):
         else:
             raise Exception("The reference frame \"{0}\" does not exist".format(frame.ref_frame))
 
-    def solid_pose_in_frame(self, solid, frame: Frame) -> Pose:
+    def _index_frame(self, frame: Frame) -> None:
         """
-        solid_pose_in_frame takes a Solid solid and a Frame frame as parameters and return the
-        pose of solid expressed in frame
+        Gives an id to the frame and computes its ancestors: the 2^k-th ancestor
+        is the 2^(k-1)-th ancestor of the 2^(k-1)-th ancestor
+        """
+        parent_id = self.frame_ids[frame.ref_frame]
+        ancestor_ids = [parent_id]
+        while len(ancestor_ids) - 1 < len(self._ancestor_ids[ancestor_ids[-1]]):
+            ancestor_ids.append(self._ancestor_ids[ancestor_ids[-1]][len(ancestor_ids) - 1])
+
+        self.frame_ids[frame.name] = len(self.frame_names)
+        self.frame_names.append(frame.name)
+        self.parent_ids.append(parent_id)
+        self.depths.append(self.depths[parent_id] + 1)
+        self._ancestor_ids.append(ancestor_ids)
+
+    def _common_ancestor_id(self, id_1: int, id_2: int) -> int:
+        """
+        Returns the id of the lowest common ancestor of the frames id_1 and id_2 in O(log(depth))
+        """
+        if self.depths[id_1] < self.depths[id_2]:
+            id_1, id_2 = id_2, id_1
+
+        # brings id_1 to the depth of id_2
+        depth_diff = self.depths[id_1] - self.depths[id_2]
+        level = 0
+        while depth_diff:
+            if depth_diff & 1:
+                id_1 = self._ancestor_ids[id_1][level]
+            depth_diff >>= 1
+            level += 1
+
+        if id_1 == id_2:
+            return id_1
+
+        # climbs as high as possible while the ancestors are different
+        for level in reversed(range(len(self._ancestor_ids[id_1]))):
+            if level < len(self._ancestor_ids[id_1]) and \
+                    self._ancestor_ids[id_1][level] != self._ancestor_ids[id_2][level]:
+                id_1 = self._ancestor_ids[id_1][level]
+                id_2 = self._ancestor_ids[id_2][level]
+
+        return self.parent_ids[id_1]
+
+    def _path_ids(self, frame_id: int, ancestor_id: int) -> List[int]:
+        """
+        Returns the ids of the frames going from frame_id to its ancestor ancestor_id (both included)
+        """
+        path = [frame_id]
+        while path[-1] != ancestor_id:
+            path.append(self.parent_ids[path[-1]])
+        return path
+
+    def lowest_common_ancestor(self, frame_name_1: str, frame_name_2: str) -> str:
         """
+        lowest_common_ancestor returns the name of the deepest frame having both frames as descendants
+        (a frame being a descendant of itself)
+        """
+        return self.frame_names[self._common_ancestor_id(self.frame_ids[frame_name_1],
+                                                         self.frame_ids[frame_name_2])]
 
-        frame_seqs = self.get_frame_seq(frame,
-                                        self.frames[solid.ref_frame])
+    def get_relative_pose(self, from_frame_name: str, to_frame_name: str) -> Pose:
+        """
+        get_relative_pose returns the pose of the frame to_frame_name expressed in the frame from_frame_name.
+        The poses are only composed along the path going through the lowest common ancestor of the frames
+        """
+        return self._compose_path(from_frame_name, to_frame_name, lambda frame: frame.pose)
 
-        pose = solid.get_pose(True)
+    def lookup_at(self, time: float, from_frame_name: str, to_frame_name: str) -> Pose:
+        """
+        lookup_at returns the pose of the frame to_frame_name expressed in the frame from_frame_name at time.
+        The frames of the path having a history use their pose interpolated at time, the other ones their current pose
+        """
+        return self._compose_path(from_frame_name, to_frame_name,
+                                  lambda frame: frame.pose if frame.history is None else frame.history.pose_at(time))
 
-        for frame_name in frame_seqs[0]:
-            frame = self.frames[frame_name]
+    def record(self, time: float) -> None:
+        """
+        record records the current poses of all the frames having a history
+        """
+        for frame in self.frames.values():
+            if frame.history is not None:
+                frame.record(time)
 
-            pose.rotate(frame.pose.orientation)
-            pose.position = frame.pose.position + \
-                            frame.pose.orientation.to_rot_matrix() * pose.position
+    def _compose_path(self, from_frame_name: str, to_frame_name: str, frame_pose: Callable[[Frame], Pose]) -> Pose:
+        """
+        Composes the poses given by frame_pose along the path from from_frame_name to to_frame_name
+        """
+        from_id = self.frame_ids[from_frame_name]
+        to_id = self.frame_ids[to_frame_name]
+        common_id = self._common_ancestor_id(from_id, to_id)
 
-        if len(frame_seqs[1]) == 1:
+        pose = self._pose_in_ancestor(to_id, common_id, frame_pose)
+        if from_id == common_id:
             return pose
 
-        pose_fixed = Pose(Quaternion(), array([0, 0, 0]))
+        return self._pose_in_ancestor(from_id, common_id, frame_pose).inverse().compose(pose)
 
-        for frame_name in frame_seqs[1]:
-            frame = self.frames[frame_name]
+    def _pose_in_ancestor(self, frame_id: int, ancestor_id: int, frame_pose: Callable[[Frame], Pose]) -> Pose:
+        """
+        Returns the pose of the frame frame_id expressed in its ancestor ancestor_id, the chains
+        of static frames below the ancestor are replaced by their precomposed pose
+        """
+        pose = Pose()
+        while frame_id != ancestor_id:
+            frame = self.frames[self.frame_names[frame_id]]
+            if frame.static:
+                anchor_name, static_pose = self._static_chain(frame.name)
+                anchor_id = self.frame_ids[anchor_name]
+                if self.depths[anchor_id] >= self.depths[ancestor_id]:
+                    pose = static_pose.compose(pose)
+                    frame_id = anchor_id
+                    continue
+
+            pose = frame_pose(frame).compose(pose)
+            frame_id = self.parent_ids[frame_id]
 
-            pose_fixed.rotate(frame.pose.orientation)
-            pose_fixed.position = frame.pose.position + \
-                                  frame.pose.orientation.to_rot_matrix() * pose_fixed.position
+        return pose
 
-        pose_fixed = pose_fixed.inverse()
+    def _static_chain(self, frame_name: str):
+        """
+        Returns the anchor of the static frame (closest ancestor which is not static or the fixed frame)
+        and the pose of the frame expressed in its anchor
+        """
+        # static frames without precomposed pose, from the frame up to the anchor
+        # or to the first static ancestor with a precomposed pose
+        frame_names = []
+        name = frame_name
+        while name not in self._static_chains:
+            frame_names.append(name)
+            ref_frame = self.frames[self.frames[name].ref_frame]
+            if not ref_frame.static or ref_frame is self.fixed_frame:
+                break
+            name = ref_frame.name
+
+        for name in reversed(frame_names):
+            frame = self.frames[name]
+            ref_frame = self.frames[frame.ref_frame]
+            if ref_frame.static and ref_frame is not self.fixed_frame:
+                anchor_name, ref_pose = self._static_chains[ref_frame.name]
+                self._static_chains[name] = (anchor_name, ref_pose.compose(frame.pose))
+            else:
+                self._static_chains[name] = (ref_frame.name, frame.pose)
 
-        pose.rotate(pose_fixed.orientation)
-        pose.position = pose_fixed.orientation.to_rot_matrix() * \
-                        (pose.position + pose_fixed.position)
+        return self._static_chains[frame_name]
 
-        return pose
+    def _invalidate_static_chains(self, frame_name: str) -> None:
+        """
+        Forgets the precomposed poses going through the static frame (its own and its static descendants' ones)
+        """
+        frame_names = [frame_name]
+        while frame_names:
+            frame_name = frame_names.pop()
+            if self.frames[frame_name].static:
+                self._static_chains.pop(frame_name, None)
+                frame_names.extend(self.children[frame_name])
+
+    def transform_points(self,
+                         points: np.ndarray,
+                         from_frame_name: str,
+                         to_frame_name: str,
+                         out: np.ndarray = None) -> np.ndarray:
+        """
+        transform_points expresses in the frame to_frame_name the points expressed in the frame from_frame_name.
+        The frame chain is composed once and applied to all the points with one matmul
+        :param points: (N, 3) ndarray
+        :param from_frame_name: name of the frame the points are expressed in
+        :param to_frame_name: name of the frame the points are expressed in after the transformation
+        :param out: optional (N, 3) ndarray receiving the result (may not be points)
+        :return: (N, 3) ndarray
+        """
+        pose = self.get_relative_pose(to_frame_name, from_frame_name)
+        return pose.transform_points(np.asarray(points, dtype=float).reshape(-1, 3), out)
+
+    def transform_poses(self,
+                        poses: PoseArray,
+                        from_frame_name: str,
+                        to_frame_name: str,
+                        out: PoseArray = None) -> PoseArray:
+        """
+        transform_poses expresses in the frame to_frame_name the poses expressed in the frame from_frame_name.
+        The frame chain is composed once and applied to all the poses with batched operations
+        :param poses: PoseArray
+        :param from_frame_name: name of the frame the poses are expressed in
+        :param to_frame_name: name of the frame the poses are expressed in after the transformation
+        :param out: optional PoseArray of the same size receiving the result (may be poses)
+        :return: PoseArray
+        """
+        pose = self.get_relative_pose(to_frame_name, from_frame_name)
+        if out is None:
+            out = PoseArray.identity(len(poses))
 
-    def get_frame_seq(self, from_frame: Frame, to_frame: Frame) -> List[Pose]:
+        positions = out.positions
+        kernels.quat_rotate_vectors(pose.orientation[:], poses.positions, out=positions)
+        positions += pose.position.reshape(3)
+        kernels.quat_mul(pose.orientation[:], poses.orientations.array, out=out.orientations.array)
+        return out
+
+    def solid_pose_in_frame(self, solid, frame: Frame) -> Pose:
+        """
+        solid_pose_in_frame takes a Solid solid and a Frame frame as parameters and return the
+        pose of solid expressed in frame
+        """
+        # compose returns new poses: the solid pose is never modified
+        return self.get_relative_pose(frame.name, solid.ref_frame).compose(solid.get_pose())
+
+    def get_frame_seq(self, from_frame: Frame, to_frame: Frame) -> List[List[str]]:
         """
         get_frame_seq returns a two lists containing:
-            - the forward frame sequence which goes from:
+            - the forward frame sequence which goes from the to_frame to the lowest common
+                ancestor of the to_frame and the from_frame
+
+                [to_frame, frame_1, ..., common ancestor]
 
-                case 1: the to_frame to the from_frame if the sequence does not include the fixed frame
-                case 2: the to_frame to the fixed_frame otherwise
+            - the backward frame sequence which goes from the from_frame to the lowest common ancestor,
+                only from_frame if it is an ancestor of the to_frame
 
-                [to_frame, frame_1, ..., from_frame or fixed_frame]
+                [from_frame, frame_1, ..., common ancestor]
 
-            - the backward frame sequence which goes from the from_frame to the fixed_frame if we are in
-                case 2 for the forward sequence and only from_frame otherwise
+        """
+        from_id = self.frame_ids[from_frame.name]
+        to_id = self.frame_ids[to_frame.name]
+        common_id = self._common_ancestor_id(from_id, to_id)
 
-                [from_frame, frame_1, ..., fixed_frame]
+        fwd_frame_seq = [self.frame_names[frame_id] for frame_id in self._path_ids(to_id, common_id)]
+        bwd_frame_seq = [self.frame_names[frame_id] for frame_id in self._path_ids(from_id, common_id)]
+
+        return [fwd_frame_seq, bwd_frame_seq]
 
+    def _assign_pose(self, frame: Frame, pose: Pose) -> None:
         """
-        fwd_frame_seq = [to_frame.name]
-        bwd_frame_seq = [from_frame.name]
+        Replaces the pose of a frame of the manager
+        """
+        frame._pose = pose
+
+    @contextmanager
+    def updating(self) -> Iterator["FrameManager"]:
+        """
+        updating is a context manager holding the writer lock while the frames are modified,
+        the new world poses are published when it exits:
 
-        while fwd_frame_seq[-1] != self.fixed_frame.name and \
-                        fwd_frame_seq[-1] != from_frame.name:
-            fwd_frame_seq.append(self.frames[fwd_frame_seq[-1]].ref_frame)
+            with frame_mgr.updating():
+                plate.rotate(quat)
+        """
+        with self._lock:
+            yield self
+            self.publish()
 
-        # The to_frame is not part of the frame_seq
-        if self.fixed_frame != from_frame.name and \
-                        fwd_frame_seq[-1] == self.fixed_frame.name:
+    def publish(self) -> FrameSnapshot:
+        """
+        publish computes the world poses of all the frames and makes them available to the readers
+        as an immutable snapshot, the snapshot is replaced atomically
+        """
+        with self._lock:
+            orientations, positions = self._world_pose_arrays()
+            version = 0 if self._snapshot is None else self._snapshot.version + 1
+            snapshot = FrameSnapshot(self.frame_names, orientations, positions, version)
+            self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> FrameSnapshot:
+        """
+        snapshot returns the last published world poses without taking any lock
+        (the poses are published once if they never were)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.publish()
+        return snapshot
 
-            while bwd_frame_seq[-1] != self.fixed_frame.name:
-                bwd_frame_seq.append(self.frames[bwd_frame_seq[-1]].ref_frame)
+    def _world_pose_arrays(self):
+        """
+        Returns the (N, 4) orientations and (N, 3) positions of the world poses indexed by frame id
+        """
+        poses = self.get_all_frame_poses()
+        orientations = np.array([poses[frame_name].orientation[:] for frame_name in self.frame_names])
+        positions = np.array([poses[frame_name].position.ravel() for frame_name in self.frame_names])
+        return orientations, positions
 
-        return [fwd_frame_seq, bwd_frame_seq]
+    def mark_dirty(self, frame_name: str) -> None:
+        """
+        mark_dirty invalidates the cached world poses of the frame and of its descendants
+        (and the precomposed chains going through the frame if it is static)
+        """
+        self._invalidate_static_chains(frame_name)
+
+        frame_names = [frame_name]
+        while frame_names:
+            frame_name = frame_names.pop()
+            # the descendants of a dirty frame are already dirty
+            if frame_name not in self._dirty:
+                self._dirty.add(frame_name)
+                frame_names.extend(self.children[frame_name])
+
+    def get_world_pose(self, frame_name: str) -> Pose:
+        """
+        get_world_pose returns the pose of the frame expressed in the fixed frame,
+        only the dirty frames between the fixed frame and the frame are recomputed.
+        The returned pose is cached and must not be modified
+        """
+        frame = self.frames[frame_name]
+        if frame.static and frame_name in self._dirty and frame is not self.fixed_frame:
+            # one composition with the precomposed chain, the static frames in between stay dirty
+            anchor_name, static_pose = self._static_chain(frame_name)
+            return self.get_world_pose(anchor_name).compose(static_pose)
+
+        dirty_frames = []
+        name = frame_name
+        while name in self._dirty:
+            dirty_frames.append(name)
+            name = self.frames[name].ref_frame
+
+        for name in reversed(dirty_frames):
+            self._update_world_pose(name)
+
+        return self._world_poses[frame_name]
 
     def get_all_frame_poses(self) -> Dict[str, Pose]:
-        poses = {self.fixed_frame.name: self.fixed_frame.pose}
+        """
+        get_all_frame_poses returns the poses of all the frames expressed in the fixed frame,
+        only the dirty frames are recomputed. The returned poses are cached and must not be modified
+        """
+        for frame_name in sorted(self._dirty, key=self.frame_depth_dict.__getitem__):
+            self._update_world_pose(frame_name)
 
-        for depth in range(1, self.max_depth):
-            for frame_name in self.depth_frame_dict[depth]:
-                pose = Pose()
-                frame = self.frames[frame_name]
-                pose_ref_frame = poses[frame.ref_frame]
+        return dict(self._world_poses)
+
+    def _update_world_pose(self, frame_name: str) -> None:
+        """
+        Recomputes the world pose of a dirty frame whose reference frame is clean
+        """
+        frame = self.frames[frame_name]
+        if frame_name == self.fixed_frame.name:
+            self._world_poses[frame_name] = frame.pose
+        elif frame.static:
+            # the anchor is an ancestor, hence already updated
+            anchor_name, static_pose = self._static_chain(frame_name)
+            self._world_poses[frame_name] = self._world_poses[anchor_name].compose(static_pose)
+        else:
+            self._world_poses[frame_name] = self._world_poses[frame.ref_frame].compose(frame.pose)
+        self._dirty.discard(frame_name)
 
-                pose.orientation = pose_ref_frame.orientation * \
-                                    frame.pose.orientation
-                pose.position = pose_ref_frame.position + \
-                                 pose_ref_frame.orientation.to_rot_matrix() * \
-                                 frame.pose.position
 
-                poses[frame_name] = pose
+class ArrayFrameManager(FrameManager):
+    def __init__(self, fixed_frame: Frame, capacity: int = 16) -> None:
+        """
+        FrameManager storing the local poses of all the frames in contiguous arrays indexed by
+        the frame ids: the pose of each frame becomes a view of its row (keep references
+        to the frames rather than to their poses as the rows move when the arrays grow).
+        The world poses are computed one depth level at a time with batched operations
+        """
+        FrameManager.__init__(self, fixed_frame)
 
-        return poses
\ No newline at end of file
+        self._local_poses = PoseArray.identity(max(capacity, 1))
+        self._world_poses_array = PoseArray.identity(max(capacity, 1))
+        self._dirty_mask = np.ones(max(capacity, 1), dtype=bool)
+        self._level_ids = [[0]]
+        self._level_arrays = None
+        self._parent_array = None
+        self._depth_array = None
+
+        self._bind_frame(fixed_frame)
+
+    def _bind_frame(self, frame: Frame) -> None:
+        """
+        Copies the pose of the frame in the local poses arrays and replaces it by a view of its row
+        """
+        frame_id = self.frame_ids[frame.name]
+        if frame_id >= len(self._local_poses):
+            self._grow(2 * len(self._local_poses))
+
+        self._local_poses[frame_id] = frame.pose
+        frame._pose = self._local_poses[frame_id]
+
+    def _grow(self, capacity: int) -> None:
+        size = len(self._local_poses)
+        local_poses = PoseArray.identity(capacity)
+        local_poses[0:size] = self._local_poses
+        world_poses = PoseArray.identity(capacity)
+        world_poses[0:size] = self._world_poses_array
+        dirty_mask = np.ones(capacity, dtype=bool)
+        dirty_mask[0:size] = self._dirty_mask
+
+        self._local_poses = local_poses
+        self._world_poses_array = world_poses
+        self._dirty_mask = dirty_mask
+
+        # the poses of the frames view the new arrays
+        for frame_id, frame_name in enumerate(self.frame_names[0:size]):
+            self.frames[frame_name]._pose = self._local_poses[frame_id]
+
+    def add_frame(self, frame: Frame) -> None:
+        assert frame._registry is None, \
+            "The pose of the frame {0} already views the arrays of a SolidRegistry".format(frame.name)
+        FrameManager.add_frame(self, frame)
+
+        frame_id = self.frame_ids[frame.name]
+        self._bind_frame(frame)
+        self._dirty_mask[frame_id] = True
+
+        depth = self.depths[frame_id]
+        if depth == len(self._level_ids):
+            self._level_ids.append([])
+        self._level_ids[depth].append(frame_id)
+        self._level_arrays = None
+        self._parent_array = None
+        self._depth_array = None
+
+    def _assign_pose(self, frame: Frame, pose: Pose) -> None:
+        # the values are copied in the row viewed by the pose of the frame
+        frame._pose.orientation[:] = pose.orientation[:]
+        frame._pose.position[:] = pose.position.reshape(3, 1)
+
+    @property
+    def local_poses(self) -> PoseArray:
+        """
+        The local poses of the frames (pose relative to their reference frame) indexed by frame id.
+        After modifying them in place, mark_dirty or mark_all_dirty has to be called
+        """
+        return self._local_poses[0:len(self.frame_names)]
+
+    def mark_dirty(self, frame_name: str) -> None:
+        self._invalidate_static_chains(frame_name)
+
+        frame_ids = [self.frame_ids[frame_name]]
+        while frame_ids:
+            frame_id = frame_ids.pop()
+            # the descendants of a dirty frame are already dirty
+            if not self._dirty_mask[frame_id]:
+                self._dirty_mask[frame_id] = True
+                frame_ids.extend(self.frame_ids[name] for name in self.children[self.frame_names[frame_id]])
+
+    def mark_all_dirty(self) -> None:
+        """
+        mark_all_dirty invalidates the world poses of all the frames and the precomposed static chains
+        """
+        self._static_chains.clear()
+        self._dirty_mask[:] = True
+
+    def _update_world_poses(self) -> None:
+        """
+        Recomputes the world poses of the dirty frames, one depth level at a time:
+        q_world = q_world_parent * q_local and p_world = p_world_parent + R_world_parent p_local
+        """
+        dirty_ids = np.flatnonzero(self._dirty_mask[0:len(self.frame_names)])
+        if dirty_ids.size == 0:
+            return
+
+        if self._level_arrays is None:
+            self._level_arrays = [np.array(ids, dtype=int) for ids in self._level_ids]
+            self._parent_array = np.array(self.parent_ids, dtype=int)
+            self._depth_array = np.array(self.depths, dtype=int)
+
+        # the descendants of a dirty frame are dirty: only the levels between the
+        # shallowest and the deepest dirty frames are visited
+        dirty_depths = self._depth_array[dirty_ids]
+        min_depth = max(int(dirty_depths.min()), 1)
+        max_depth = int(dirty_depths.max())
+
+        local_quats = self._local_poses.orientations.array
+        local_positions = self._local_poses.positions
+        world_quats = self._world_poses_array.orientations.array
+        world_positions = self._world_poses_array.positions
+
+        if self._dirty_mask[0]:
+            world_quats[0] = local_quats[0]
+            world_positions[0] = local_positions[0]
+            self._dirty_mask[0] = False
+
+        for level_ids in self._level_arrays[min_depth:max_depth + 1]:
+            frame_ids = level_ids[self._dirty_mask[level_ids]]
+            if frame_ids.size == 0:
+                continue
+
+            parent_ids = self._parent_array[frame_ids]
+            parent_quats = world_quats[parent_ids]
+            world_quats[frame_ids] = kernels.quat_mul(parent_quats, local_quats[frame_ids])
+            world_positions[frame_ids] = world_positions[parent_ids] + \
+                                         kernels.quat_rotate_vectors(parent_quats, local_positions[frame_ids])
+            self._dirty_mask[frame_ids] = False
+
+    def get_world_pose_array(self) -> PoseArray:
+        """
+        get_world_pose_array returns the poses of all the frames expressed in the fixed frame indexed
+        by frame id, only the dirty frames are recomputed. The returned PoseArray views the world poses
+        arrays: it is updated by the next queries and must not be modified
+        """
+        self._update_world_poses()
+        return self._world_poses_array[0:len(self.frame_names)]
+
+    def _world_pose_arrays(self):
+        world_poses = self.get_world_pose_array()
+        return world_poses.orientations.array, world_poses.positions
+
+    def get_world_pose(self, frame_name: str) -> Pose:
+        self._update_world_poses()
+        return self._world_poses_array[self.frame_ids[frame_name]]
+
+    def get_all_frame_poses(self) -> Dict[str, Pose]:
+        world_poses = self.get_world_pose_array()
+        return {frame_name: world_poses[frame_id] for frame_id, frame_name in enumerate(self.frame_names)}
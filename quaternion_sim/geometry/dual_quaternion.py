@@ -0,0 +1,260 @@
+"""
+Dual quaternions r + eps * d representing rigid transforms: the real part r is the
+unit Quaternion of the rotation and the dual part is d = 0.5 * [0, p] * r with p the translation.
+They are stored as [r0, r1, r2, r3, d0, d1, d2, d3] along the last axis of an ndarray.
+"""
+from typing import Union, List, Iterator
+import numpy as np
+
+from .quaternion import Quaternion
+from .pose import Pose
+from .pose_array import PoseArray
+from . import kernels
+
+SMALL_ANGLE = 1e-8
+
+
+def _dq_mul(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Product of two (..., 8) dual quaternions: (r1 r2, r1 d2 + d1 r2)
+    """
+    out = np.empty(np.broadcast_shapes(left.shape, right.shape), dtype=float)
+    kernels.quat_mul(left[..., 0:4], right[..., 0:4], out=out[..., 0:4])
+    out[..., 4:8] = kernels.quat_mul(left[..., 0:4], right[..., 4:8]) + \
+                    kernels.quat_mul(left[..., 4:8], right[..., 0:4])
+    return out
+
+
+def _dq_conjugate(dquats: np.ndarray) -> np.ndarray:
+    """
+    Quaternion conjugate of both parts of (..., 8) dual quaternions (inverse of unit dual quaternions)
+    """
+    out = np.empty(dquats.shape, dtype=float)
+    kernels.quat_conjugate(dquats[..., 0:4], out=out[..., 0:4])
+    kernels.quat_conjugate(dquats[..., 4:8], out=out[..., 4:8])
+    return out
+
+
+def _dq_from_pose(orientations: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    (..., 8) dual quaternions of the (..., 4) orientations and (..., 3) positions
+    """
+    dquats = np.empty(orientations.shape[:-1] + (8,), dtype=float)
+    dquats[..., 0:4] = orientations
+    pure = np.zeros(orientations.shape, dtype=float)
+    pure[..., 1:4] = positions
+    kernels.quat_mul(pure, orientations, out=dquats[..., 4:8])
+    dquats[..., 4:8] *= 0.5
+    return dquats
+
+
+def _dq_to_pose(dquats: np.ndarray):
+    """
+    (..., 4) orientations and (..., 3) positions of the (..., 8) dual quaternions: p = 2 * d * r^-1
+    """
+    positions = kernels.quat_mul(dquats[..., 4:8], kernels.quat_conjugate(dquats[..., 0:4]))[..., 1:4]
+    return dquats[..., 0:4].copy(), 2.0 * positions
+
+
+def _dq_pow(dquats: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    """
+    Power of (..., 8) unit dual quaternions (with r0 >= 0) using their screw parameters:
+    the rotation angle and the translation along the screw axis are scaled by the exponents (...)
+    """
+    real = dquats[..., 0:4]
+    dual = dquats[..., 4:8]
+    exponents = exponents[..., np.newaxis]
+
+    half_angles = np.arccos(np.clip(real[..., 0:1], -1.0, 1.0))
+    sines = np.sin(half_angles)
+    small = sines < SMALL_ANGLE
+    safe_sines = np.where(small, 1.0, sines)
+
+    # screw axis, translation along the axis and moment of the axis
+    axes = real[..., 1:4] / safe_sines
+    pitches = -2.0 * dual[..., 0:1] / safe_sines
+    moments = (dual[..., 1:4] - axes * 0.5 * pitches * np.cos(half_angles)) / safe_sines
+
+    new_half_angles = exponents * half_angles
+    new_pitches = exponents * pitches
+    new_sines = np.sin(new_half_angles)
+    new_cosines = np.cos(new_half_angles)
+
+    screw = np.empty(np.broadcast_shapes(dquats.shape, exponents.shape), dtype=float)
+    screw[..., 0:1] = new_cosines
+    screw[..., 1:4] = new_sines * axes
+    screw[..., 4:5] = -0.5 * new_pitches * new_sines
+    screw[..., 5:8] = new_sines * moments + 0.5 * new_pitches * new_cosines * axes
+
+    # (almost) pure translation: no screw axis, the translation is scaled
+    translations = 2.0 * kernels.quat_mul(dual, kernels.quat_conjugate(real))[..., 1:4]
+    rotations = kernels.quat_normalize(np.array([1.0, 0.0, 0.0, 0.0]) * (1.0 - exponents) + real * exponents)
+    linear = _dq_from_pose(rotations, translations * exponents)
+
+    return np.where(small, linear, screw)
+
+
+def _dq_sclerp(starts: np.ndarray, ends: np.ndarray, coeffs: np.ndarray) -> np.ndarray:
+    """
+    Screw linear interpolation start * (start^-1 * end)^coeff of (..., 8) unit dual quaternions
+    """
+    deltas = _dq_mul(_dq_conjugate(starts), ends)
+    # shortest path: r and -r are the same rotation
+    deltas *= np.where(deltas[..., 0:1] < 0.0, -1.0, 1.0)
+    return _dq_mul(starts, _dq_pow(deltas, coeffs))
+
+
+class DualQuaternion(object):
+    """
+    Unit dual quaternion r + eps * d representing the rigid transform of a Pose
+    """
+
+    def __init__(self, array: Union[np.ndarray, List[float]] = None):
+        if array is None:
+            self._array = np.array([1, 0, 0, 0, 0, 0, 0, 0], dtype=float)
+        else:
+            assert np.size(array) == 8, 'DualQuaternion should have a size of 8'
+            self._array = np.array(array, dtype=float).reshape(8)
+
+    @classmethod
+    def _wrap(cls, array: np.ndarray) -> "DualQuaternion":
+        dquat = cls.__new__(cls)
+        dquat._array = array
+        return dquat
+
+    @property
+    def real(self) -> Quaternion:
+        return Quaternion._wrap(self._array[0:4])
+
+    @property
+    def dual(self) -> Quaternion:
+        return Quaternion._wrap(self._array[4:8])
+
+    @staticmethod
+    def from_pose(pose: Pose) -> "DualQuaternion":
+        return DualQuaternion._wrap(_dq_from_pose(pose.orientation[:], pose.position.reshape(3)))
+
+    def to_pose(self) -> Pose:
+        orientation, position = _dq_to_pose(self._array)
+        return Pose._wrap(Quaternion._wrap(orientation), position.reshape(3, 1))
+
+    def conjugate(self) -> None:
+        """
+        Conjugate (inverse of the transform) in place
+        """
+        self._array[:] = _dq_conjugate(self._array)
+
+    def get_conjugate(self) -> "DualQuaternion":
+        """
+        Returns the conjugate, inverse of the transform
+        """
+        return DualQuaternion._wrap(_dq_conjugate(self._array))
+
+    def __repr__(self):
+        return str(self._array)
+
+    def __getitem__(self, item):
+        return self._array[item]
+
+    def __mul__(self, other: "DualQuaternion"):
+        if isinstance(other, DualQuaternion):
+            return DualQuaternion._wrap(_dq_mul(self._array, other._array))
+        return NotImplemented
+
+    def __eq__(self, other: "DualQuaternion") -> bool:
+        return np.allclose(self._array, other._array)
+
+    @staticmethod
+    def identity() -> "DualQuaternion":
+        return DualQuaternion()
+
+
+class DualQuaternionArray(object):
+    """
+    Array of N unit dual quaternions stored in one contiguous (N, 8) ndarray
+    """
+
+    def __init__(self, array: Union[np.ndarray, List] = None):
+        if array is None:
+            self._array = np.empty((0, 8), dtype=float)
+        else:
+            self._array = np.array(array, dtype=float).reshape(-1, 8)
+
+    @classmethod
+    def _wrap(cls, array: np.ndarray) -> "DualQuaternionArray":
+        dquats = cls.__new__(cls)
+        dquats._array = array
+        return dquats
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._array
+
+    @staticmethod
+    def from_pose_array(poses: PoseArray) -> "DualQuaternionArray":
+        return DualQuaternionArray._wrap(_dq_from_pose(poses.orientations.array, poses.positions))
+
+    def to_pose_array(self) -> PoseArray:
+        orientations, positions = _dq_to_pose(self._array)
+        return PoseArray._wrap(orientations, positions)
+
+    def conjugate(self) -> None:
+        self._array[:] = _dq_conjugate(self._array)
+
+    def get_conjugate(self) -> "DualQuaternionArray":
+        return DualQuaternionArray._wrap(_dq_conjugate(self._array))
+
+    def __len__(self) -> int:
+        return self._array.shape[0]
+
+    def __iter__(self) -> Iterator[DualQuaternion]:
+        for row in self._array:
+            yield DualQuaternion._wrap(row)
+
+    def __repr__(self):
+        return str(self._array)
+
+    def __getitem__(self, item) -> Union[DualQuaternion, "DualQuaternionArray"]:
+        if isinstance(item, (int, np.integer)):
+            return DualQuaternion._wrap(self._array[item])
+        return DualQuaternionArray._wrap(self._array[item].reshape(-1, 8))
+
+    def __mul__(self, other: Union["DualQuaternionArray", DualQuaternion]):
+        if isinstance(other, (DualQuaternionArray, DualQuaternion)):
+            return DualQuaternionArray._wrap(_dq_mul(self._array, other._array))
+        return NotImplemented
+
+    def __rmul__(self, other: DualQuaternion):
+        if isinstance(other, DualQuaternion):
+            return DualQuaternionArray._wrap(_dq_mul(other._array, self._array))
+        return NotImplemented
+
+    def __eq__(self, other: Union["DualQuaternionArray", DualQuaternion]) -> bool:
+        return np.allclose(self._array, other._array)
+
+    @staticmethod
+    def identity(size: int) -> "DualQuaternionArray":
+        array = np.zeros((size, 8), dtype=float)
+        array[:, 0] = 1.0
+        return DualQuaternionArray._wrap(array)
+
+
+def sclerp(dquat_start: Union[DualQuaternion, DualQuaternionArray],
+           dquat_end: Union[DualQuaternion, DualQuaternionArray],
+           coeff: Union[float, np.ndarray]) -> Union[DualQuaternion, DualQuaternionArray]:
+    """
+    Screw Linear Interpolation: the rigid transform moves along the screw motion
+    between the start and the end, rotation and translation being interpolated together.
+    Takes the shortest path. Returns a DualQuaternionArray if any argument is an array
+    :param dquat_start: Start DualQuaternion(s)
+    :param dquat_end: End DualQuaternion(s)
+    :param coeff: Interpolation coefficient(s)
+    :return: DualQuaternion or DualQuaternionArray
+    """
+    if isinstance(dquat_start, DualQuaternion) and isinstance(dquat_end, DualQuaternion) and np.ndim(coeff) == 0:
+        return DualQuaternion._wrap(_dq_sclerp(dquat_start._array, dquat_end._array, np.asarray(coeff, dtype=float)))
+
+    starts = dquat_start._array.reshape(-1, 8)
+    ends = dquat_end._array.reshape(-1, 8)
+    coeffs = np.asarray(coeff, dtype=float).reshape(-1)
+    return DualQuaternionArray._wrap(_dq_sclerp(starts, ends, coeffs))
@@ -0,0 +1,383 @@
+"""
+Vectorized quaternion kernels working directly on float ndarrays.
+
+Quaternions are stored along the last axis as [q0, q1, q2, q3] (same
+convention as the Quaternion class), so an array of shape (..., 4) holds
+any number of quaternions. The kernels broadcast over the leading axes.
+
+Two backends implement the kernels: "numpy" (this module) and "numba"
+(numba_kernels, compiled loops, used when Numba can be imported). The backend
+is selected with set_backend or the QUATERNION_SIM_BACKEND environment variable
+("auto", "numpy" or "numba"). Callers must look the kernels up on this module
+(kernels.quat_mul(...)) so that they follow the selected backend.
+"""
+import os
+import warnings
+from typing import List
+
+import numpy as np
+
+
+def quat_mul(left: np.ndarray, right: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Hamilton product left * right of two (..., 4) arrays
+    :param left: (..., 4) ndarray
+    :param right: (..., 4) ndarray
+    :param out: optional (..., 4) ndarray receiving the result (may alias left or right)
+    :return: (..., 4) ndarray
+    """
+    l0, l1, l2, l3 = left[..., 0], left[..., 1], left[..., 2], left[..., 3]
+    r0, r1, r2, r3 = right[..., 0], right[..., 1], right[..., 2], right[..., 3]
+
+    q0 = l0 * r0 - l1 * r1 - l2 * r2 - l3 * r3
+    q1 = l0 * r1 + l1 * r0 + l2 * r3 - l3 * r2
+    q2 = l0 * r2 + l2 * r0 + l3 * r1 - l1 * r3
+    q3 = l0 * r3 + l3 * r0 + l1 * r2 - l2 * r1
+
+    if out is None:
+        out = np.empty(np.broadcast_shapes(left.shape, right.shape), dtype=float)
+
+    out[..., 0] = q0
+    out[..., 1] = q1
+    out[..., 2] = q2
+    out[..., 3] = q3
+    return out
+
+
+def quat_conjugate(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Conjugate (inverse of unit quaternions) of a (..., 4) array
+    :param quats: (..., 4) ndarray
+    :param out: optional (..., 4) ndarray receiving the result (may alias quats)
+    :return: (..., 4) ndarray
+    """
+    if out is None:
+        out = np.empty(quats.shape, dtype=float)
+
+    out[..., 0] = quats[..., 0]
+    np.negative(quats[..., 1:4], out=out[..., 1:4])
+    return out
+
+
+def quat_norm(quats: np.ndarray) -> np.ndarray:
+    """
+    Norm of each quaternion of a (..., 4) array
+    :param quats: (..., 4) ndarray
+    :return: (...) ndarray
+    """
+    return np.sqrt(np.einsum("...i,...i->...", quats, quats))
+
+
+def quat_dot(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Dot product of each pair of quaternions of two (..., 4) arrays
+    :param left: (..., 4) ndarray
+    :param right: (..., 4) ndarray
+    :return: (...) ndarray
+    """
+    return np.sum(left * right, axis=-1)
+
+
+def quat_normalize(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Normalize each quaternion of a (..., 4) array, zero quaternions become the identity
+    :param quats: (..., 4) ndarray
+    :param out: optional (..., 4) ndarray receiving the result (may alias quats)
+    :return: (..., 4) ndarray
+    """
+    norms = quat_norm(quats)
+    zeros = np.isclose(norms, 0.0)
+    norms = np.where(zeros, 1.0, norms)
+
+    out = np.divide(quats, norms[..., np.newaxis], out=out)
+    out[zeros] = [1.0, 0.0, 0.0, 0.0]
+    return out
+
+
+def quat_to_rot_matrix(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Rotation matrices corresponding to a (..., 4) array of quaternions
+    :param quats: (..., 4) ndarray
+    :param out: optional (..., 3, 3) ndarray receiving the result
+    :return: (..., 3, 3) ndarray
+    """
+    q0, q1, q2, q3 = quats[..., 0], quats[..., 1], quats[..., 2], quats[..., 3]
+
+    q1q0 = q1 * q0
+    q2q0 = q2 * q0
+    q3q0 = q3 * q0
+    q1q1 = q1 * q1
+    q2q1 = q2 * q1
+    q3q1 = q3 * q1
+    q2q2 = q2 * q2
+    q3q2 = q3 * q2
+    q3q3 = q3 * q3
+
+    if out is None:
+        out = np.empty(quats.shape[:-1] + (3, 3), dtype=float)
+
+    out[..., 0, 0] = 1 - 2 * (q2q2 + q3q3)
+    out[..., 0, 1] = 2 * (q2q1 - q3q0)
+    out[..., 0, 2] = 2 * (q3q1 + q2q0)
+    out[..., 1, 0] = 2 * (q2q1 + q3q0)
+    out[..., 1, 1] = 1 - 2 * (q1q1 + q3q3)
+    out[..., 1, 2] = 2 * (q3q2 - q1q0)
+    out[..., 2, 0] = 2 * (q3q1 - q2q0)
+    out[..., 2, 1] = 2 * (q3q2 + q1q0)
+    out[..., 2, 2] = 1 - 2 * (q1q1 + q2q2)
+    return out
+
+
+def quat_to_euler_angles(quats: np.ndarray) -> np.ndarray:
+    """
+    Euler angles [roll, pitch, yaw] of a (..., 4) array of quaternions,
+    same conversion as Quaternion.to_euler_angles
+    :param quats: (..., 4) ndarray
+    :return: (..., 3) ndarray
+    """
+    q0, q1, q2, q3 = quats[..., 0], quats[..., 1], quats[..., 2], quats[..., 3]
+    y2 = q2 * q2
+
+    angles = np.empty(quats.shape[:-1] + (3,), dtype=float)
+    angles[..., 0] = np.arctan2(2.0 * (q0 * q1 + q2 * q3), 1.0 - 2.0 * (q1 * q1 + y2))
+    angles[..., 1] = np.arcsin(np.clip(2.0 * (q0 * q2 - q3 * q1), -1.0, 1.0))
+    angles[..., 2] = np.arctan2(2.0 * (q0 * q3 + q1 * q2), 1.0 - 2.0 * (y2 + q3 * q3))
+    return angles
+
+
+def quat_from_euler_angles(roll, pitch, yaw) -> np.ndarray:
+    """
+    Quaternions corresponding to arrays of Euler angles (broadcast together),
+    same conversion as Quaternion.from_euler_angles
+    :param roll: float or ndarray
+    :param pitch: float or ndarray
+    :param yaw: float or ndarray
+    :return: (..., 4) ndarray
+    """
+    roll, pitch, yaw = np.broadcast_arrays(np.asarray(roll, dtype=float),
+                                           np.asarray(pitch, dtype=float),
+                                           np.asarray(yaw, dtype=float))
+    cy = np.cos(yaw * 0.5)
+    sy = np.sin(yaw * 0.5)
+    cr = np.cos(roll * 0.5)
+    sr = np.sin(roll * 0.5)
+    cp = np.cos(pitch * 0.5)
+    sp = np.sin(pitch * 0.5)
+
+    quats = np.empty(roll.shape + (4,), dtype=float)
+    quats[..., 0] = cy * cr * cp + sy * sr * sp
+    quats[..., 1] = cy * sr * cp - sy * cr * sp
+    quats[..., 2] = cy * cr * sp + sy * sr * cp
+    quats[..., 3] = sy * cr * cp - cy * sr * sp
+    return quats
+
+
+def quat_slerp(starts: np.ndarray, ends: np.ndarray, coeffs: np.ndarray,
+               shortest_path: bool, dot_threshold: float) -> np.ndarray:
+    """
+    Spherical linear interpolation of (..., 4) quaternions with (...) coefficients (broadcast together).
+    The quaternions are normalized and each element falls back on nlerp when |start . end| > dot_threshold
+    :param starts: (..., 4) ndarray
+    :param ends: (..., 4) ndarray
+    :param coeffs: (...) ndarray
+    :param shortest_path: Takes the shortest path between the two orientations
+    :param dot_threshold: Threshold of the dot product above which nlerp is used
+    :return: (..., 4) ndarray
+    """
+    coeffs = np.asarray(coeffs, dtype=float)[..., np.newaxis]
+    starts = quat_normalize(starts)
+    ends = quat_normalize(ends)
+    dot = quat_dot(starts, ends)[..., np.newaxis]
+
+    close = np.abs(dot) > dot_threshold
+    linear = quat_normalize(starts * (1 - coeffs) + ends * coeffs)
+
+    if shortest_path:
+        flip = (dot < 0.0) & ~close
+        ends = np.where(flip, -ends, ends)
+        dot = np.where(flip, -dot, dot)
+
+    dot = np.clip(dot, -1.0, 1.0)
+    delta_angle = np.arccos(dot) * coeffs
+
+    end_normal = quat_normalize(ends - starts * dot)
+    spherical = end_normal * np.sin(delta_angle) + starts * np.cos(delta_angle)
+    return np.where(close, linear, spherical)
+
+
+def quat_rotate_vectors(quats: np.ndarray, points: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Rotate the (..., 3) points by the unit quaternions (..., 4) (broadcast together)
+    using the expansion of q * v * q^-1: v' = v + q0 * t + qv x t with t = 2 * qv x v
+    :param quats: (..., 4) ndarray
+    :param points: (..., 3) ndarray
+    :param out: optional (..., 3) ndarray receiving the result (may alias points)
+    :return: (..., 3) ndarray
+    """
+    quat_vec = quats[..., 1:4]
+
+    tmp = np.cross(quat_vec, points)
+    tmp *= 2.0
+    cross = np.cross(quat_vec, tmp)
+    tmp *= quats[..., 0:1]
+
+    if out is None:
+        out = np.empty(np.broadcast_shapes(tmp.shape, points.shape), dtype=float)
+
+    np.add(points, tmp, out=out)
+    out += cross
+    return out
+
+
+def rot_matrix_to_quat(matrices: np.ndarray) -> np.ndarray:
+    """
+    Unit quaternions (with q0 >= 0) corresponding to (..., 3, 3) rotation matrices.
+    Uses Shepperd's method: the four products 4 * q_k * q are computed and the one with
+    the largest 4 * q_k^2 is normalized, which keeps the conversion stable for any rotation
+    :param matrices: (..., 3, 3) ndarray
+    :return: (..., 4) ndarray
+    """
+    r00, r01, r02 = matrices[..., 0, 0], matrices[..., 0, 1], matrices[..., 0, 2]
+    r10, r11, r12 = matrices[..., 1, 0], matrices[..., 1, 1], matrices[..., 1, 2]
+    r20, r21, r22 = matrices[..., 2, 0], matrices[..., 2, 1], matrices[..., 2, 2]
+
+    # products[..., k, :] = 4 * q_k * [q0, q1, q2, q3]
+    products = np.empty(matrices.shape[:-2] + (4, 4), dtype=float)
+    products[..., 0, 0] = 1.0 + r00 + r11 + r22
+    products[..., 1, 1] = 1.0 + r00 - r11 - r22
+    products[..., 2, 2] = 1.0 - r00 + r11 - r22
+    products[..., 3, 3] = 1.0 - r00 - r11 + r22
+    products[..., 0, 1] = products[..., 1, 0] = r21 - r12
+    products[..., 0, 2] = products[..., 2, 0] = r02 - r20
+    products[..., 0, 3] = products[..., 3, 0] = r10 - r01
+    products[..., 1, 2] = products[..., 2, 1] = r01 + r10
+    products[..., 1, 3] = products[..., 3, 1] = r02 + r20
+    products[..., 2, 3] = products[..., 3, 2] = r12 + r21
+
+    best = np.argmax(np.diagonal(products, axis1=-2, axis2=-1), axis=-1)
+    quats = np.take_along_axis(products, best[..., np.newaxis, np.newaxis], axis=-2)[..., 0, :]
+
+    quats /= quat_norm(quats)[..., np.newaxis]
+    quats *= np.where(quats[..., 0:1] < 0.0, -1.0, 1.0)
+    return quats
+
+
+SMALL_ANGLE = 1e-4
+
+
+def quat_exp(quats: np.ndarray) -> np.ndarray:
+    """
+    Exponential map of (..., 4) pure quaternions [0, theta * axis] to the unit quaternions
+    of angle theta around axis (inverse of quat_log). A series expansion is used for small angles
+    :param quats: (..., 4) ndarray, only the vector part is used
+    :return: (..., 4) ndarray
+    """
+    vecs = quats[..., 1:4]
+    angles = np.sqrt(np.einsum("...i,...i->...", vecs, vecs))
+    small = angles < SMALL_ANGLE
+
+    # sin(theta / 2) / theta
+    safe_angles = np.where(small, 1.0, angles)
+    ratios = np.where(small,
+                      0.5 - angles * angles / 48.0,
+                      np.sin(0.5 * safe_angles) / safe_angles)
+
+    out = np.empty(np.shape(quats), dtype=float)
+    out[..., 0] = np.cos(0.5 * angles)
+    np.multiply(vecs, ratios[..., np.newaxis], out=out[..., 1:4])
+    return out
+
+
+def quat_log(quats: np.ndarray) -> np.ndarray:
+    """
+    Logarithm of (..., 4) unit quaternions using the convention of quaternion_log:
+    [0, theta * axis] with theta the full rotation angle in [0 .. 2 PI].
+    A series expansion is used for small angles
+    :param quats: (..., 4) ndarray
+    :return: (..., 4) ndarray
+    """
+    vecs = quats[..., 1:4]
+    cosines = quats[..., 0]
+    sines = np.sqrt(np.einsum("...i,...i->...", vecs, vecs))
+
+    small = (sines < SMALL_ANGLE) & (cosines > 0.0)
+    null_axis = np.all(np.abs(vecs) <= 1e-8, axis=-1) & ~small
+
+    # theta / sin(theta / 2) = 2 * atan(x) / (x * cos(theta / 2)) with x = tan(theta / 2)
+    safe_cosines = np.where(small, cosines, 1.0)
+    tangents = sines / safe_cosines
+    safe_sines = np.where(small | null_axis, 1.0, sines)
+    ratios = np.where(small,
+                      2.0 / safe_cosines * (1.0 - tangents * tangents / 3.0),
+                      2.0 * np.arctan2(sines, cosines) / safe_sines)
+
+    out = np.zeros(np.shape(quats), dtype=float)
+    np.multiply(vecs, ratios[..., np.newaxis], out=out[..., 1:4])
+    # no axis: same choice as Quaternion.get_axis
+    out[..., 1] = np.where(null_axis, 2.0 * np.arctan2(sines, cosines), out[..., 1])
+    return out
+
+
+BACKEND_ENV_VAR = "QUATERNION_SIM_BACKEND"
+BACKENDS = ("numpy", "numba")
+
+_NUMPY_KERNELS = {name: globals()[name] for name in ("quat_mul", "quat_normalize", "quat_to_rot_matrix",
+                                                     "quat_to_euler_angles", "quat_from_euler_angles",
+                                                     "quat_rotate_vectors", "quat_slerp")}
+_backend = "numpy"
+
+
+def available_backends() -> List[str]:
+    """
+    Returns the names of the backends which can be selected
+    """
+    try:
+        from . import numba_kernels
+    except ImportError:
+        return ["numpy"]
+    return list(BACKENDS)
+
+
+def get_backend() -> str:
+    """
+    Returns the name of the selected backend
+    """
+    return _backend
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    Selects the implementation of the kernels for all the geometry classes
+    :param name: "numpy", "numba" or "auto" (numba if it can be imported, numpy otherwise)
+    :return: name of the selected backend
+    """
+    global _backend
+    assert name in BACKENDS + ("auto",), "The backend should be one of {0} or auto".format(BACKENDS)
+
+    kernels = dict(_NUMPY_KERNELS)
+    selected = "numpy"
+    if name != "numpy":
+        try:
+            from . import numba_kernels
+        except ImportError:
+            if name == "numba":
+                raise
+        else:
+            kernels.update(numba_kernels.KERNELS)
+            selected = "numba"
+
+    globals().update(kernels)
+    _backend = selected
+    return selected
+
+
+def _init_backend() -> None:
+    name = os.environ.get(BACKEND_ENV_VAR, "auto").strip().lower()
+    try:
+        set_backend(name)
+    except (AssertionError, ImportError) as error:
+        warnings.warn("{0}={1} cannot be used ({2}), falling back on numpy".format(BACKEND_ENV_VAR, name, error))
+        set_backend("numpy")
+
+
+_init_backend()
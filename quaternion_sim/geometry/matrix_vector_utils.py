@@ -1,24 +1,53 @@
+import numpy as np
 from numpy import matrix, ndarray, dot
 
 
+def as_vectors(vec: ndarray) -> ndarray:
+    """
+    Return vec as a float ndarray, a (n, 1) column vector being flattened to (n,)
+    (it would be taken for a stack of n vectors of size 1 otherwise)
+    """
+    vec = np.asarray(vec, dtype=float)
+    if vec.ndim == 2 and vec.shape[1] == 1:
+        return vec.reshape(-1)
+    return vec
+
+
 def tensor_product(vec_left: ndarray, vec_right: ndarray) -> matrix:
     """
-    Return the tensor product of two vectors
+    Return the tensor product of two vectors (n,) or (n, 1)
+    or the (N, n, n) stack of the tensor products of two (N, n) stacks of vectors
     """
-    assert vec_left.size == vec_right.size, "the two vectors must have the same size"
+    vec_left = as_vectors(vec_left)
+    vec_right = as_vectors(vec_right)
+    assert vec_left.shape[-1] == vec_right.shape[-1], "the two vectors must have the same size"
 
-    return matrix([[vl * vr for vr in vec_right] for vl in vec_left])
+    if vec_left.ndim <= 1 and vec_right.ndim <= 1:
+        return matrix(np.outer(vec_left, vec_right))
+    return vec_left[..., :, np.newaxis] * vec_right[..., np.newaxis, :]
 
 
 def cross_product_matrix(vec: ndarray) -> matrix:
     """
-    Return the cross product matrix of vector vec
+    Return the cross product matrix of vector vec (3,) or (3, 1)
+    or the (N, 3, 3) stack of the cross product matrices of the (N, 3) vectors
     """
-    assert vec.size == 3, "the vector must have a size of 3"
+    vec = as_vectors(vec)
+    assert vec.shape[-1] == 3, "the vector must have a size of 3"
 
-    return matrix([[0, -vec[2], vec[1]],
-                   [vec[2], 0, -vec[0]],
-                   [-vec[1], vec[0], 0]])
+    if vec.ndim <= 1:
+        return matrix([[0, -vec[2], vec[1]],
+                       [vec[2], 0, -vec[0]],
+                       [-vec[1], vec[0], 0]])
+
+    mats = np.zeros(vec.shape + (3,), dtype=float)
+    mats[..., 0, 1] = -vec[..., 2]
+    mats[..., 0, 2] = vec[..., 1]
+    mats[..., 1, 0] = vec[..., 2]
+    mats[..., 1, 2] = -vec[..., 0]
+    mats[..., 2, 0] = -vec[..., 1]
+    mats[..., 2, 1] = vec[..., 0]
+    return mats
 
 
 def vectorize(vec: ndarray) -> ndarray:
@@ -29,4 +58,11 @@ def vectorize(vec: ndarray) -> ndarray:
 
 
 def matrix_vector_mul(mat: matrix, vec: ndarray):
-    return dot(mat, vec.reshape(3, 1)).reshape(3, 1)
+    """
+    Return the product of the matrix by the vector as a (3, 1) ndarray
+    or the (N, 3) products of the (N, 3, 3) matrices by the (N, 3) vectors
+    (a single matrix or a single vector is broadcast)
+    """
+    if np.ndim(mat) <= 2 and np.size(vec) == 3:
+        return dot(mat, vec.reshape(3, 1)).reshape(3, 1)
+    return np.einsum("...ij,...j->...i", np.asarray(mat, dtype=float), np.asarray(vec, dtype=float))
@@ -0,0 +1,225 @@
+"""
+Numba compiled implementations of the hot kernels of kernels.py, selected with
+kernels.set_backend("numba"). Importing this module raises ImportError when Numba is not installed.
+
+Each kernel has the signature and broadcasting rules of its NumPy counterpart: the
+operands are broadcast and flattened to contiguous rows, then a compiled loop
+processes one quaternion per iteration, which removes the temporaries created
+by the NumPy expressions.
+"""
+from math import sqrt, sin, cos, acos, atan2, asin
+
+import numpy as np
+from numba import njit
+
+
+NULL_NORM = 1e-8
+
+
+def _rows(array, lead_shape: tuple, item_shape: tuple) -> np.ndarray:
+    """
+    Returns array broadcast to lead_shape + item_shape as contiguous float rows (M, *item_shape)
+    """
+    array = np.asarray(array, dtype=float)
+    shape = lead_shape + item_shape
+    if array.shape != shape or not array.flags.writeable:
+        # broadcast views are read-only, they are materialized as numba warns when they are passed to the kernels
+        array = np.array(np.broadcast_to(array, shape), dtype=float, copy=True)
+    return np.ascontiguousarray(array).reshape((-1,) + item_shape)
+
+
+def _call(kernel, out: np.ndarray, lead_shape: tuple, item_shape: tuple, *args) -> np.ndarray:
+    """
+    Runs kernel(*args, out_rows) and returns the (lead_shape + item_shape) result,
+    written in out if given (rows are read before being written so out may alias an input)
+    """
+    result = out
+    if out is None or not out.flags.c_contiguous or out.dtype != np.float64:
+        result = np.empty(lead_shape + item_shape, dtype=float)
+
+    kernel(*args, result.reshape((-1,) + item_shape))
+
+    if out is not None and result is not out:
+        out[...] = result
+        return out
+    return result
+
+
+@njit(cache=True)
+def _mul_rows(left, right, out):
+    for i in range(out.shape[0]):
+        l0, l1, l2, l3 = left[i, 0], left[i, 1], left[i, 2], left[i, 3]
+        r0, r1, r2, r3 = right[i, 0], right[i, 1], right[i, 2], right[i, 3]
+        out[i, 0] = l0 * r0 - l1 * r1 - l2 * r2 - l3 * r3
+        out[i, 1] = l0 * r1 + l1 * r0 + l2 * r3 - l3 * r2
+        out[i, 2] = l0 * r2 + l2 * r0 + l3 * r1 - l1 * r3
+        out[i, 3] = l0 * r3 + l3 * r0 + l1 * r2 - l2 * r1
+
+
+@njit(cache=True)
+def _normalize_rows(quats, out):
+    for i in range(out.shape[0]):
+        q0, q1, q2, q3 = quats[i, 0], quats[i, 1], quats[i, 2], quats[i, 3]
+        norm = sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        if norm <= NULL_NORM:
+            out[i, 0], out[i, 1], out[i, 2], out[i, 3] = 1.0, 0.0, 0.0, 0.0
+        else:
+            out[i, 0], out[i, 1], out[i, 2], out[i, 3] = q0 / norm, q1 / norm, q2 / norm, q3 / norm
+
+
+@njit(cache=True)
+def _to_rot_matrix_rows(quats, out):
+    for i in range(out.shape[0]):
+        q0, q1, q2, q3 = quats[i, 0], quats[i, 1], quats[i, 2], quats[i, 3]
+        q1q0 = q1 * q0
+        q2q0 = q2 * q0
+        q3q0 = q3 * q0
+        q1q1 = q1 * q1
+        q2q1 = q2 * q1
+        q3q1 = q3 * q1
+        q2q2 = q2 * q2
+        q3q2 = q3 * q2
+        q3q3 = q3 * q3
+
+        out[i, 0, 0] = 1 - 2 * (q2q2 + q3q3)
+        out[i, 0, 1] = 2 * (q2q1 - q3q0)
+        out[i, 0, 2] = 2 * (q3q1 + q2q0)
+        out[i, 1, 0] = 2 * (q2q1 + q3q0)
+        out[i, 1, 1] = 1 - 2 * (q1q1 + q3q3)
+        out[i, 1, 2] = 2 * (q3q2 - q1q0)
+        out[i, 2, 0] = 2 * (q3q1 - q2q0)
+        out[i, 2, 1] = 2 * (q3q2 + q1q0)
+        out[i, 2, 2] = 1 - 2 * (q1q1 + q2q2)
+
+
+@njit(cache=True)
+def _to_euler_angles_rows(quats, out):
+    for i in range(out.shape[0]):
+        q0, q1, q2, q3 = quats[i, 0], quats[i, 1], quats[i, 2], quats[i, 3]
+        y2 = q2 * q2
+        sin_pitch = min(max(2.0 * (q0 * q2 - q3 * q1), -1.0), 1.0)
+        out[i, 0] = atan2(2.0 * (q0 * q1 + q2 * q3), 1.0 - 2.0 * (q1 * q1 + y2))
+        out[i, 1] = asin(sin_pitch)
+        out[i, 2] = atan2(2.0 * (q0 * q3 + q1 * q2), 1.0 - 2.0 * (y2 + q3 * q3))
+
+
+@njit(cache=True)
+def _from_euler_angles_rows(angles, out):
+    for i in range(out.shape[0]):
+        cy = cos(angles[i, 2] * 0.5)
+        sy = sin(angles[i, 2] * 0.5)
+        cr = cos(angles[i, 0] * 0.5)
+        sr = sin(angles[i, 0] * 0.5)
+        cp = cos(angles[i, 1] * 0.5)
+        sp = sin(angles[i, 1] * 0.5)
+        out[i, 0] = cy * cr * cp + sy * sr * sp
+        out[i, 1] = cy * sr * cp - sy * cr * sp
+        out[i, 2] = cy * cr * sp + sy * sr * cp
+        out[i, 3] = sy * cr * cp - cy * sr * sp
+
+
+@njit(cache=True)
+def _rotate_vectors_rows(quats, points, out):
+    for i in range(out.shape[0]):
+        q0, q1, q2, q3 = quats[i, 0], quats[i, 1], quats[i, 2], quats[i, 3]
+        v0, v1, v2 = points[i, 0], points[i, 1], points[i, 2]
+        # t = 2 * qv x v, v' = v + q0 * t + qv x t
+        t0 = 2.0 * (q2 * v2 - q3 * v1)
+        t1 = 2.0 * (q3 * v0 - q1 * v2)
+        t2 = 2.0 * (q1 * v1 - q2 * v0)
+        out[i, 0] = v0 + q0 * t0 + q2 * t2 - q3 * t1
+        out[i, 1] = v1 + q0 * t1 + q3 * t0 - q1 * t2
+        out[i, 2] = v2 + q0 * t2 + q1 * t1 - q2 * t0
+
+
+@njit(cache=True)
+def _normalized(q0, q1, q2, q3):
+    norm = sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    if norm <= NULL_NORM:
+        return 1.0, 0.0, 0.0, 0.0
+    return q0 / norm, q1 / norm, q2 / norm, q3 / norm
+
+
+@njit(cache=True)
+def _slerp_rows(starts, ends, coeffs, shortest_path, dot_threshold, out):
+    for i in range(out.shape[0]):
+        s0, s1, s2, s3 = _normalized(starts[i, 0], starts[i, 1], starts[i, 2], starts[i, 3])
+        e0, e1, e2, e3 = _normalized(ends[i, 0], ends[i, 1], ends[i, 2], ends[i, 3])
+        coeff = coeffs[i]
+        dot = s0 * e0 + s1 * e1 + s2 * e2 + s3 * e3
+
+        if abs(dot) > dot_threshold:
+            out[i, 0], out[i, 1], out[i, 2], out[i, 3] = _normalized(s0 * (1 - coeff) + e0 * coeff,
+                                                                     s1 * (1 - coeff) + e1 * coeff,
+                                                                     s2 * (1 - coeff) + e2 * coeff,
+                                                                     s3 * (1 - coeff) + e3 * coeff)
+            continue
+
+        if shortest_path and dot < 0.0:
+            e0, e1, e2, e3 = -e0, -e1, -e2, -e3
+            dot = -dot
+
+        dot = min(max(dot, -1.0), 1.0)
+        delta_angle = acos(dot) * coeff
+        n0, n1, n2, n3 = _normalized(e0 - s0 * dot, e1 - s1 * dot, e2 - s2 * dot, e3 - s3 * dot)
+        sine = sin(delta_angle)
+        cosine = cos(delta_angle)
+        out[i, 0] = n0 * sine + s0 * cosine
+        out[i, 1] = n1 * sine + s1 * cosine
+        out[i, 2] = n2 * sine + s2 * cosine
+        out[i, 3] = n3 * sine + s3 * cosine
+
+
+def quat_mul(left: np.ndarray, right: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    lead_shape = np.broadcast_shapes(np.shape(left)[:-1], np.shape(right)[:-1])
+    return _call(_mul_rows, out, lead_shape, (4,),
+                 _rows(left, lead_shape, (4,)), _rows(right, lead_shape, (4,)))
+
+
+def quat_normalize(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    lead_shape = np.shape(quats)[:-1]
+    return _call(_normalize_rows, out, lead_shape, (4,), _rows(quats, lead_shape, (4,)))
+
+
+def quat_to_rot_matrix(quats: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    lead_shape = np.shape(quats)[:-1]
+    return _call(_to_rot_matrix_rows, out, lead_shape, (3, 3), _rows(quats, lead_shape, (4,)))
+
+
+def quat_to_euler_angles(quats: np.ndarray) -> np.ndarray:
+    lead_shape = np.shape(quats)[:-1]
+    return _call(_to_euler_angles_rows, None, lead_shape, (3,), _rows(quats, lead_shape, (4,)))
+
+
+def quat_from_euler_angles(roll, pitch, yaw) -> np.ndarray:
+    lead_shape = np.broadcast_shapes(np.shape(roll), np.shape(pitch), np.shape(yaw))
+    angles = np.empty(lead_shape + (3,), dtype=float)
+    angles[..., 0] = roll
+    angles[..., 1] = pitch
+    angles[..., 2] = yaw
+    return _call(_from_euler_angles_rows, None, lead_shape, (4,), angles.reshape(-1, 3))
+
+
+def quat_rotate_vectors(quats: np.ndarray, points: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    lead_shape = np.broadcast_shapes(np.shape(quats)[:-1], np.shape(points)[:-1])
+    return _call(_rotate_vectors_rows, out, lead_shape, (3,),
+                 _rows(quats, lead_shape, (4,)), _rows(points, lead_shape, (3,)))
+
+
+def quat_slerp(starts: np.ndarray, ends: np.ndarray, coeffs: np.ndarray,
+               shortest_path: bool, dot_threshold: float) -> np.ndarray:
+    lead_shape = np.broadcast_shapes(np.shape(starts)[:-1], np.shape(ends)[:-1], np.shape(coeffs))
+    return _call(_slerp_rows, None, lead_shape, (4,),
+                 _rows(starts, lead_shape, (4,)), _rows(ends, lead_shape, (4,)),
+                 _rows(coeffs, lead_shape, ()), bool(shortest_path), float(dot_threshold))
+
+
+KERNELS = {
+    "quat_mul": quat_mul,
+    "quat_normalize": quat_normalize,
+    "quat_to_rot_matrix": quat_to_rot_matrix,
+    "quat_to_euler_angles": quat_to_euler_angles,
+    "quat_from_euler_angles": quat_from_euler_angles,
+    "quat_rotate_vectors": quat_rotate_vectors,
+    "quat_slerp": quat_slerp,
+}
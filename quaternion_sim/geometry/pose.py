@@ -1,4 +1,4 @@
-from numpy import ndarray, array, allclose
+from numpy import ndarray, array, allclose, empty, matmul
 from .quaternion import Quaternion
 
 
@@ -7,20 +7,108 @@ class Pose(object):
                  orientation: Quaternion = Quaternion(),
                  position: ndarray = array([0, 0, 0], dtype=float)) -> None:
 
-        self.orientation = orientation
+        # the orientation is copied as the pose rotates it in place
+        self.orientation = Quaternion(orientation._array)
 
         assert position.shape == (3,) or position.shape == (3, 1), \
             "The position should be an array of size (3,1)"
         self.position = position.astype(dtype=float).reshape(3, 1)
 
+        self._transform_key = None
+
+    @classmethod
+    def _wrap(cls, orientation: Quaternion, position: ndarray) -> 'Pose':
+        """
+        Returns a Pose using orientation and the float (3, 1) position without copying them
+        """
+        pose = cls.__new__(cls)
+        pose.orientation = orientation
+        pose.position = position
+        pose._transform_key = None
+        return pose
+
+    def copy(self, out: 'Pose' = None) -> 'Pose':
+        """
+        Returns a copy of the pose, written in out if given (its buffers are reused)
+        :param out: Pose receiving the copy
+        :return: Pose
+        """
+        if out is None:
+            return Pose._wrap(self.orientation.copy(), self.position.copy())
+
+        self.orientation.copy(out.orientation)
+        out.position[:] = self.position
+        return out
+
+    def __copy__(self) -> 'Pose':
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> 'Pose':
+        return self.copy()
+
     def translate(self, translation: ndarray) -> None:
-        self.position += translation.astype(float).reshape(3, 1)
+        self.position += translation.reshape(3, 1)
 
     def rotate(self, orientation: Quaternion) -> None:
-        self.orientation = orientation * self.orientation
+        self.orientation.rotate_inplace(orientation)
 
     def inverse(self) -> 'Pose':
-        return Pose(self.orientation.get_inverse(), -1 * self.position)
+        """
+        Returns the inverse transform: orientation q^-1 and position -R^T p
+        """
+        position = matmul(self.orientation.to_rot_array().T, self.position)
+        position *= -1.0
+        return Pose._wrap(self.orientation.get_inverse(), position)
+
+    def compose(self, pose: 'Pose') -> 'Pose':
+        """
+        Returns the pose self * pose: pose being expressed in the frame given by self,
+        the result is the same pose expressed in the reference frame of self
+        (orientation q_self * q_pose and position p_self + R_self p_pose)
+        """
+        position = matmul(self.orientation.to_rot_array(), pose.position)
+        position += self.position
+        return Pose._wrap(self.orientation * pose.orientation, position)
+
+    def to_transform(self) -> ndarray:
+        """
+        Returns the read-only (4, 4) homogeneous transform [[R, p], [0, 0, 0, 1]].
+        The transform is memoized and rebuilt only when the orientation or position values change
+        """
+        key = self.orientation[:].tolist() + self.position.ravel().tolist()
+        if key == self._transform_key:
+            return self._transform
+
+        transform = empty((4, 4), dtype=float)
+        transform[0:3, 0:3] = self.orientation.to_rot_array()
+        transform[0:3, 3] = key[4:7]
+        transform[3] = (0.0, 0.0, 0.0, 1.0)
+        transform.flags.writeable = False
+
+        self._transform = transform
+        self._transform_key = key
+        return transform
+
+    @staticmethod
+    def from_transform(transform: ndarray) -> 'Pose':
+        """
+        Returns the Pose of a (4, 4) or (3, 4) homogeneous transform
+        """
+        return Pose._wrap(Quaternion.from_rot_matrix(transform[0:3, 0:3]),
+                          array(transform[0:3, 3], dtype=float).reshape(3, 1))
+
+    def transform_points(self, points: ndarray, out: ndarray = None) -> ndarray:
+        """
+        Returns the (N, 3) points expressed in the frame given by the pose
+        expressed in its reference frame: R p + t for each point
+        :param points: (N, 3) ndarray
+        :param out: optional (N, 3) ndarray receiving the result (may not be points)
+        :return: (N, 3) ndarray
+        """
+        transform = self.to_transform()
+        out = matmul(points, transform[0:3, 0:3].T, out=out)
+        out += transform[0:3, 3]
+        return out
 
     def is_equal(self, pose: 'Pose') -> 'Pose':
         """
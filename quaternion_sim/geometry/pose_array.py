@@ -0,0 +1,199 @@
+from typing import Union, List, Iterator
+import numpy as np
+
+from .quaternion import Quaternion
+from .quaternion_array import QuaternionArray, slerp_array
+from .pose import Pose
+from . import kernels
+
+
+class PoseArray(object):
+    """
+    Array of N poses stored as structure of arrays: the orientations in one
+    contiguous (N, 4) ndarray and the positions in one contiguous (N, 3) ndarray
+    """
+
+    def __init__(self,
+                 orientations: Union[QuaternionArray, np.ndarray, List] = None,
+                 positions: Union[np.ndarray, List] = None):
+        if orientations is None and positions is None:
+            orientations = np.empty((0, 4), dtype=float)
+        elif orientations is None:
+            orientations = QuaternionArray.identity(np.reshape(positions, (-1, 3)).shape[0])
+
+        self._orientations = np.array(orientations, dtype=float).reshape(-1, 4)
+
+        if positions is None:
+            self._positions = np.zeros((self._orientations.shape[0], 3), dtype=float)
+        else:
+            self._positions = np.array(positions, dtype=float).reshape(-1, 3)
+
+        assert self._orientations.shape[0] == self._positions.shape[0], \
+            "There should be as many orientations as positions"
+
+    @classmethod
+    def _wrap(cls, orientations: np.ndarray, positions: np.ndarray) -> "PoseArray":
+        """
+        Returns a PoseArray using orientations (N, 4) and positions (N, 3) as buffers without copying them
+        """
+        poses = cls.__new__(cls)
+        poses._orientations = orientations
+        poses._positions = positions
+        return poses
+
+    @staticmethod
+    def from_poses(poses: List[Pose]) -> "PoseArray":
+        """
+        Returns a PoseArray holding a copy of the poses
+        """
+        return PoseArray._wrap(np.array([pose.orientation[:] for pose in poses], dtype=float).reshape(-1, 4),
+                               np.array([pose.position.ravel() for pose in poses], dtype=float).reshape(-1, 3))
+
+    @staticmethod
+    def identity(size: int) -> "PoseArray":
+        """
+        Returns size identity poses
+        """
+        return PoseArray._wrap(QuaternionArray.identity(size).array, np.zeros((size, 3), dtype=float))
+
+    @property
+    def orientations(self) -> QuaternionArray:
+        """
+        The orientations, viewing the (N, 4) buffer
+        """
+        return QuaternionArray._wrap(self._orientations)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        The (N, 3) positions buffer
+        """
+        return self._positions
+
+    def translate(self, translations: np.ndarray) -> None:
+        self._positions += np.reshape(translations, (-1, 3))
+
+    def rotate(self, orientations: Union[QuaternionArray, Quaternion]) -> None:
+        kernels.quat_mul(orientations._array, self._orientations, out=self._orientations)
+
+    def compose(self, poses: Union["PoseArray", Pose]) -> "PoseArray":
+        """
+        Returns the poses self * poses (see Pose.compose), self and poses being broadcast together
+        """
+        orientations, positions = _as_pose_arrays(poses)
+        return PoseArray._wrap(kernels.quat_mul(self._orientations, orientations),
+                               self._positions + kernels.quat_rotate_vectors(self._orientations, positions))
+
+    def inverse(self) -> "PoseArray":
+        """
+        Returns the inverse transforms (see Pose.inverse)
+        """
+        orientations = kernels.quat_conjugate(self._orientations)
+        positions = kernels.quat_rotate_vectors(orientations, self._positions)
+        np.negative(positions, out=positions)
+        return PoseArray._wrap(orientations, positions)
+
+    def relative(self, poses: Union["PoseArray", Pose]) -> "PoseArray":
+        """
+        Returns the poses expressed in the frames given by self: self^-1 * poses
+        """
+        orientations, positions = _as_pose_arrays(poses)
+        inv_orientations = kernels.quat_conjugate(self._orientations)
+        return PoseArray._wrap(kernels.quat_mul(inv_orientations, orientations),
+                               kernels.quat_rotate_vectors(inv_orientations, positions - self._positions))
+
+    def interpolate(self,
+                    poses: Union["PoseArray", Pose],
+                    coeff: Union[float, np.ndarray],
+                    shortest_path: bool = True) -> "PoseArray":
+        """
+        Returns the interpolation between self and poses: slerp of the orientations
+        and linear interpolation of the positions (self, poses and coeff are broadcast together)
+        :param poses: End poses
+        :param coeff: Interpolation coefficient(s)
+        :param shortest_path: Takes the shortest path between the orientations
+        :return: PoseArray
+        """
+        orientations, positions = _as_pose_arrays(poses)
+        coeffs = np.reshape(np.asarray(coeff, dtype=float), (-1, 1))
+        quats = slerp_array(QuaternionArray._wrap(self._orientations),
+                            QuaternionArray._wrap(orientations),
+                            coeffs, shortest_path)
+        return PoseArray._wrap(quats.array,
+                               self._positions * (1.0 - coeffs) + positions * coeffs)
+
+    def is_equal(self, poses: Union["PoseArray", Pose]) -> np.ndarray:
+        """
+        Returns for each pose True if it is equal to the corresponding pose of poses.
+        The rotation matrices are compared (see Pose.is_equal) as q and -q represent the same rotation
+        :return: (N,) ndarray of bool
+        """
+        orientations, positions = _as_pose_arrays(poses)
+        same_positions = np.all(np.isclose(self._positions, positions), axis=-1)
+        same_rotations = np.all(np.isclose(kernels.quat_to_rot_matrix(self._orientations),
+                                           kernels.quat_to_rot_matrix(orientations),
+                                           10**(-10), 10**(-10)), axis=(-2, -1))
+        return same_positions & same_rotations
+
+    def to_transform(self) -> np.ndarray:
+        """
+        Returns the (N, 4, 4) homogeneous transforms
+        """
+        transforms = np.zeros((len(self), 4, 4), dtype=float)
+        kernels.quat_to_rot_matrix(self._orientations, out=transforms[:, 0:3, 0:3])
+        transforms[:, 0:3, 3] = self._positions
+        transforms[:, 3, 3] = 1.0
+        return transforms
+
+    def transform_points(self, points: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the points expressed in the frames given by the poses expressed in their reference frame
+        :param points: (N, 3) ndarray, the point i is transformed by the pose i
+                       or (N, M, 3) ndarray, the M points of the set i are transformed by the pose i
+        :param out: optional ndarray of the same shape as points receiving the result
+        :return: numpy.ndarray
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim < 3:
+            orientations, positions = self._orientations, self._positions
+        else:
+            orientations, positions = self._orientations[:, np.newaxis], self._positions[:, np.newaxis]
+
+        out = kernels.quat_rotate_vectors(orientations, points, out)
+        out += positions
+        return out
+
+    def __len__(self) -> int:
+        return self._orientations.shape[0]
+
+    def __iter__(self) -> Iterator[Pose]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "positions: {0} \norientations: {1}".format(str(self._positions), str(self._orientations))
+
+    def __getitem__(self, item) -> Union[Pose, "PoseArray"]:
+        """
+        Integer indices return a Pose viewing the buffers (no copy): modifying it in place
+        (translate, rotate) modifies the array. Other indices follow numpy indexing.
+        """
+        if isinstance(item, (int, np.integer)):
+            return Pose._wrap(Quaternion._wrap(self._orientations[item]),
+                              self._positions[item].reshape(3, 1))
+        return PoseArray._wrap(self._orientations[item].reshape(-1, 4),
+                               self._positions[item].reshape(-1, 3))
+
+    def __setitem__(self, key, value: Union[Pose, "PoseArray"]):
+        orientations, positions = _as_pose_arrays(value)
+        self._orientations[key] = orientations
+        self._positions[key] = positions
+
+
+def _as_pose_arrays(poses: Union[PoseArray, Pose]):
+    """
+    Returns the orientations (N, 4) and positions (N, 3) arrays of poses
+    """
+    if isinstance(poses, PoseArray):
+        return poses._orientations, poses._positions
+    return poses.orientation[:].reshape(1, 4), poses.position.reshape(1, 3)
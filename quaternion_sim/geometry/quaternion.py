@@ -1,19 +1,45 @@
-from math import acos, cos, sin, atan2, asin
+from math import acos, cos, sin, atan2, asin, sqrt
+from numbers import Number
 from typing import Union, List
 import numpy as np
 
+from . import kernels
+
 RAD_TO_DEG = 180.0 / np.pi
 DOT_THRESHOLD = 0.9995
+# Quaternion or QuaternionArray, both wrap their data in _array
+QuaternionLike = Union["Quaternion", "QuaternionArray"]
+_CONJUGATE = np.array([1.0, -1.0, -1.0, -1.0])
 
 
 def sign(val):
     return 1 if val >= 0.0 else -1
 
 
+def _is_zero(values: List[float]) -> bool:
+    """
+    Returns True if all the values are close to zero (same tolerance as numpy.allclose)
+    """
+    return all(abs(val) <= 1e-8 for val in values)
+
+
+def _mul_values(left: List[float], right: List[float]) -> List[float]:
+    """
+    Hamilton product of two quaternions given as plain floats [q0, q1, q2, q3]
+    """
+    l0, l1, l2, l3 = left
+    r0, r1, r2, r3 = right
+    return [l0 * r0 - l1 * r1 - l2 * r2 - l3 * r3,
+            l0 * r1 + l1 * r0 + l2 * r3 - l3 * r2,
+            l0 * r2 + l2 * r0 + l3 * r1 - l1 * r3,
+            l0 * r3 + l3 * r0 + l1 * r2 - l2 * r1]
+
+
 class Quaternion(object):
     """
     This geometry uses the convention cos(theta/2) = q0, sin(theta/2)*axis = [q1, q2, q3]]
     """
+    __slots__ = ("_array", "_rot_key", "_rot_array", "_rot_matrix")
 
     def __init__(self, array: Union[np.ndarray, List[float]] = None):
         if array is None:
@@ -30,6 +56,18 @@ class Quaternion(object):
         else:
             raise ValueError("Cannot make a geometry from the given type")
 
+        self._rot_key = None
+
+    @classmethod
+    def _wrap(cls, array: np.ndarray) -> "Quaternion":
+        """
+        Returns a Quaternion using the float ndarray array (4,) as buffer without copying it
+        """
+        quat = cls.__new__(cls)
+        quat._array = array
+        quat._rot_key = None
+        return quat
+
     @property
     def q0(self):
         return self._array[0]
@@ -56,17 +94,20 @@ class Quaternion(object):
         Normalize Quaternion
         :return: None
         """
-        if np.allclose(self._array, np.array([0, 0, 0, 0], dtype=float)):
-            self._array = np.array([1, 0, 0, 0], dtype=float)
+        values = self._array.tolist()
+        if _is_zero(values):
+            self._array[:] = (1.0, 0.0, 0.0, 0.0)
         else:
-            self._array = self._array / np.linalg.norm(self._array)
+            self._array *= 1.0 / sqrt(sum(val * val for val in values))
+        self._rot_key = None
 
     def inverse(self) -> None:
         """
         Inverse Quaternion
         :return: None
         """
-        self._array[1:4] = -self._array[1:4]
+        np.negative(self._array[1:4], out=self._array[1:4])
+        self._rot_key = None
 
     def get_norm(self) -> float:
         """
@@ -80,9 +121,7 @@ class Quaternion(object):
         Returns Quaternion's inverse
         :return: Quaternion
         """
-        q0 = np.array(self._array[0])
-        qv = -self._array[1:4]
-        return Quaternion(np.insert(qv, 0, q0))
+        return Quaternion._wrap(self._array * _CONJUGATE)
 
     def get_log(self) -> 'Quaternion':
         """
@@ -96,7 +135,7 @@ class Quaternion(object):
         Returns Quaternion's axis
         :return: numpy.ndarray
         """
-        if np.allclose(self._array, np.array([0, 0, 0], dtype=float)):
+        if np.allclose(self._array[1:4], np.array([0, 0, 0], dtype=float)):
             return np.array([1, 0, 0], dtype=float)
         else:
             return self._array[1:4] / np.linalg.norm(self._array[1:4])
@@ -107,42 +146,70 @@ class Quaternion(object):
         :param rad: if true returns radians otherwise degrees
         :return: float
         """
+        q0 = self._array[0]
+        q0 = q0 if abs(q0) <= 1 else sign(q0)  # constrain q0 to 1 .. -1 for acos
+
         if rad:
-            return 2.0 * acos(self._array[0])
+            return 2.0 * acos(q0)
         else:
-            return 2.0 * acos(self._array[0]) * RAD_TO_DEG
+            return 2.0 * acos(q0) * RAD_TO_DEG
 
     def get_normalized(self) -> "Quaternion":
         """
         Returns normalized geometry
         :return: Quaternion
         """
-        if np.allclose(self._array, np.array([0, 0, 0, 0], dtype=float)):
+        values = self._array.tolist()
+        if _is_zero(values):
             return Quaternion.identity()
         else:
-            return Quaternion(self._array / np.linalg.norm(self._array))
+            return Quaternion._wrap(self._array * (1.0 / sqrt(sum(val * val for val in values))))
+
+    def to_rot_array(self) -> np.ndarray:
+        """
+        Returns rotation matrix corresponding to the Quaternion as a read-only ndarray.
+        The matrix is memoized until the Quaternion changes: the mutating methods drop it
+        and it is also keyed on the values, the buffer being writable through views
+        :return: numpy.ndarray (3, 3)
+        """
+        values = self._array.tolist()
+        if values == self._rot_key:
+            return self._rot_array
+
+        q0, q1, q2, q3 = values
+
+        if q1 == 0 and q2 == 0 and q3 == 0:
+            rot_array = np.identity(3)
+        else:
+            q1q0 = q1 * q0
+            q2q0 = q2 * q0
+            q3q0 = q3 * q0
+            q1q1 = q1 * q1
+            q2q1 = q2 * q1
+            q3q1 = q3 * q1
+            q2q2 = q2 * q2
+            q3q2 = q3 * q2
+            q3q3 = q3 * q3
+
+            rot_array = np.array([[1 - 2 * (q2q2 + q3q3), 2 * (q2q1 - q3q0), 2 * (q3q1 + q2q0)],
+                                  [2 * (q2q1 + q3q0), 1 - 2 * (q1q1 + q3q3), 2 * (q3q2 - q1q0)],
+                                  [2 * (q3q1 - q2q0), 2 * (q3q2 + q1q0), 1 - 2 * (q1q1 + q2q2)]])
+
+        rot_array.flags.writeable = False
+        self._rot_array = rot_array
+        self._rot_matrix = None
+        self._rot_key = values
+        return rot_array
 
     def to_rot_matrix(self) -> np.matrix:
         """
-        Returns rotation matrix corresponding to the Quaternion
+        Returns rotation matrix corresponding to the Quaternion (read-only, memoized as to_rot_array)
         :return: numpy.matrix
         """
-        if np.linalg.norm(self._array[1:4]) == 0:
-            return np.matrix(np.identity(3))
-        else:
-            q1q0 = self._array[1] * self._array[0]
-            q2q0 = self._array[2] * self._array[0]
-            q3q0 = self._array[3] * self._array[0]
-            q1q1 = self._array[1] * self._array[1]
-            q2q1 = self._array[2] * self._array[1]
-            q3q1 = self._array[3] * self._array[1]
-            q2q2 = self._array[2] * self._array[2]
-            q3q2 = self._array[3] * self._array[2]
-            q3q3 = self._array[3] * self._array[3]
-
-            return np.matrix([[1 - 2 * (q2q2 + q3q3), 2 * (q2q1 - q3q0), 2 * (q3q1 + q2q0)],
-                              [2 * (q2q1 + q3q0), 1 - 2 * (q1q1 + q3q3), 2 * (q3q2 - q1q0)],
-                              [2 * (q3q1 - q2q0), 2 * (q3q2 + q1q0), 1 - 2 * (q1q1 + q2q2)]])
+        rot_array = self.to_rot_array()
+        if self._rot_matrix is None:
+            self._rot_matrix = rot_array.view(np.matrix)
+        return self._rot_matrix
 
     def __repr__(self):
         return str(self._array)
@@ -152,33 +219,82 @@ class Quaternion(object):
 
     def __setitem__(self, key, value):
         self._array[key] = value
+        self._rot_key = None
 
     def __add__(self, other: "Quaternion"):
-        return Quaternion(self._array + other._array)
+        return Quaternion._wrap(self._array + other._array)
 
     def __sub__(self, other: "Quaternion"):
-        return Quaternion(self._array - other._array)
+        return Quaternion._wrap(self._array - other._array)
 
     def __mul__(self, other: Union["Quaternion", float]):
-        if type(other) == type(self):
-            q0 = np.array(self._array[0] * other._array[0] - np.dot(self._array[1:4], other._array[1:4]))
-            qv = self._array[0] * other._array[1:4] + other._array[0] * self._array[1:4]\
-                 + np.cross(self._array[1:4], other._array[1:4])
-            return Quaternion(np.insert(qv, 0, q0))
+        if isinstance(other, Quaternion):
+            return Quaternion._wrap(np.array(_mul_values(self._array.tolist(), other._array.tolist())))
+        elif isinstance(other, Number):
+            return Quaternion._wrap(self._array * other)
         else:
-            return Quaternion(self._array * other)
-
-    def __rmul__(self, other: Union["Quaternion", float]):
-        if type(other) == type(self):
-            q0 = np.array(self._array[0] * other._array[0] - np.dot(self._array[1:4], other._array[1:4]))
-            qv = self._array[0] * other._array[1:4] + other._array[0] * self._array[1:4]\
-                 + np.cross(self._array[1:4], other._array[1:4])
-            return Quaternion(np.insert(qv, 0, q0))
+            return NotImplemented
+
+    def __rmul__(self, other: float):
+        if isinstance(other, Number):
+            return Quaternion._wrap(self._array * other)
         else:
-            return Quaternion(self._array * other)
+            return NotImplemented
 
     def __neg__(self):
-        return Quaternion(-self._array)
+        return Quaternion._wrap(-self._array)
+
+    def copy(self, out: "Quaternion" = None) -> "Quaternion":
+        """
+        Returns a copy of the quaternion, written in out if given (its buffer is reused)
+        :param out: Quaternion receiving the copy
+        :return: Quaternion
+        """
+        if out is None:
+            return Quaternion._wrap(self._array.copy())
+
+        out._array[:] = self._array
+        out._rot_key = None
+        return out
+
+    def __copy__(self) -> "Quaternion":
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> "Quaternion":
+        return self.copy()
+
+    def multiply(self, other: "Quaternion", out: "Quaternion" = None) -> "Quaternion":
+        """
+        Returns the product self * other, written in out if given (out may be self or other)
+        :param other: Quaternion
+        :param out: Quaternion receiving the result
+        :return: Quaternion
+        """
+        values = _mul_values(self._array.tolist(), other._array.tolist())
+        if out is None:
+            return Quaternion._wrap(np.array(values))
+
+        out._array[:] = values
+        out._rot_key = None
+        return out
+
+    def imul(self, other: "Quaternion") -> None:
+        """
+        In place product: self = self * other
+        :param other: Quaternion
+        :return: None
+        """
+        self._array[:] = _mul_values(self._array.tolist(), other._array.tolist())
+        self._rot_key = None
+
+    def rotate_inplace(self, quat: "Quaternion") -> None:
+        """
+        In place rotation by quat: self = quat * self
+        :param quat: Quaternion
+        :return: None
+        """
+        self._array[:] = _mul_values(quat._array.tolist(), self._array.tolist())
+        self._rot_key = None
 
     def __eq__(self, other: "Quaternion") -> bool:
         return np.allclose(self._array, other._array)
@@ -189,7 +305,7 @@ class Quaternion(object):
         :param other: Quaternion
         :return: float
         """
-        return np.asscalar(np.dot(self._array, other._array))
+        return sum(left * right for left, right in zip(self._array.tolist(), other._array.tolist()))
 
     @staticmethod
     def identity() -> "Quaternion":
@@ -197,7 +313,7 @@ class Quaternion(object):
         Returns Quaternion corresponding to Identity rotation
         :return: Quaternion
         """
-        return Quaternion(np.array([1, 0, 0, 0], dtype=float))
+        return Quaternion._wrap(np.array([1.0, 0.0, 0.0, 0.0]))
 
     def to_euler_angles(self):
         """
@@ -221,6 +337,16 @@ class Quaternion(object):
 
         return [roll, pitch, yaw]
 
+    @staticmethod
+    def from_rot_matrix(matrix: np.ndarray) -> "Quaternion":
+        """
+        Rotation matrix to unit quaternion (with q0 >= 0) using Shepperd's method,
+        stable for any rotation (no Euler angles, no gimbal lock)
+        :param matrix: (3, 3) numpy.ndarray or numpy.matrix
+        :return: Quaternion
+        """
+        return Quaternion._wrap(kernels.rot_matrix_to_quat(np.asarray(matrix, dtype=float).reshape(3, 3)))
+
     @staticmethod
     def from_euler_angles(roll: float, pitch: float, yaw: float) -> "Quaternion":
         """
@@ -244,8 +370,69 @@ class Quaternion(object):
                            sy * cr * cp - cy * sr * sp])
 
 
-def quaternion_log(quat: Quaternion) -> Quaternion:
-    return Quaternion(np.insert(quat.get_theta() * quat.get_axis(), 0, [0]))
+def rotate_vectors(quat: Quaternion, points: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Rotate points by the unit Quaternion quat without building the rotation matrix
+    :param quat: Quaternion
+    :param points: (N, 3) or (M, N, 3) ndarray
+    :param out: optional ndarray of the same shape as points receiving the result
+    :return: numpy.ndarray
+    """
+    return kernels.quat_rotate_vectors(quat._array, np.asarray(points, dtype=float), out)
+
+
+def quaternion_log(quat: QuaternionLike) -> QuaternionLike:
+    """
+    Logarithm of unit Quaternion(s): [0, theta * axis] with theta the rotation angle
+    Works on a Quaternion or a QuaternionArray (one call for all the Quaternions)
+    :param quat: Quaternion or QuaternionArray
+    :return: Quaternion or QuaternionArray
+    """
+    return type(quat)._wrap(kernels.quat_log(quat._array))
+
+
+def quaternion_exp(quat: QuaternionLike) -> QuaternionLike:
+    """
+    Inverse of quaternion_log: returns the unit Quaternion(s) of angle |[q1, q2, q3]|
+    around the axis [q1, q2, q3]
+    Works on a Quaternion or a QuaternionArray (one call for all the Quaternions)
+    :param quat: Quaternion or QuaternionArray [0, theta * axis]
+    :return: Quaternion or QuaternionArray
+    """
+    return type(quat)._wrap(kernels.quat_exp(quat._array))
+
+
+def integrate_angular_velocity(quat: QuaternionLike,
+                               ang_vel: np.ndarray,
+                               d_time: Union[float, np.ndarray],
+                               body: bool = False,
+                               out: QuaternionLike = None) -> QuaternionLike:
+    """
+    Advances orientation(s) by a constant angular velocity over a time step:
+        exp(ang_vel * d_time) * quat, or quat * exp(ang_vel * d_time) in the body frame
+    The result stays a unit Quaternion (no renormalization needed)
+    Works on a Quaternion or a QuaternionArray (one call for all the Quaternions)
+    :param quat: Quaternion or QuaternionArray (N)
+    :param ang_vel: (3,) or (3, 1) ndarray, or (N, 3) ndarray for a QuaternionArray (rad/s)
+    :param d_time: time step, float or (N,) ndarray for a QuaternionArray
+    :param body: if true ang_vel is expressed in the rotating frame otherwise in the reference frame
+    :param out: Quaternion or QuaternionArray receiving the result (may be quat)
+    :return: Quaternion or QuaternionArray
+    """
+    rot_vecs = np.asarray(ang_vel, dtype=float).reshape(quat._array.shape[:-1] + (3,))
+    rot_vecs = rot_vecs * np.reshape(d_time, np.shape(d_time) + (1,))
+
+    steps = np.zeros(rot_vecs.shape[:-1] + (4,), dtype=float)
+    steps[..., 1:4] = rot_vecs
+    steps = kernels.quat_exp(steps)
+
+    out_array = None if out is None else out._array
+    if body:
+        result = kernels.quat_mul(quat._array, steps, out=out_array)
+    else:
+        result = kernels.quat_mul(steps, quat._array, out=out_array)
+
+    return type(quat)._wrap(result) if out is None else out
 
 
 def quaternion_x(theta: float, rad: bool = True) -> Quaternion:
@@ -0,0 +1,321 @@
+from numbers import Number
+from typing import Union, List, Iterator
+import numpy as np
+
+from .quaternion import Quaternion, DOT_THRESHOLD
+from . import kernels
+
+
+class QuaternionArray(object):
+    """
+    Array of N quaternions stored in one contiguous (N, 4) ndarray.
+    Uses the same convention as Quaternion: each row is [q0, q1, q2, q3]
+    """
+
+    def __init__(self, array: Union[np.ndarray, List] = None):
+        if array is None:
+            self._array = np.empty((0, 4), dtype=float)
+
+        elif isinstance(array, list) and len(array) > 0 and isinstance(array[0], Quaternion):
+            self._array = np.array([quat._array for quat in array], dtype=float)
+
+        elif isinstance(array, (np.ndarray, list)):
+            self._array = np.array(array, dtype=float).reshape(-1, 4)
+
+        else:
+            raise ValueError("Cannot make a geometry array from the given type")
+
+    @classmethod
+    def _wrap(cls, array: np.ndarray) -> "QuaternionArray":
+        """
+        Returns a QuaternionArray using array (N, 4) as buffer without copying it
+        """
+        quats = cls.__new__(cls)
+        quats._array = array
+        return quats
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        The underlying (N, 4) ndarray
+        """
+        return self._array
+
+    @property
+    def q0(self) -> np.ndarray:
+        return self._array[:, 0]
+
+    @property
+    def q1(self) -> np.ndarray:
+        return self._array[:, 1]
+
+    @property
+    def q2(self) -> np.ndarray:
+        return self._array[:, 2]
+
+    @property
+    def q3(self) -> np.ndarray:
+        return self._array[:, 3]
+
+    w = q0
+    x = q1
+    y = q2
+    z = q3
+
+    def normalize(self) -> None:
+        """
+        Normalize all the Quaternions
+        :return: None
+        """
+        kernels.quat_normalize(self._array, out=self._array)
+
+    def inverse(self) -> None:
+        """
+        Inverse all the Quaternions
+        :return: None
+        """
+        kernels.quat_conjugate(self._array, out=self._array)
+
+    def get_norm(self) -> np.ndarray:
+        """
+        Returns the norm of each Quaternion
+        :return: (N,) numpy.ndarray
+        """
+        return kernels.quat_norm(self._array)
+
+    def get_inverse(self) -> "QuaternionArray":
+        """
+        Returns the inverse of each Quaternion
+        :return: QuaternionArray
+        """
+        return QuaternionArray._wrap(kernels.quat_conjugate(self._array))
+
+    def get_normalized(self) -> "QuaternionArray":
+        """
+        Returns the normalized Quaternions
+        :return: QuaternionArray
+        """
+        return QuaternionArray._wrap(kernels.quat_normalize(self._array))
+
+    def dot(self, other: Union["QuaternionArray", Quaternion]) -> np.ndarray:
+        """
+        Return the dot product of each pair of Quaternions
+        :param other: QuaternionArray or Quaternion
+        :return: (N,) numpy.ndarray
+        """
+        return kernels.quat_dot(self._array, _as_quat_array(other))
+
+    def to_rot_matrix(self) -> np.ndarray:
+        """
+        Returns the rotation matrices corresponding to the Quaternions
+        :return: (N, 3, 3) numpy.ndarray
+        """
+        return kernels.quat_to_rot_matrix(self._array)
+
+    def to_euler_angles(self) -> np.ndarray:
+        """
+        Quaternions to Euler Angles, see Quaternion.to_euler_angles
+        :return: (N, 3) numpy.ndarray, each row being [roll, pitch, yaw]
+        """
+        return kernels.quat_to_euler_angles(self._array)
+
+    def rotate_vectors(self, points: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Rotate points by the unit Quaternions without building the rotation matrices
+        :param points: (N, 3) ndarray, the point i is rotated by the Quaternion i
+                       or (N, M, 3) ndarray, the M points of the set i are rotated by the Quaternion i
+        :param out: optional ndarray of the same shape as points receiving the result
+        :return: numpy.ndarray
+        """
+        points = np.asarray(points, dtype=float)
+        quats = self._array if points.ndim < 3 else self._array[:, np.newaxis, :]
+        return kernels.quat_rotate_vectors(quats, points, out)
+
+    @staticmethod
+    def from_euler_angles(roll, pitch, yaw) -> "QuaternionArray":
+        """
+        Euler angles to Quaternions, see Quaternion.from_euler_angles
+        :param roll: float or (N,) ndarray
+        :param pitch: float or (N,) ndarray
+        :param yaw: float or (N,) ndarray
+        :return: QuaternionArray
+        """
+        return QuaternionArray._wrap(kernels.quat_from_euler_angles(roll, pitch, yaw).reshape(-1, 4))
+
+    @staticmethod
+    def from_rot_matrix(matrices: np.ndarray) -> "QuaternionArray":
+        """
+        Rotation matrices to unit Quaternions, see Quaternion.from_rot_matrix
+        :param matrices: (N, 3, 3) ndarray
+        :return: QuaternionArray
+        """
+        matrices = np.asarray(matrices, dtype=float).reshape(-1, 3, 3)
+        return QuaternionArray._wrap(kernels.rot_matrix_to_quat(matrices))
+
+    @staticmethod
+    def identity(size: int) -> "QuaternionArray":
+        """
+        Returns size Quaternions corresponding to Identity rotation
+        :return: QuaternionArray
+        """
+        array = np.zeros((size, 4), dtype=float)
+        array[:, 0] = 1.0
+        return QuaternionArray._wrap(array)
+
+    def __len__(self) -> int:
+        return self._array.shape[0]
+
+    def __iter__(self) -> Iterator[Quaternion]:
+        for row in self._array:
+            yield Quaternion._wrap(row)
+
+    def __repr__(self):
+        return str(self._array)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self._array
+        return self._array.astype(dtype)
+
+    def __getitem__(self, item) -> Union[Quaternion, "QuaternionArray"]:
+        """
+        Integer indices return a Quaternion viewing the row (no copy, like numpy)
+        """
+        if isinstance(item, (int, np.integer)):
+            return Quaternion._wrap(self._array[item])
+        return QuaternionArray._wrap(self._array[item].reshape(-1, 4))
+
+    def __setitem__(self, key, value: Union[Quaternion, "QuaternionArray", np.ndarray]):
+        self._array[key] = _as_quat_array(value)
+
+    def __add__(self, other: Union["QuaternionArray", Quaternion]):
+        return QuaternionArray._wrap(self._array + _as_quat_array(other))
+
+    def __sub__(self, other: Union["QuaternionArray", Quaternion]):
+        return QuaternionArray._wrap(self._array - _as_quat_array(other))
+
+    def __mul__(self, other: Union["QuaternionArray", Quaternion, float, np.ndarray]):
+        if isinstance(other, (QuaternionArray, Quaternion)):
+            return QuaternionArray._wrap(kernels.quat_mul(self._array, _as_quat_array(other)))
+        else:
+            return QuaternionArray._wrap(self._array * _as_coeffs(other))
+
+    def __rmul__(self, other: Union[Quaternion, float, np.ndarray]):
+        if isinstance(other, Quaternion):
+            return QuaternionArray._wrap(kernels.quat_mul(other._array, self._array))
+        else:
+            return QuaternionArray._wrap(self._array * _as_coeffs(other))
+
+    def __neg__(self):
+        return QuaternionArray._wrap(-self._array)
+
+    def __eq__(self, other: Union["QuaternionArray", Quaternion]) -> bool:
+        return np.allclose(self._array, _as_quat_array(other))
+
+
+def _as_quat_array(value: Union[QuaternionArray, Quaternion, np.ndarray]) -> np.ndarray:
+    """
+    Returns the ndarray holding the Quaternion(s) of value
+    """
+    if isinstance(value, (QuaternionArray, Quaternion)):
+        return value._array
+    return np.asarray(value, dtype=float)
+
+
+def _as_coeffs(value: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """
+    Returns value ready to scale a (N, 4) array: scalars are kept as they are,
+    arrays of N coefficients are turned into a (N, 1) column
+    """
+    if isinstance(value, Number):
+        return value
+    return np.asarray(value, dtype=float).reshape(-1, 1)
+
+
+def _interpolation_operands(quat_start: Union[QuaternionArray, Quaternion],
+                            quat_end: Union[QuaternionArray, Quaternion],
+                            coeff: Union[float, np.ndarray]):
+    """
+    Returns the start and end (N, 4) arrays and the (N, 1) coefficients broadcast together
+    """
+    start = _as_quat_array(quat_start).reshape(-1, 4)
+    end = _as_quat_array(quat_end).reshape(-1, 4)
+    coeffs = np.asarray(coeff, dtype=float).reshape(-1, 1)
+    # read-only broadcast views (np.broadcast_arrays returns views warning when written)
+    size = np.broadcast_shapes(start.shape[:1], end.shape[:1], coeffs.shape[:1])[0]
+    return (np.broadcast_to(start, (size, 4)), np.broadcast_to(end, (size, 4)),
+            np.broadcast_to(coeffs, (size, 1)))
+
+
+def lerp_array(quat_start: Union[QuaternionArray, Quaternion],
+               quat_end: Union[QuaternionArray, Quaternion],
+               coeff: Union[float, np.ndarray]) -> QuaternionArray:
+    """
+    Linear interpolation, see lerp. The start Quaternions, end Quaternions
+    and coefficients are broadcast together
+    :param quat_start: Start Quaternion(s)
+    :param quat_end: End Quaternion(s)
+    :param coeff: Interpolation coefficient(s)
+    :return: QuaternionArray
+    """
+    start, end, coeffs = _interpolation_operands(quat_start, quat_end, coeff)
+    return QuaternionArray._wrap(start * (1 - coeffs) + end * coeffs)
+
+
+def nlerp_array(quat_start: Union[QuaternionArray, Quaternion],
+                quat_end: Union[QuaternionArray, Quaternion],
+                coeff: Union[float, np.ndarray]) -> QuaternionArray:
+    """
+    Normalized linear interpolation, see nlerp. The start Quaternions,
+    end Quaternions and coefficients are broadcast together
+    :param quat_start: Start Quaternion(s)
+    :param quat_end: End Quaternion(s)
+    :param coeff: Interpolation coefficient(s)
+    :return: QuaternionArray
+    """
+    result = lerp_array(quat_start, quat_end, coeff)
+    result.normalize()
+    return result
+
+
+def slerp_array(quat_start: Union[QuaternionArray, Quaternion],
+                quat_end: Union[QuaternionArray, Quaternion],
+                coeff: Union[float, np.ndarray],
+                shortest_path: bool = False) -> QuaternionArray:
+    """
+    Spherical Linear Interpolation, see slerp. The start Quaternions,
+    end Quaternions and coefficients are broadcast together and each element
+    falls back on nlerp when its start and end are too close (DOT_THRESHOLD)
+    :param quat_start: Start Quaternion(s)
+    :param quat_end: End Quaternion(s)
+    :param coeff: Interpolation coefficient(s)
+    :param shortest_path: Takes the shortest path between the two orientations
+    :return: QuaternionArray
+    """
+    start, end, coeffs = _interpolation_operands(quat_start, quat_end, coeff)
+    return QuaternionArray._wrap(kernels.quat_slerp(start, end, coeffs[:, 0], shortest_path, DOT_THRESHOLD))
+
+
+def log_interpolation_array(quat_start: Union[QuaternionArray, Quaternion],
+                            quat_end: Union[QuaternionArray, Quaternion],
+                            coeff: Union[float, np.ndarray]) -> QuaternionArray:
+    """
+    Logarithmic Quaternion Interpolation, see log_interpolation. The start
+    Quaternions, end Quaternions and coefficients are broadcast together
+    :param quat_start: Start Quaternion(s)
+    :param quat_end: End Quaternion(s)
+    :param coeff: Interpolation coefficient(s)
+    :return: QuaternionArray
+    """
+    start, end, coeffs = _interpolation_operands(quat_start, quat_end, coeff)
+    delta = kernels.quat_mul(end, kernels.quat_conjugate(start))
+    angle = 2.0 * np.arccos(np.clip(delta[:, 0:1], -1.0, 1.0))
+
+    axis_norm = np.linalg.norm(delta[:, 1:4], axis=1, keepdims=True)
+    null_axis = np.all(np.abs(delta[:, 1:4]) <= 1e-8, axis=1, keepdims=True)
+    axis = np.where(null_axis, [1.0, 0.0, 0.0], delta[:, 1:4] / np.where(null_axis, 1.0, axis_norm))
+
+    half_angle = angle * coeffs / 2.0
+    step = np.concatenate((np.cos(half_angle), axis * np.sin(half_angle)), axis=1)
+
+    return QuaternionArray._wrap(kernels.quat_mul(step, start))
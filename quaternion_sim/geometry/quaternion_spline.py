@@ -0,0 +1,133 @@
+from typing import Union, List
+import numpy as np
+
+from .quaternion import Quaternion, quaternion_log, quaternion_exp
+from .quaternion_array import QuaternionArray, slerp_array
+from . import kernels
+
+
+class QuaternionSpline(object):
+    """
+    Smooth orientation trajectory going through keyframes using the spherical
+    quadrangle interpolation (SQUAD) on each segment [t_i, t_i+1]:
+
+        squad(h) = slerp(slerp(q_i, q_i+1, h), slerp(a_i, b_i+1, h), 2h(1-h))
+
+    The control quaternions a_i (leaving q_i) and b_i (reaching q_i) are computed
+    once at construction so that the angular velocity is continuous at the keyframes,
+    even for non uniformly spaced times. For uniform times they both reduce to the usual
+    s_i = q_i * exp(-(log(q_i^-1 q_i+1) + log(q_i^-1 q_i-1)) / 4)
+    """
+
+    def __init__(self,
+                 times: Union[np.ndarray, List[float]],
+                 quaternions: Union[QuaternionArray, List[Quaternion]]):
+        self._times = np.array(times, dtype=float).reshape(-1)
+        keyframes = quaternions if isinstance(quaternions, QuaternionArray) else QuaternionArray(quaternions)
+
+        assert len(keyframes) == self._times.size, "There should be one time per quaternion"
+        assert self._times.size >= 2, "The spline needs at least two keyframes"
+        assert np.all(np.diff(self._times) > 0), "The times should be strictly increasing"
+
+        self._quats = kernels.quat_normalize(keyframes.array)
+
+        # Keep consecutive keyframes on the same hemisphere to follow the shortest path
+        for i in range(1, len(self._quats)):
+            if np.dot(self._quats[i - 1], self._quats[i]) < 0.0:
+                self._quats[i] = -self._quats[i]
+
+        self._controls_out = self._quats.copy()
+        self._controls_in = self._quats.copy()
+        durations = np.diff(self._times)
+
+        for i in range(1, len(self._quats) - 1):
+            quat = Quaternion(self._quats[i])
+            quat_inv = quat.get_inverse()
+            # rotations to the next keyframe and from the previous one, expressed at q_i
+            log_next = quaternion_log(quat_inv * Quaternion(self._quats[i + 1]))
+            log_prev = -quaternion_log(quat_inv * Quaternion(self._quats[i - 1]))
+
+            # the tangent (rotation per unit of time) at q_i is shared by both segments
+            tangent = (log_next + log_prev) * (1.0 / (durations[i - 1] + durations[i]))
+            self._controls_out[i] = (quat * quaternion_exp((tangent * durations[i] - log_next) * 0.5))[:]
+            self._controls_in[i] = (quat * quaternion_exp((log_prev - tangent * durations[i - 1]) * 0.5))[:]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times
+
+    @property
+    def keyframes(self) -> QuaternionArray:
+        return QuaternionArray._wrap(self._quats)
+
+    @property
+    def controls_out(self) -> QuaternionArray:
+        return QuaternionArray._wrap(self._controls_out)
+
+    @property
+    def controls_in(self) -> QuaternionArray:
+        return QuaternionArray._wrap(self._controls_in)
+
+    def segment_indices(self, times: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Returns the index of the segment containing each time (binary search),
+        times outside of the spline use the first or last segment
+        :param times: float or (N,) ndarray
+        :return: (N,) ndarray of int
+        """
+        times = np.asarray(times, dtype=float).reshape(-1)
+        indices = np.searchsorted(self._times, times, side="right") - 1
+        return np.clip(indices, 0, self._times.size - 2)
+
+    def evaluate(self, times: Union[float, np.ndarray]) -> QuaternionArray:
+        """
+        Returns the orientations of the spline at the given times, the times
+        outside of the spline are clamped to its first or last keyframe
+        :param times: float or (N,) ndarray
+        :return: QuaternionArray
+        """
+        times = np.clip(np.asarray(times, dtype=float).reshape(-1), self._times[0], self._times[-1])
+        indices = self.segment_indices(times)
+        coeffs = (times - self._times[indices]) / (self._times[indices + 1] - self._times[indices])
+
+        quats = slerp_array(QuaternionArray._wrap(self._quats[indices]),
+                            QuaternionArray._wrap(self._quats[indices + 1]),
+                            coeffs)
+        controls = slerp_array(QuaternionArray._wrap(self._controls_out[indices]),
+                               QuaternionArray._wrap(self._controls_in[indices + 1]),
+                               coeffs)
+        return slerp_array(quats, controls, 2.0 * coeffs * (1.0 - coeffs))
+
+    def angular_velocity(self,
+                         times: Union[float, np.ndarray],
+                         step: float = 1e-6,
+                         body: bool = False) -> np.ndarray:
+        """
+        Returns the angular velocities of the spline at the given times from
+        w = 2 * dq/dt * q^-1 (or 2 * q^-1 * dq/dt in the body frame),
+        dq/dt being estimated by central differences (one-sided at the ends of the spline).
+        The orientation is held constant outside of the spline times: the velocity is zero there
+        :param times: float or (N,) ndarray
+        :param step: half time step of the central differences
+        :param body: if true the angular velocities are expressed in the rotating frame
+        :return: (N, 3) ndarray
+        """
+        times = np.asarray(times, dtype=float).reshape(-1)
+        times_before = np.clip(times - step, self._times[0], self._times[-1])
+        times_after = np.clip(times + step, self._times[0], self._times[-1])
+
+        quats_before = self.evaluate(times_before).array
+        quats_after = self.evaluate(times_after).array
+
+        if body:
+            delta = kernels.quat_mul(kernels.quat_conjugate(quats_before), quats_after)
+        else:
+            delta = kernels.quat_mul(quats_after, kernels.quat_conjugate(quats_before))
+
+        # delta is close to the identity: its vector part is sin(angle / 2) * axis ~ angle / 2 * axis
+        sign = np.where(delta[:, 0:1] < 0.0, -1.0, 1.0)
+        spans = (times_after - times_before).reshape(-1, 1)
+        # both clipped times are equal outside of the spline times
+        inside = spans > 0.0
+        return np.divide(2.0 * sign * delta[:, 1:4], np.where(inside, spans, 1.0),
+                         out=np.zeros((times.size, 3)), where=inside)
@@ -1,49 +1,85 @@
 import numpy as np
 from numpy import cos, sin, matrix, ndarray
 
-from .matrix_vector_utils import tensor_product, cross_product_matrix
+from .matrix_vector_utils import tensor_product, cross_product_matrix, as_vectors
 
 
-def RxMatrix(theta: float) -> float:
+def _axis_rotations(theta, first: int, second: int):
+    """
+    Return the rotation matrix (or the (N, 3, 3) stack of rotation matrices if theta is an array)
+    about the axis orthogonal to the first and second axes
+    """
+    theta = np.asarray(theta, dtype=float)
+    cosines = cos(theta)
+    sines = sin(theta)
+
+    mats = np.zeros(theta.shape + (3, 3), dtype=float)
+    mats[..., 3 - first - second, 3 - first - second] = 1.0
+    mats[..., first, first] = cosines
+    mats[..., first, second] = -sines
+    mats[..., second, first] = sines
+    mats[..., second, second] = cosines
+
+    if theta.ndim == 0:
+        return np.matrix(mats)
+    return mats
+
+
+def RxMatrix(theta: float) -> matrix:
     """
     Return the rotation matrix about the x-axis with an angle of theta(rad)
-    :param theta:
-    :return: np.matrix
+    :param theta: angle or (N,) ndarray of angles
+    :return: np.matrix or (N, 3, 3) ndarray if theta is an array
     """
-    return np.matrix([[1.0, 0, 0],
-                      [0, cos(theta), -sin(theta)],
-                      [0, sin(theta), cos(theta)]])
+    return _axis_rotations(theta, 1, 2)
 
 
-def RyMatrix(theta: float) -> float:
+def RyMatrix(theta: float) -> matrix:
     """
-    Return the rotation matrix about the z-axis with an angle of theta(rad)
+    Return the rotation matrix about the y-axis with an angle of theta(rad)
+    :param theta: angle or (N,) ndarray of angles
+    :return: np.matrix or (N, 3, 3) ndarray if theta is an array
     """
-    return np.matrix([[cos(theta), 0, sin(theta)],
-                      [0, 1.0, 0],
-                      [-sin(theta), 0, cos(theta)]])
+    return _axis_rotations(theta, 2, 0)
 
 
 def RzMatrix(theta: float) -> matrix:
     """
-    Return the rotation matrix about the y-axis with an angle of theta(rad)
+    Return the rotation matrix about the z-axis with an angle of theta(rad)
+    :param theta: angle or (N,) ndarray of angles
+    :return: np.matrix or (N, 3, 3) ndarray if theta is an array
     """
-    return np.matrix([[cos(theta), sin(theta), 0],
-                      [sin(theta), cos(theta), 0],
-                      [0, 0, 1]])
+    return _axis_rotations(theta, 0, 1)
 
 
-def RMatrix(axis: ndarray, theta: float, quat) -> matrix:
+def RMatrix(axis: ndarray, theta: float, quat=None) -> matrix:
     """
-    Return the rotation matrix about the axis with an angle of theta(rad)
+    Return the rotation matrix about the axis with an angle of theta(rad) (Rodrigues' formula)
+    :param axis: axis (3,) or (3, 1) or (N, 3) ndarray of axes, a null axis gives the identity
+    :param theta: angle or (N,) ndarray of angles
+    :param quat: unused
+    :return: np.matrix or (N, 3, 3) ndarray if axis or theta is an array
     """
-    if np.linalg.norm(axis) == 0:
-        return matrix(np.identity(3))
-    else:
-        axis = axis / np.linalg.norm(axis)
-        return cos(theta) * np.identity(3) + \
-               sin(theta) * cross_product_matrix(axis) + \
-               (1.0 - cos(theta)) * tensor_product(axis, axis)
+    axis = as_vectors(axis)
+    assert axis.shape[-1] == 3, "the axis must have a size of 3"
+    theta = np.asarray(theta, dtype=float)
+    if axis.ndim <= 1 and theta.ndim == 0:
+        if np.linalg.norm(axis) == 0:
+            return matrix(np.identity(3))
+        else:
+            axis = axis / np.linalg.norm(axis)
+            return cos(theta) * np.identity(3) + \
+                   sin(theta) * cross_product_matrix(axis) + \
+                   (1.0 - cos(theta)) * tensor_product(axis, axis)
+
+    norms = np.linalg.norm(axis, axis=-1)
+    zeros = norms == 0
+    theta = np.where(zeros, 0.0, theta)
+    axis = np.broadcast_to(axis / np.where(zeros, 1.0, norms)[..., np.newaxis], theta.shape + (3,))
+    theta = theta[..., np.newaxis, np.newaxis]
+    return cos(theta) * np.identity(3) + \
+           sin(theta) * cross_product_matrix(axis) + \
+           (1.0 - cos(theta)) * tensor_product(axis, axis)
 
 
 def RMatrix_fast(quat: 'Quaternion') -> matrix:
@@ -2,8 +2,7 @@ import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
-from quaternion.matrix_vector_utils import vectorize
-from quaternion.quaternion import Quaternion
+from ..geometry.quaternion import Quaternion, rotate_vectors
 
 
 class Parallelepiped(object):
@@ -24,7 +23,7 @@ class Parallelepiped(object):
         y = width * np.sin(theta)
         z = height * np.ones(x.size)
 
-        self.vertices = [vectorize(v) for v in list(zip(x, y, z)) + list(zip(x, y, -z))]
+        self.vertices = np.array(list(zip(x, y, z)) + list(zip(x, y, -z)), dtype=float)
 
         # Define vertices groups to generate the 6 planes
         self.planes = [[0, 1, 2, 3], [4, 5, 6, 7],
@@ -35,12 +34,12 @@ class Parallelepiped(object):
         self.orientation_origin = Quaternion()
 
     def draw(self, axes: Axes3D):
-        R = (self.orientation * (self.orientation_origin.get_inverse())).to_rot_matrix()
-        verts = [vectorize(np.dot(R, v)) for v in self.vertices]
+        quat = self.orientation * (self.orientation_origin.get_inverse())
+        verts = rotate_vectors(quat, self.vertices)
+        verts += self.center
 
         for plane in self.planes:
-            collection = Poly3DCollection(
-                [[self.center + verts[index] for index in plane]])
+            collection = Poly3DCollection([verts[plane]])
             axes.add_collection3d(collection)
 
     def set_orientation(self, quat: Quaternion):
@@ -2,18 +2,388 @@
 Dynamic model
 ma = f
 I w_dot + w^Iw = m
+
+The state of a solid is the flat vector [p (3), q (4), v (3), w (3)]:
+position and velocity expressed in the fixed frame, orientation q of the solid
+and angular velocity w expressed in the solid frame (q_dot = 0.5 q * w)
 """
+from math import ceil
+from typing import Callable, Tuple
+import numpy as np
 from numpy import matrix, ndarray
 from numpy.core.numeric import identity
-from quaternion import Quaternion
+
+from .geometry.quaternion import Quaternion
+from .geometry import kernels
+
+# Dormand-Prince 5(4) tableau (the 5th order solution is propagated)
+DP_C = np.array([0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0])
+DP_A = [np.array([]),
+        np.array([1 / 5]),
+        np.array([3 / 40, 9 / 40]),
+        np.array([44 / 45, -56 / 15, 32 / 9]),
+        np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+        np.array([9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656])]
+DP_B = np.array([35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+# difference between the 5th and 4th order weights, the 7th stage is the FSAL one
+DP_E = np.array([-71 / 57600, 0.0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+# 4th order continuous extension: y(t_old + x h) = y_old + h K^T DP_P [x, x^2, x^3, x^4]
+DP_P = np.array([
+    [1.0, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0.0, 0.0, 0.0, 0.0],
+    [0.0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0.0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0.0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0.0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0.0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423]])
+
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10.0
+ERROR_EXPONENT = -1 / 5
+# smallest step size relatively to the time, below which the integration fails
+MIN_STEP_RATIO = 10 * np.finfo(float).eps
+
+STATE_SIZE = 13
+POSITION = slice(0, 3)
+ORIENTATION = slice(3, 7)
+VELOCITY = slice(7, 10)
+ANG_VELOCITY = slice(10, 13)
+# gain of the term pulling the quaternion of the state back to a unit norm
+NORM_GAIN = 1.0
+
+
+def _error_norm(error: ndarray) -> float:
+    """
+    Returns the largest RMS norm of the scaled error of the systems
+    """
+    return float(np.max(np.sqrt(np.mean(error ** 2, axis=-1))))
+
+
+class DormandPrince45(object):
+    def __init__(self,
+                 fun: Callable[[float, ndarray], ndarray],
+                 t0: float,
+                 y0: ndarray,
+                 rtol: float = 1e-6,
+                 atol: float = 1e-9,
+                 first_step: float = None,
+                 max_step: float = np.inf) -> None:
+        """
+        Embedded Runge-Kutta 5(4) integrator of y' = fun(t, y) with error-controlled step sizes.
+        The last stage of an accepted step is the first stage of the next one (FSAL) so a step costs
+        6 evaluations of fun, and each step provides a 4th order dense output.
+        Batched mode: with y0 (N, D), fun(t, y) receives and returns (N, D) arrays and the N
+        systems are stepped together (the step size is set by the system with the largest error)
+        :param fun: function (t, y) -> dy/dt
+        :param t0: initial time
+        :param y0: (D,) or (N, D) initial state
+        :param rtol: relative tolerance
+        :param atol: absolute tolerance (float or (D,) ndarray)
+        :param first_step: initial step size, estimated if None
+        :param max_step: maximal step size
+        """
+        assert rtol > 0 and np.all(np.asarray(atol) >= 0), "The tolerances should be positive"
+
+        self.fun = fun
+        self.t = float(t0)
+        self.y = np.array(y0, dtype=float)
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+
+        self.t_old = None
+        self.y_old = None
+        self.n_evaluations = 1
+        self.n_rejected = 0
+
+        self._f = self.fun(self.t, self.y)
+        # stages of the last step (7, ...)
+        self._stages = np.empty((7,) + self.y.shape, dtype=float)
+
+        if first_step is None:
+            self.h = self._initial_step()
+        else:
+            assert first_step > 0, "The first step should be positive"
+            self.h = min(first_step, max_step)
+
+    def _scale(self, y_1: ndarray, y_2: ndarray) -> ndarray:
+        return self.atol + self.rtol * np.maximum(np.abs(y_1), np.abs(y_2))
+
+    def _initial_step(self) -> float:
+        """
+        Estimates the first step size from the state and its derivatives (Hairer, Norsett and Wanner)
+        """
+        scale = self._scale(self.y, self.y)
+        norm_y = _error_norm(self.y / scale)
+        norm_f = _error_norm(self._f / scale)
+        if norm_y < 1e-5 or norm_f < 1e-5:
+            h_0 = 1e-6
+        else:
+            h_0 = 0.01 * norm_y / norm_f
+        h_0 = min(h_0, self.max_step)
+
+        f_1 = self.fun(self.t + h_0, self.y + h_0 * self._f)
+        self.n_evaluations += 1
+        norm_df = _error_norm((f_1 - self._f) / scale) / h_0
+
+        if norm_f <= 1e-15 and norm_df <= 1e-15:
+            h_1 = max(1e-6, h_0 * 1e-3)
+        else:
+            h_1 = (0.01 / max(norm_f, norm_df)) ** (1 / 5)
+
+        return min(100 * h_0, h_1, self.max_step)
+
+    def _try_step(self, h: float) -> Tuple[ndarray, ndarray, float]:
+        """
+        Computes the stages of a step of size h
+        :return: new state, its derivative (7th stage) and the error norm
+        """
+        stages = self._stages
+        stages[0] = self._f
+        for i in range(1, 6):
+            d_y = np.tensordot(DP_A[i], stages[0:i], axes=1)
+            stages[i] = self.fun(self.t + DP_C[i] * h, self.y + h * d_y)
+
+        y_new = self.y + h * np.tensordot(DP_B, stages[0:6], axes=1)
+        stages[6] = self.fun(self.t + h, y_new)
+        self.n_evaluations += 6
+
+        error = h * np.tensordot(DP_E, stages, axes=1)
+        return y_new, stages[6], _error_norm(error / self._scale(self.y, y_new))
+
+    def step(self, t_bound: float = np.inf) -> float:
+        """
+        Advances the state by one accepted step without going beyond t_bound
+        :param t_bound: time not to step over
+        :return: float, the size of the accepted step
+        :raise RuntimeError: if the error estimate is not finite or the step size becomes too small
+        """
+        assert t_bound > self.t, "t_bound should be after the current time"
+
+        h = min(self.h, self.max_step)
+        rejected = False
+        while True:
+            if h < MIN_STEP_RATIO * max(abs(self.t), 1.0):
+                raise RuntimeError("The step size fell to {0} at t = {1} without meeting "
+                                   "the tolerances".format(h, self.t))
+            h_bounded = min(h, t_bound - self.t)
+            y_new, f_new, error_norm = self._try_step(h_bounded)
+
+            if not np.isfinite(error_norm):
+                raise RuntimeError("The error estimate is not finite at t = {0} "
+                                   "(fun returned nan or inf values)".format(self.t))
+            if error_norm <= 1.0:
+                break
+
+            # the step is retried with a smaller size
+            rejected = True
+            self.n_rejected += 1
+            h = h_bounded * max(MIN_FACTOR, SAFETY * error_norm ** ERROR_EXPONENT)
+
+        # the step size grows when the error is small (but not right after a rejection)
+        if error_norm == 0.0:
+            factor = MAX_FACTOR
+        else:
+            factor = min(MAX_FACTOR, SAFETY * error_norm ** ERROR_EXPONENT)
+        if rejected:
+            factor = min(1.0, factor)
+        self.h = min(h_bounded * factor, self.max_step)
+        if h_bounded < h:
+            # the step was shortened to reach t_bound, its size does not predict the next one
+            self.h = max(self.h, h)
+
+        self.t_old, self.y_old = self.t, self.y
+        self.t = self.t + h_bounded
+        self.y = y_new
+        self._f = f_new.copy()
+        return h_bounded
+
+    def integrate(self, t_end: float) -> ndarray:
+        """
+        Steps until t_end
+        :param t_end: final time
+        :return: (D,) or (N, D) ndarray, the state at t_end
+        """
+        while self.t < t_end:
+            self.step(t_end)
+        return self.y
+
+    def dense_output(self, t) -> ndarray:
+        """
+        Returns the state at time(s) t within the last step, interpolated with the
+        4th order continuous extension of the Dormand-Prince method (no evaluation of fun)
+        :param t: float or (M,) ndarray, between t_old and t
+        :return: state shaped (D,) or (N, D), or (M, D) or (M, N, D) for an array of times
+        """
+        assert self.t_old is not None, "No step has been done"
+        times = np.asarray(t, dtype=float)
+        assert np.all((times >= self.t_old - 1e-12) & (times <= self.t + 1e-12)), \
+            "t should be within the last step"
+
+        h = self.t - self.t_old
+        x = (times.reshape(-1) - self.t_old) / h
+        # (M, 4) powers of x
+        powers = np.cumprod(np.repeat(x[:, np.newaxis], 4, axis=1), axis=1)
+        # (7, M) weights of the stages
+        weights = DP_P @ powers.T
+        result = self.y_old + h * np.tensordot(weights.T, self._stages, axes=1)
+        return result.reshape(times.shape + self.y.shape)
+
+
+def rigid_body_derivative(state: ndarray,
+                          mass,
+                          inertia: ndarray,
+                          force: ndarray,
+                          moment: ndarray) -> ndarray:
+    """
+    Returns the derivative of the state(s) [p, q, v, w] of rigid bodies:
+        p_dot = v, q_dot = 0.5 q * w, v_dot = f / m, I w_dot = m - w ^ I w
+    A term proportional to (1 - |q|^2) keeps the quaternion close to a unit norm
+    :param state: (13,) or (N, 13) ndarray
+    :param mass: float or (N,) ndarray
+    :param inertia: (3, 3) or (N, 3, 3) ndarray (in the solid frame)
+    :param force: (3,) or (N, 3) ndarray (in the fixed frame)
+    :param moment: (3,) or (N, 3) ndarray (in the solid frame)
+    :return: ndarray shaped as state
+    """
+    quats = state[..., ORIENTATION]
+    ang_vels = state[..., ANG_VELOCITY]
+    derivative = np.empty_like(state)
+
+    derivative[..., POSITION] = state[..., VELOCITY]
+
+    pure_quats = np.zeros(ang_vels.shape[:-1] + (4,), dtype=float)
+    pure_quats[..., 1:4] = ang_vels
+    quat_dot = kernels.quat_mul(quats, pure_quats)
+    quat_dot *= 0.5
+    quat_dot += NORM_GAIN * (1.0 - np.sum(quats * quats, axis=-1, keepdims=True)) * quats
+    derivative[..., ORIENTATION] = quat_dot
+
+    derivative[..., VELOCITY] = np.asarray(force) / np.reshape(mass, np.shape(mass) + (1,))
+    derivative[..., ANG_VELOCITY] = ang_acceleration(ang_vels, inertia, moment)
+
+    return derivative
+
+
+def ang_acceleration(ang_vels: ndarray, inertia: ndarray, moment: ndarray) -> ndarray:
+    """
+    Returns the angular acceleration(s) given by the Euler equations I w_dot = m - w ^ I w
+    :param ang_vels: (3,) or (N, 3) ndarray (in the solid frame)
+    :param inertia: (3, 3) or (N, 3, 3) ndarray (in the solid frame)
+    :param moment: (3,) or (N, 3) ndarray (in the solid frame)
+    :return: ndarray shaped as ang_vels
+    """
+    inertia = np.asarray(inertia, dtype=float)
+    momentum = np.einsum("...ij,...j->...i", inertia, ang_vels)
+    return np.linalg.solve(inertia, (np.asarray(moment) - np.cross(ang_vels, momentum))[..., np.newaxis])[..., 0]
+
+
+def _dexp_inv(rot_vecs: ndarray, vecs: ndarray) -> ndarray:
+    """
+    Inverse of the derivative of the exponential map of so(3) at -rot_vecs applied to vecs
+    (q * exp(r) with r' = dexp_inv(r, w) solves q_dot = 0.5 q * w in the solid frame),
+    truncated to the terms needed by a 4th order method: w + 1/2 r ^ w + 1/12 r ^ (r ^ w)
+    """
+    cross = np.cross(rot_vecs, vecs)
+    return vecs + 0.5 * cross + np.cross(rot_vecs, cross) / 12.0
+
+
+def rkmk4_attitude_step(quats: ndarray,
+                        ang_vels: ndarray,
+                        inertia: ndarray,
+                        moment: ndarray,
+                        d_time: float) -> Tuple[ndarray, ndarray]:
+    """
+    4th order Runge-Kutta-Munthe-Kaas step of the rotational dynamics:
+        q_dot = 0.5 q * w, I w_dot = m - w ^ I w
+    The Runge-Kutta stages are computed in the Lie algebra (rotation vectors in the solid frame)
+    and the orientation is updated by one exponential map: q * exp(theta), so the orientations
+    stay unit quaternions without renormalization whatever the step size
+    :param quats: (4,) or (N, 4) ndarray of unit quaternions
+    :param ang_vels: (3,) or (N, 3) ndarray (in the solid frame)
+    :param inertia: (3, 3) or (N, 3, 3) ndarray (in the solid frame)
+    :param moment: (3,) or (N, 3) ndarray (in the solid frame), constant during the step
+    :param d_time: time step
+    :return: orientations and angular velocities after d_time
+    """
+    ang_vels = np.asarray(ang_vels, dtype=float)
+
+    # stage rotation vectors and angular velocity increments
+    rot_1 = d_time * ang_vels
+    acc_1 = d_time * ang_acceleration(ang_vels, inertia, moment)
+
+    ang_vels_2 = ang_vels + 0.5 * acc_1
+    rot_2 = _dexp_inv(0.5 * rot_1, d_time * ang_vels_2)
+    acc_2 = d_time * ang_acceleration(ang_vels_2, inertia, moment)
+
+    ang_vels_3 = ang_vels + 0.5 * acc_2
+    rot_3 = _dexp_inv(0.5 * rot_2, d_time * ang_vels_3)
+    acc_3 = d_time * ang_acceleration(ang_vels_3, inertia, moment)
+
+    ang_vels_4 = ang_vels + acc_3
+    rot_4 = _dexp_inv(rot_3, d_time * ang_vels_4)
+    acc_4 = d_time * ang_acceleration(ang_vels_4, inertia, moment)
+
+    steps = np.zeros(ang_vels.shape[:-1] + (4,), dtype=float)
+    steps[..., 1:4] = (rot_1 + 2.0 * rot_2 + 2.0 * rot_3 + rot_4) / 6.0
+    new_quats = kernels.quat_mul(quats, kernels.quat_exp(steps))
+    return new_quats, ang_vels + (acc_1 + 2.0 * acc_2 + 2.0 * acc_3 + acc_4) / 6.0
+
+
+class RKMK4(object):
+    def __init__(self,
+                 inertia: matrix = identity(3),
+                 max_step: float = 0.01):
+        """
+        Geometric integrator of the rotational dynamics (see rkmk4_attitude_step)
+        :param inertia: (3, 3) inertia in the solid frame
+        :param max_step: maximal time step
+        """
+        self.inertia = inertia
+        self.max_step = max_step
+
+    def compute_next_step(self,
+                          t: float,
+                          quat: Quaternion,
+                          w: ndarray,
+                          m: ndarray) -> Tuple[Quaternion, ndarray]:
+        """
+        Integrates the rotation of the solid during t under the constant moment m (solid frame)
+        :param t: duration
+        :param quat: orientation
+        :param w: (3, 1) angular velocity in the solid frame
+        :param m: (3, 1) moment in the solid frame
+        :return: orientation and angular velocity after t
+        """
+        quats = quat[:].copy()
+        ang_vels = np.ravel(w).astype(float)
+        moment = np.ravel(m).astype(float)
+        inertia = np.asarray(self.inertia, dtype=float)
+
+        n_steps = max(1, ceil(t / self.max_step))
+        for _ in range(n_steps):
+            quats, ang_vels = rkmk4_attitude_step(quats, ang_vels, inertia, moment, t / n_steps)
+
+        return Quaternion._wrap(quats), ang_vels.reshape(3, 1)
 
 
 class Runge_Kutta_45(object):
     def __init__(self,
                  mass: float = 1.0,
-                 inertia: matrix = identity(3)):
+                 inertia: matrix = identity(3),
+                 rtol: float = 1e-6,
+                 atol: float = 1e-9,
+                 attitude_step: float = None):
+        """
+        :param attitude_step: if given, the rotation is integrated by RKMK4 with steps of at most
+        attitude_step (the orientation stays unit-norm) and only the translation by Dormand-Prince
+        """
         self.mass = mass
         self.inertia = inertia
+        self.rtol = rtol
+        self.atol = atol
+        self.attitude_step = attitude_step
 
     def compute_next_step(self,
                           t: float,
@@ -22,10 +392,55 @@ class Runge_Kutta_45(object):
                           quat: Quaternion,
                           w: ndarray,
                           f: ndarray,
-                          m: ndarray,
-                          F_fp: ndarray):
-        # translational part
-        for i in range(0, 4):
-            v = v + f * t / 4
+                          m: ndarray) -> Tuple[ndarray, ndarray, Quaternion, ndarray]:
+        """
+        Integrates the motion of the solid during t under the constant force f (fixed frame)
+        and moment m (solid frame) with adaptive Dormand-Prince steps
+        :param t: duration
+        :param p: (3, 1) position
+        :param v: (3, 1) velocity
+        :param quat: orientation
+        :param w: (3, 1) angular velocity in the solid frame
+        :return: position, velocity, orientation and angular velocity after t
+        """
+        if self.attitude_step is not None:
+            return self._compute_next_step_geometric(t, p, v, quat, w, f, m)
+
+        state = np.empty(STATE_SIZE, dtype=float)
+        state[POSITION] = np.ravel(p)
+        state[ORIENTATION] = quat[:]
+        state[VELOCITY] = np.ravel(v)
+        state[ANG_VELOCITY] = np.ravel(w)
+
+        force = np.ravel(f).astype(float)
+        moment = np.ravel(m).astype(float)
+        inertia = np.asarray(self.inertia, dtype=float)
+
+        def derivative(_, y):
+            return rigid_body_derivative(y, self.mass, inertia, force, moment)
+
+        solver = DormandPrince45(derivative, 0.0, state, self.rtol, self.atol)
+        state = solver.integrate(t)
+
+        orientation = Quaternion(state[ORIENTATION])
+        orientation.normalize()
+        return (state[POSITION].reshape(3, 1),
+                state[VELOCITY].reshape(3, 1),
+                orientation,
+                state[ANG_VELOCITY].reshape(3, 1))
+
+    def _compute_next_step_geometric(self, t, p, v, quat, w, f, m):
+        """
+        compute_next_step with the rotation integrated by RKMK4
+        """
+        state = np.concatenate([np.ravel(p), np.ravel(v)]).astype(float)
+        acceleration = np.ravel(f).astype(float) / self.mass
+
+        def derivative(_, y):
+            return np.concatenate([y[3:6], acceleration])
+
+        solver = DormandPrince45(derivative, 0.0, state, self.rtol, self.atol)
+        state = solver.integrate(t)
 
-        return
+        orientation, ang_vel = RKMK4(self.inertia, self.attitude_step).compute_next_step(t, quat, w, m)
+        return state[0:3].reshape(3, 1), state[3:6].reshape(3, 1), orientation, ang_vel
@@ -41,6 +41,14 @@ class Simulation(object):
         self.window.set_cyclic_call(self.update_object_poses)
         self.window.add_button("Reset", self.reset)
 
+        # the key rotations are built once as they are applied at every tick
+        self.key_rotations = {QtCore.Qt.Key_A: quat.quaternion_x(3, False),
+                              QtCore.Qt.Key_Q: quat.quaternion_x(-3, False),
+                              QtCore.Qt.Key_S: quat.quaternion_y(3, False),
+                              QtCore.Qt.Key_W: quat.quaternion_y(-3, False),
+                              QtCore.Qt.Key_Z: quat.quaternion_z(3, False),
+                              QtCore.Qt.Key_X: quat.quaternion_z(-3, False)}
+
     def start_simulation(self):
 
         self.window.start(10)
@@ -48,25 +56,21 @@ class Simulation(object):
         sys.exit(self.qt_app.exec_())
 
     def reset(self):
-        self.plate.reset_pose()
-        self.ball.reset_pose()
-        self.ball.reset_vels()
+        with self.frame_mgr.updating():
+            self.plate.reset_pose()
+            self.ball.reset_pose()
+            self.ball.reset_vels()
 
     def update_object_poses(self):
+        with self.frame_mgr.updating():
+            self.move_objects()
+
+    def move_objects(self):
         keys = self.window.get_pressed_keys(delete=True)
         if len(keys) > 0:
-            if QtCore.Qt.Key_A in keys:
-                self.plate.rotate(quat.quaternion_x(3, False))
-            if QtCore.Qt.Key_Q in keys:
-                self.plate.rotate(quat.quaternion_x(-3, False))
-            if QtCore.Qt.Key_S in keys:
-                self.plate.rotate(quat.quaternion_y(3, False))
-            if QtCore.Qt.Key_W in keys:
-                self.plate.rotate(quat.quaternion_y(-3, False))
-            if QtCore.Qt.Key_Z in keys:
-                self.plate.rotate(quat.quaternion_z(3, False))
-            if QtCore.Qt.Key_X in keys:
-                self.plate.rotate(quat.quaternion_z(-3, False))
+            for key, rotation in self.key_rotations.items():
+                if key in keys:
+                    self.plate.rotate(rotation)
 
             if QtCore.Qt.Key_P in keys:
                 self.ball.translate(array([0.1,0,0]))
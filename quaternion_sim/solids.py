@@ -5,15 +5,14 @@ from OpenGL.GLU import gluNewQuadric, gluQuadricDrawStyle, gluQuadricTexture, \
                         gluQuadricNormals, gluSphere, GLU_FILL, GLU_SMOOTH
 from OpenGL.GLUT import glutSolidCube
 
-from numpy import matrix, ndarray, pi, array
+from numpy import matrix, ndarray, pi, array, zeros, ones
 from numpy.core.numeric import identity
 
-from .geometry.quaternion import Quaternion
+from .geometry.quaternion import Quaternion, integrate_angular_velocity
 from .geometry.pose import Pose
+from .geometry.pose_array import PoseArray
 
-from .frames import Frame
-
-import copy as cp
+from .frames import Frame, ArrayFrameManager
 
 rad_to_deg = 180 / pi
 
@@ -32,12 +31,15 @@ class Solid(object):
                  diffuse_color: list = None):
 
         self.name = name
-        self.pose = pose
-        # the init pose is deep copied to be sure it won't be modified involuntary
-        self.init_pose = cp.deepcopy(init_pose)
+        self.frame = None
+        # SolidRegistry whose arrays are viewed by the state of the solid
+        self._registry = None
+        self._pose = pose
+        # the init pose is copied to be sure it won't be modified involuntary
+        self.init_pose = init_pose.copy()
 
-        self.vel = vel.astype(dtype=float).reshape(3, 1)
-        self.ang_vel = ang_vel.astype(dtype=float).reshape(3, 1)
+        self._vel = vel.astype(dtype=float).reshape(3, 1)
+        self._ang_vel = ang_vel.astype(dtype=float).reshape(3, 1)
 
         if ref_frame is None:
             self.ref_frame = None
@@ -49,8 +51,8 @@ class Solid(object):
                                self.pose,
                                self.ref_frame)
 
-        self.mass = mass
-        self.inertia = inertia
+        self._mass = array([mass], dtype=float)
+        self._inertia = array(inertia, dtype=float).reshape(3, 3)
 
         if ambient_color is None:
             self.ambient_color = [0.0, 0.0, 0.0, 0.0]
@@ -62,15 +64,68 @@ class Solid(object):
         else:
             self.diffuse_color = diffuse_color
 
+    @property
+    def pose(self) -> Pose:
+        # the frame may replace its pose (view of an ArrayFrameManager)
+        if self.frame is not None:
+            return self.frame.pose
+        return self._pose
+
+    @pose.setter
+    def pose(self, pose: Pose) -> None:
+        if self._registry is not None:
+            # the pose views a row of the registry arrays
+            pose.copy(self._pose)
+            self._pose_changed()
+            return
+
+        self._pose = pose
+        if self.frame is not None:
+            self.frame.pose = pose
+
+    # the state arrays are written in place as they may view the arrays of a SolidRegistry
+    @property
+    def vel(self) -> ndarray:
+        return self._vel
+
+    @vel.setter
+    def vel(self, vel: ndarray) -> None:
+        self._vel[:] = array(vel, dtype=float).reshape(3, 1)
+
+    @property
+    def ang_vel(self) -> ndarray:
+        return self._ang_vel
+
+    @ang_vel.setter
+    def ang_vel(self, ang_vel: ndarray) -> None:
+        self._ang_vel[:] = array(ang_vel, dtype=float).reshape(3, 1)
+
+    @property
+    def mass(self) -> float:
+        return float(self._mass[0])
+
+    @mass.setter
+    def mass(self, mass: float) -> None:
+        self._mass[0] = mass
+
+    @property
+    def inertia(self) -> ndarray:
+        return self._inertia
+
+    @inertia.setter
+    def inertia(self, inertia: matrix) -> None:
+        self._inertia[:] = array(inertia, dtype=float).reshape(3, 3)
+
     def set_pose(self, pose: Pose) -> None:
         self.pose = pose
-        self.frame.pose = pose
 
     def set_position(self, pos: ndarray) -> None:
-        self.pose.position = pos.astype(dtype=float).reshape(3, 1)
+        self.pose.position[:] = pos.astype(dtype=float).reshape(3, 1)
+        self._pose_changed()
 
     def set_orientation(self, quat: Quaternion) -> None:
-        self.pose.orientation = quat
+        self.pose.orientation[:] = quat[:]
+        self._pose_changed()
 
     def set_init_pose(self, pose: Pose) -> None:
         self.init_pose = pose
@@ -89,21 +144,38 @@ class Solid(object):
 
     def rotate(self, quat: Quaternion) -> None:
         self.pose.rotate(quat)
+        self._pose_changed()
 
     def translate(self, delta_pos: ndarray) -> None:
         self.pose.translate(delta_pos)
+        self._pose_changed()
+
+    def integrate_ang_vel(self, d_time: float) -> None:
+        """
+        Rotates the solid by its angular velocity (expressed in its reference frame) during d_time
+        """
+        integrate_angular_velocity(self.pose.orientation, self.ang_vel, d_time,
+                                   out=self.pose.orientation)
+        self._pose_changed()
+
+    def _pose_changed(self) -> None:
+        """
+        Invalidates the world poses cached by the FrameManager of the frame of the solid
+        """
+        if self.frame is not None:
+            self.frame.mark_dirty()
 
     def reset_pose(self) -> None:
-        self.set_pose(cp.deepcopy(self.init_pose))
+        self.set_pose(self.init_pose.copy())
 
     def reset_vels(self) -> None:
-        self.vel = array([0, 0, 0]).astype(dtype=float).reshape(3, 1)
-        self.ang_vel = array([0, 0, 0]).astype(dtype=float).reshape(3, 1)
+        self.vel[:] = 0.0
+        self.ang_vel[:] = 0.0
 
 
     def get_pose(self, dcopy=False) -> Pose:
         if dcopy:
-            return cp.deepcopy(self.pose)
+            return self.pose.copy()
         else:
             return self.pose
 
@@ -115,7 +187,7 @@ class Solid(object):
 
     def get_init_pose(self, dcopy=False) -> Pose:
         if dcopy:
-            return cp.deepcopy(self.init_pose)
+            return self.init_pose.copy()
         else:
             return self.init_pose
 
@@ -131,21 +203,68 @@ class Solid(object):
     def get_inertia(self) -> matrix:
         return self.inertia
 
-    def opgl_move_to_pose(self, from_fixed_frame: bool = True):
+    def copy(self, out: 'Solid' = None) -> 'Solid':
+        """
+        Returns a copy of the solid, written in out if given (its pose, init pose and velocity
+        buffers are reused). A new copy gets its own frame which is not part of any FrameManager
+        :param out: Solid receiving the copy
+        :return: Solid
+        """
+        if out is None:
+            out = self.__class__.__new__(self.__class__)
+            out.__dict__.update(self.__dict__)
+            out._registry = None
+            out._pose = self.pose.copy()
+            out.init_pose = self.init_pose.copy()
+            out._vel = self.vel.copy()
+            out._ang_vel = self.ang_vel.copy()
+            out._mass = self._mass.copy()
+            out._inertia = self.inertia.copy()
+            out.ambient_color = list(self.ambient_color)
+            out.diffuse_color = list(self.diffuse_color)
+            if self.frame is not None:
+                out.frame = Frame(self.frame.name, out._pose, self.frame.ref_frame,
+                                  static=self.frame.static)
+            return out
+
+        self.pose.copy(out.pose)
+        out._pose_changed()
+        self.init_pose.copy(out.init_pose)
+        out.vel = self.vel
+        out.ang_vel = self.ang_vel
+        out.mass = self.mass
+        out.inertia = self.inertia
+        out.ambient_color = list(self.ambient_color)
+        out.diffuse_color = list(self.diffuse_color)
+        return out
+
+    def __copy__(self) -> 'Solid':
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> 'Solid':
+        return self.copy()
+
+    def opgl_move_to_pose(self, from_fixed_frame: bool = True, pose: Pose = None):
+        """
+        Moves the view to pose (the pose of the solid if None)
+        """
+        if pose is None:
+            pose = self.pose
+
         if from_fixed_frame:
             # Reset init view
             glLoadIdentity()
 
         # Translate to the right position
-        glTranslatef(self.pose.position[0],
-                     self.pose.position[1],
-                     self.pose.position[2])
+        glTranslatef(pose.position[0],
+                     pose.position[1],
+                     pose.position[2])
 
         # Rotate to the right orientation
-        glRotatef(self.pose.orientation.get_theta(rad=False),
-                  self.pose.orientation[1],
-                  self.pose.orientation[2],
-                  self.pose.orientation[3])
+        glRotatef(pose.orientation.get_theta(rad=False),
+                  pose.orientation[1],
+                  pose.orientation[2],
+                  pose.orientation[3])
 
     def apply_material(self):
         # Set material
@@ -154,18 +273,163 @@ class Solid(object):
         glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, [1, 1, 1, 0.0])
         glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 20)
 
-    def draw(self, from_fixed_frame: bool = True):
-        self.opgl_move_to_pose(from_fixed_frame)
+    def draw(self, from_fixed_frame: bool = True, pose: Pose = None):
+        self.opgl_move_to_pose(from_fixed_frame, pose)
         self.apply_material()
 
 
+class SolidRegistry(object):
+    def __init__(self, capacity: int = 16) -> None:
+        """
+        Stores the poses, velocities, masses and inertia tensors of the solids in contiguous arrays
+        indexed by the solid ids: the state of each registered solid becomes a view of its row
+        (keep references to the solids rather than to their arrays as the rows move when the arrays grow).
+        The solids of a scene can then be read and updated with one batched operation.
+        The frames of the solids must not be managed by an ArrayFrameManager which has its own arrays
+        """
+        capacity = max(capacity, 1)
+        self.solids = []
+        self.solid_ids = {}
+
+        self._poses = PoseArray.identity(capacity)
+        self._velocities = zeros((capacity, 3), dtype=float)
+        self._ang_velocities = zeros((capacity, 3), dtype=float)
+        self._masses = ones(capacity, dtype=float)
+        self._inertias = zeros((capacity, 3, 3), dtype=float)
+        self._inertias[:] = identity(3)
+
+    def add_solid(self, solid: Solid) -> int:
+        """
+        Copies the state of the solid in the arrays and replaces it by views of its row
+        :param solid: Solid
+        :return: int, id of the solid
+        """
+        assert solid.name not in self.solid_ids, "A solid named {0} is already registered".format(solid.name)
+        assert solid._registry is None, "The solid {0} is already registered".format(solid.name)
+        assert solid.frame is None or not isinstance(solid.frame._manager, ArrayFrameManager), \
+            "The pose of the solid {0} already views the arrays of an ArrayFrameManager".format(solid.name)
+
+        solid_id = len(self.solids)
+        if solid_id >= len(self._masses):
+            self._grow(2 * len(self._masses))
+
+        self._poses[solid_id] = solid.pose
+        self._velocities[solid_id] = solid.vel.ravel()
+        self._ang_velocities[solid_id] = solid.ang_vel.ravel()
+        self._masses[solid_id] = solid.mass
+        self._inertias[solid_id] = solid.inertia
+
+        self.solids.append(solid)
+        self.solid_ids[solid.name] = solid_id
+        solid._registry = self
+        self._bind_solid(solid_id)
+        return solid_id
+
+    def _bind_solid(self, solid_id: int) -> None:
+        """
+        Replaces the state of the solid by views of its row
+        """
+        solid = self.solids[solid_id]
+        solid._pose = self._poses[solid_id]
+        if solid.frame is not None:
+            solid.frame._pose = solid._pose
+            solid.frame._registry = self
+        solid._vel = self._velocities[solid_id].reshape(3, 1)
+        solid._ang_vel = self._ang_velocities[solid_id].reshape(3, 1)
+        solid._mass = self._masses[solid_id:solid_id + 1]
+        solid._inertia = self._inertias[solid_id]
+
+    def _grow(self, capacity: int) -> None:
+        size = len(self.solids)
+        poses = PoseArray.identity(capacity)
+        poses[0:size] = self._poses[0:size]
+        velocities = zeros((capacity, 3), dtype=float)
+        velocities[0:size] = self._velocities[0:size]
+        ang_velocities = zeros((capacity, 3), dtype=float)
+        ang_velocities[0:size] = self._ang_velocities[0:size]
+        masses = ones(capacity, dtype=float)
+        masses[0:size] = self._masses[0:size]
+        inertias = zeros((capacity, 3, 3), dtype=float)
+        inertias[:] = identity(3)
+        inertias[0:size] = self._inertias[0:size]
+
+        self._poses = poses
+        self._velocities = velocities
+        self._ang_velocities = ang_velocities
+        self._masses = masses
+        self._inertias = inertias
+
+        # the states of the solids view the new arrays
+        for solid_id in range(size):
+            self._bind_solid(solid_id)
+
+    def __len__(self) -> int:
+        return len(self.solids)
+
+    # After modifying the following arrays in place, mark_dirty has to be called
+    # for the FrameManager to recompute the world poses of the frames of the solids
+    @property
+    def poses(self) -> PoseArray:
+        """
+        The poses of the solids (relative to their reference frame) indexed by solid id
+        """
+        return self._poses[0:len(self.solids)]
+
+    @property
+    def velocities(self) -> ndarray:
+        """
+        The (N, 3) linear velocities of the solids
+        """
+        return self._velocities[0:len(self.solids)]
+
+    @property
+    def ang_velocities(self) -> ndarray:
+        """
+        The (N, 3) angular velocities of the solids (expressed in their reference frame)
+        """
+        return self._ang_velocities[0:len(self.solids)]
+
+    @property
+    def masses(self) -> ndarray:
+        """
+        The (N,) masses of the solids
+        """
+        return self._masses[0:len(self.solids)]
+
+    @property
+    def inertias(self) -> ndarray:
+        """
+        The (N, 3, 3) inertia tensors of the solids
+        """
+        return self._inertias[0:len(self.solids)]
+
+    def mark_dirty(self) -> None:
+        """
+        Invalidates the world poses cached for the frames of the solids
+        """
+        for solid in self.solids:
+            solid._pose_changed()
+
+    def integrate(self, d_time: float) -> None:
+        """
+        Moves all the solids by their linear and angular velocities during d_time
+        (same as translate(d_time * vel) and integrate_ang_vel(d_time) on each solid)
+        """
+        poses = self.poses
+        positions = poses.positions
+        positions += d_time * self.velocities
+        orientations = poses.orientations
+        integrate_angular_velocity(orientations, self.ang_velocities, d_time, out=orientations)
+        self.mark_dirty()
+
+
 class Sphere(Solid):
     def __init__(self, radius: int = 1, *args, **kwargs):
         Solid.__init__(self, *args, **kwargs)
         self.radius = radius
 
-    def draw(self, from_fixed_frame: bool = True):
-        self.opgl_move_to_pose(from_fixed_frame)
+    def draw(self, from_fixed_frame: bool = True, pose: Pose = None):
+        self.opgl_move_to_pose(from_fixed_frame, pose)
         self.apply_material()
 
         # draw sphere
@@ -188,8 +452,8 @@ class Parallepiped(Solid):
         self.width = width
         self.height = height
 
-    def draw(self, from_fixed_frame: bool = True):
-        self.opgl_move_to_pose(from_fixed_frame)
+    def draw(self, from_fixed_frame: bool = True, pose: Pose = None):
+        self.opgl_move_to_pose(from_fixed_frame, pose)
         self.apply_material()
 
         # draw parallelepiped
@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks.bench_geometry import BENCHMARKS, SCALAR, run_benchmarks, compare
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_compare(self):
+        results = run_benchmarks(sizes=[1, 10], repeat=1, name_filter="quaternion.mul")
+        self.assertEqual(sorted(results["results"]),
+                         ["quaternion.mul[10]", "quaternion.mul[1]", "quaternion.mul[scalar]"])
+        self.assertEqual(results["results"]["quaternion.mul[scalar]"]["size"], SCALAR)
+
+        baseline = {"results": {key: dict(value) for key, value in results["results"].items()}}
+        baseline["results"]["quaternion.mul[10]"]["seconds"] *= 0.5
+        del baseline["results"]["quaternion.mul[1]"]
+
+        comparison = compare(results, baseline, tolerance=0.2)
+        self.assertEqual(sorted(comparison), ["quaternion.mul[10]", "quaternion.mul[scalar]"])
+        self.assertTrue(comparison["quaternion.mul[10]"]["regression"])
+        self.assertFalse(comparison["quaternion.mul[scalar]"]["regression"])
+
+    def test_setups(self):
+        for scalar_setup, batch_setup in BENCHMARKS.values():
+            scalar_setup()()
+            batch_setup(3)()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+
+from quaternion_sim.geometry.quaternion import Quaternion, quaternion_z, slerp
+from quaternion_sim.geometry.pose import Pose
+from quaternion_sim.geometry.pose_array import PoseArray
+from quaternion_sim.geometry.dual_quaternion import DualQuaternion, DualQuaternionArray, sclerp
+
+
+def random_poses(size: int, seed: int = 0) -> PoseArray:
+    random = np.random.RandomState(seed)
+    quats = random.normal(size=(size, 4))
+    quats /= np.linalg.norm(quats, axis=1).reshape(-1, 1)
+    return PoseArray(quats, random.normal(size=(size, 3)))
+
+
+class TestDualQuaternion(unittest.TestCase):
+    def test_pose_conversion(self):
+        pose = Pose(quaternion_z(0.7), np.array([1, 2, 3]))
+        dquat = DualQuaternion.from_pose(pose)
+        self.assertEqual(dquat.real, quaternion_z(0.7))
+        self.assertTrue(dquat.to_pose().is_equal(pose))
+
+        self.assertTrue(DualQuaternion.identity().to_pose().is_equal(Pose()))
+
+    def test_mul_conjugate(self):
+        poses = random_poses(2)
+        dquat_1 = DualQuaternion.from_pose(poses[0])
+        dquat_2 = DualQuaternion.from_pose(poses[1])
+
+        self.assertTrue((dquat_1 * dquat_2).to_pose().is_equal(poses[0].compose(poses[1])))
+        self.assertTrue(dquat_1.get_conjugate().to_pose().is_equal(poses[0].inverse()))
+        self.assertEqual(dquat_1 * dquat_1.get_conjugate(), DualQuaternion.identity())
+
+        dquat_1.conjugate()
+        self.assertTrue(dquat_1.to_pose().is_equal(poses[0].inverse()))
+
+    def test_sclerp(self):
+        start = DualQuaternion.from_pose(Pose(Quaternion(), np.array([1, 0, 0])))
+        end = DualQuaternion.from_pose(Pose(quaternion_z(180, False), np.array([-1, 0, 0])))
+
+        self.assertEqual(sclerp(start, end, 0.0), start)
+        self.assertEqual(sclerp(start, end, 1.0), end)
+
+        # rotation around the z axis through the origin: the position follows the circle
+        res = Pose(quaternion_z(90, False), np.array([0, 1, 0]))
+        self.assertTrue(sclerp(start, end, 0.5).to_pose().is_equal(res))
+
+        # pure translation
+        end = DualQuaternion.from_pose(Pose(Quaternion(), np.array([3, 2, 0])))
+        res = Pose(Quaternion(), np.array([2, 1, 0]))
+        self.assertTrue(sclerp(start, end, 0.5).to_pose().is_equal(res))
+
+        # screw motion: rotation around z combined with a translation along z
+        start = DualQuaternion.from_pose(Pose(Quaternion(), np.array([1, 0, 0])))
+        end = DualQuaternion.from_pose(Pose(quaternion_z(90, False), np.array([0, 1, 2])))
+        res = Pose(quaternion_z(45, False), np.array([np.sqrt(0.5), np.sqrt(0.5), 1]))
+        self.assertTrue(sclerp(start, end, 0.5).to_pose().is_equal(res))
+
+
+class TestDualQuaternionArray(unittest.TestCase):
+    def test_pose_array_conversion(self):
+        poses = random_poses(10)
+        dquats = DualQuaternionArray.from_pose_array(poses)
+        self.assertEqual(len(dquats), 10)
+        self.assertTrue(np.all(dquats.to_pose_array().is_equal(poses)))
+
+        for i in range(10):
+            self.assertEqual(dquats[i], DualQuaternion.from_pose(poses[i]))
+
+    def test_mul(self):
+        poses_1 = random_poses(10, 1)
+        poses_2 = random_poses(10, 2)
+        dquats_1 = DualQuaternionArray.from_pose_array(poses_1)
+        dquats_2 = DualQuaternionArray.from_pose_array(poses_2)
+
+        self.assertTrue(np.all((dquats_1 * dquats_2).to_pose_array().is_equal(poses_1.compose(poses_2))))
+        self.assertTrue(np.all((dquats_1 * dquats_2[0]).to_pose_array().is_equal(poses_1.compose(poses_2[0]))))
+        self.assertTrue(np.all((dquats_1[0] * dquats_2).to_pose_array().is_equal(
+            PoseArray.from_poses([poses_1[0]]).compose(poses_2))))
+        self.assertTrue(np.all(dquats_1.get_conjugate().to_pose_array().is_equal(poses_1.inverse())))
+
+    def test_sclerp(self):
+        starts = DualQuaternionArray.from_pose_array(random_poses(10, 1))
+        ends = DualQuaternionArray.from_pose_array(random_poses(10, 2))
+        coeffs = np.linspace(0, 1, 10)
+
+        res = sclerp(starts, ends, coeffs)
+        for i in range(10):
+            self.assertEqual(res[i], sclerp(starts[i], ends[i], coeffs[i]))
+            # the orientations follow slerp
+            self.assertTrue(np.allclose(res[i].real.to_rot_matrix(),
+                                        slerp(starts[i].real, ends[i].real, coeffs[i], True).to_rot_matrix()))
+
+        self.assertTrue(np.all(sclerp(starts, ends, 1.0).to_pose_array().is_equal(ends.to_pose_array())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,15 @@
+import copy
+import threading
+import time
 import unittest
 
-from numpy import array, allclose
+from numpy import array, allclose, random
 
-from quaternion_sim.frames import Frame, FrameManager
+from quaternion_sim.frames import Frame, FrameManager, ArrayFrameManager, PoseHistory
 from quaternion_sim.geometry.quaternion import Quaternion, quaternion_axis_theta, quaternion_x, \
                                      quaternion_z
 from quaternion_sim.geometry.pose import Pose
+from quaternion_sim.geometry.pose_array import PoseArray
 from quaternion_sim.solids import Solid
 
 
@@ -157,6 +161,507 @@ class TestFrame(unittest.TestCase):
         self.assertTrue(poses["frame_4"].is_equal(pose_frame_4))
         self.assertTrue(poses["frame_5"].is_equal(pose_frame_5))
 
+    def test_world_pose_cache(self):
+        quat_x = quaternion_x(90, False)
+        vec_z = array([0, 0, 1])
+
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame_1 = Frame("frame_1", Pose(quat_x, vec_z), "fixed")
+        frame_2 = Frame("frame_2", Pose(quat_x, vec_z), "frame_1")
+        frame_3 = Frame("frame_3", Pose(), "fixed")
+
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(frame_1)
+        frame_mgr.add_frame(frame_2)
+        frame_mgr.add_frame(frame_3)
+
+        poses = frame_mgr.get_all_frame_poses()
+        self.assertIs(frame_mgr.get_world_pose("frame_2"), poses["frame_2"])
+
+        # only frame_1 and its descendants are recomputed
+        frame_1.translate(array([1, 0, 0]))
+        new_poses = frame_mgr.get_all_frame_poses()
+        self.assertIs(new_poses["frame_3"], poses["frame_3"])
+        self.assertIsNot(new_poses["frame_1"], poses["frame_1"])
+        self.assertTrue(new_poses["frame_2"].is_equal(Pose(quaternion_x(180, False), array([1, -1, 1]))))
+
+        frame_2.rotate(quaternion_x(-90, False))
+        self.assertTrue(frame_mgr.get_world_pose("frame_2").is_equal(Pose(quat_x, array([1, -1, 1]))))
+
+        frame_1.pose = Pose()
+        self.assertTrue(frame_mgr.get_world_pose("frame_2").is_equal(Pose(Quaternion(), vec_z)))
+
+        # a pose modified in place has to be notified
+        frame_3.pose.translate(array([0, 2, 0]))
+        frame_3.mark_dirty()
+        self.assertTrue(frame_mgr.get_all_frame_poses()["frame_3"].is_equal(Pose(position=array([0, 2, 0]))))
+
+    def test_world_pose_cache_solid(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame_1 = Frame("frame_1", Pose(quaternion_z(90, False), array([1, 0, 0])), "fixed")
+        solid = Solid("solid", pose=Pose(), ref_frame="frame_1")
+
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(frame_1)
+        frame_mgr.add_frame(solid.frame)
+        frame_mgr.get_all_frame_poses()
+
+        solid.translate(array([1, 0, 0]))
+        self.assertTrue(frame_mgr.get_world_pose(solid.frame.name).is_equal(
+            Pose(quaternion_z(90, False), array([1, 1, 0]))))
+        self.assertTrue(frame_mgr.solid_pose_in_frame(solid, frame_1).is_equal(Pose(position=array([1, 0, 0]))))
+
+        solid.rotate(quaternion_z(-90, False))
+        self.assertTrue(frame_mgr.get_world_pose(solid.frame.name).is_equal(Pose(position=array([1, 1, 0]))))
+
+        solid.set_pose(Pose(position=array([0, 0, 3])))
+        self.assertTrue(frame_mgr.get_world_pose(solid.frame.name).is_equal(
+            Pose(quaternion_z(90, False), array([1, 0, 3]))))
+
+
+    def test_frame_copy(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame = Frame("frame", Pose(quaternion_z(90, False), array([1, 0, 0])), "fixed",
+                      history_size=4, static=True)
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(frame)
+        frame_mgr.record(0.0)
+
+        for res in (frame.copy(), copy.copy(frame), copy.deepcopy(frame)):
+            self.assertEqual((res.name, res.ref_frame, res.static), ("frame", "fixed", True))
+            self.assertTrue(res.pose.is_equal(frame.pose))
+            self.assertIsNone(res._manager)
+            self.assertIsNone(res.history)
+            res.translate(array([0, 1, 0]))
+            self.assertTrue(frame.pose.is_equal(Pose(quaternion_z(90, False), array([1, 0, 0]))))
+            self.assertTrue(frame_mgr.get_world_pose("frame").is_equal(frame.pose))
+
+        # the copy of an ArrayFrameManager frame does not view its arrays
+        array_frame_mgr = ArrayFrameManager(Frame("fixed", Pose(), ""))
+        array_frame_mgr.add_frame(Frame("frame", Pose(), "fixed"))
+        res = copy.deepcopy(array_frame_mgr.frames["frame"])
+        res.translate(array([1, 0, 0]))
+        self.assertTrue(array_frame_mgr.get_world_pose("frame").is_equal(Pose()))
+
+    def test_solid_copy(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        solid = Solid("solid", pose=Pose(quaternion_z(90, False), array([1, 0, 0])),
+                      init_pose=Pose(position=array([0, 0, 1])), ref_frame="fixed")
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(solid.frame)
+
+        # the manager holds a lock: a deep copy must not walk to it
+        for res in (solid.copy(), copy.copy(solid), copy.deepcopy(solid)):
+            self.assertTrue(res.get_pose().is_equal(solid.get_pose()))
+            self.assertIsNot(res.frame, solid.frame)
+            self.assertIsNone(res.frame._manager)
+            res.translate(array([0, 1, 0]))
+            res.init_pose.translate(array([0, 1, 0]))
+            self.assertTrue(solid.get_pose().is_equal(Pose(quaternion_z(90, False), array([1, 0, 0]))))
+            self.assertTrue(solid.get_init_pose().is_equal(Pose(position=array([0, 0, 1]))))
+
+        # copying into a solid of a manager reuses its buffers and updates the world poses
+        other = Solid("other", pose=Pose(), ref_frame="fixed")
+        frame_mgr.add_frame(other.frame)
+        frame_mgr.get_all_frame_poses()
+        pose = other.get_pose()
+        other.vel[:] = 1.0
+        self.assertIs(solid.copy(other), other)
+        self.assertIs(other.get_pose(), pose)
+        self.assertTrue(allclose(other.vel, 0.0))
+        self.assertTrue(frame_mgr.get_world_pose("frame_other").is_equal(solid.get_pose()))
+
+        other.reset_pose()
+        self.assertTrue(other.get_pose().is_equal(Pose(position=array([0, 0, 1]))))
+        self.assertIsNot(other.get_pose(dcopy=True), other.get_pose())
+
+    def test_lowest_common_ancestor(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame_mgr = FrameManager(fixed_frame)
+
+        rand = random.RandomState(0)
+        names = ["fixed"]
+        for i in range(200):
+            quat = Quaternion(rand.normal(size=4))
+            quat.normalize()
+            frame_mgr.add_frame(Frame("frame_{0}".format(i), Pose(quat, rand.normal(size=3)),
+                                      names[rand.randint(len(names))]))
+            names.append("frame_{0}".format(i))
+
+        def ancestors(name):
+            res = [name]
+            while res[-1] != "fixed":
+                res.append(frame_mgr.frames[res[-1]].ref_frame)
+            return res
+
+        poses = frame_mgr.get_all_frame_poses()
+        for _ in range(200):
+            name_1, name_2 = names[rand.randint(len(names))], names[rand.randint(len(names))]
+            ancestors_2 = ancestors(name_2)
+            common = [name for name in ancestors(name_1) if name in ancestors_2][0]
+            self.assertEqual(frame_mgr.lowest_common_ancestor(name_1, name_2), common)
+
+            fwd_frame_seq, bwd_frame_seq = frame_mgr.get_frame_seq(frame_mgr.frames[name_1],
+                                                                   frame_mgr.frames[name_2])
+            self.assertEqual(fwd_frame_seq, ancestors_2[:ancestors_2.index(common) + 1])
+            self.assertEqual(bwd_frame_seq[-1], common)
+
+            pose = frame_mgr.get_relative_pose(name_1, name_2)
+            self.assertTrue(poses[name_1].compose(pose).is_equal(poses[name_2]))
+
+    def test_get_frame_seq_siblings(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame_1 = Frame("frame_1", Pose(), "fixed")
+        frame_2 = Frame("frame_2", Pose(quaternion_x(90, False), array([0, 0, 1])), "frame_1")
+        frame_3 = Frame("frame_3", Pose(quaternion_z(90, False), array([1, 0, 0])), "frame_1")
+
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(frame_1)
+        frame_mgr.add_frame(frame_2)
+        frame_mgr.add_frame(frame_3)
+
+        # the path does not go through the fixed frame
+        self.assertEqual(frame_mgr.get_frame_seq(frame_2, frame_3), [["frame_3", "frame_1"], ["frame_2", "frame_1"]])
+        self.assertEqual(frame_mgr.get_frame_seq(frame_1, frame_3), [["frame_3", "frame_1"], ["frame_1"]])
+        self.assertEqual(frame_mgr.get_frame_seq(frame_3, frame_1), [["frame_1"], ["frame_3", "frame_1"]])
+
+        solid = Solid("solid", pose=Pose(), ref_frame="frame_3")
+        res = Pose(quaternion_x(-90, False) * quaternion_z(90, False), array([1, -1, 0]))
+        self.assertTrue(frame_mgr.solid_pose_in_frame(solid, frame_2).is_equal(res))
+
+
+
+    def test_transform_points_poses(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame_1 = Frame("frame_1", Pose(quaternion_x(90, False), array([0, 0, 1])), "fixed")
+        frame_2 = Frame("frame_2", Pose(quaternion_z(90, False), array([1, 0, 0])), "frame_1")
+        frame_3 = Frame("frame_3", Pose(quaternion_axis_theta(array([1, 2, 3]), 0.5), array([0, 2, 0])), "fixed")
+
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(frame_1)
+        frame_mgr.add_frame(frame_2)
+        frame_mgr.add_frame(frame_3)
+
+        rand = random.RandomState(2)
+        points = rand.normal(size=(20, 3))
+        quats = rand.normal(size=(20, 4))
+        poses = PoseArray(quats / (quats ** 2).sum(axis=1).reshape(-1, 1) ** 0.5, rand.normal(size=(20, 3)))
+
+        pose_2_in_3 = frame_mgr.get_world_pose("frame_3").inverse().compose(frame_mgr.get_world_pose("frame_2"))
+
+        res = frame_mgr.transform_points(points, "frame_2", "frame_3")
+        for point, point_res in zip(points, res):
+            self.assertTrue(allclose(pose_2_in_3.transform_points(point.reshape(1, 3))[0], point_res))
+
+        # back and forth
+        out = points.copy()
+        frame_mgr.transform_points(res, "frame_3", "frame_2", out=out)
+        self.assertTrue(allclose(out, points))
+
+        res = frame_mgr.transform_poses(poses, "frame_2", "frame_3")
+        for i in range(20):
+            self.assertTrue(res[i].is_equal(pose_2_in_3.compose(poses[i])))
+
+        frame_mgr.transform_poses(res, "frame_3", "frame_2", out=res)
+        self.assertTrue(res.is_equal(poses).all())
+
+
+    def test_pose_history(self):
+        history = PoseHistory(4)
+        for i in range(6):
+            history.record(float(i), Pose(quaternion_z(10 * i, False), array([i, 0, 0])))
+
+        # only the last 4 poses are kept
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history.times.tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertRaises(AssertionError, history.pose_at, 1.5)
+        self.assertRaises(AssertionError, history.record, 4.0, Pose())
+
+        self.assertTrue(history.pose_at(2.0).is_equal(Pose(quaternion_z(20, False), array([2, 0, 0]))))
+        self.assertTrue(history.pose_at(5.0).is_equal(Pose(quaternion_z(50, False), array([5, 0, 0]))))
+        self.assertTrue(history.pose_at(3.25).is_equal(Pose(quaternion_z(32.5, False), array([3.25, 0, 0]))))
+        self.assertTrue(history.pose_at(4.5).is_equal(Pose(quaternion_z(45, False), array([4.5, 0, 0]))))
+
+    def test_lookup_at(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        plate = Frame("plate", Pose(), "fixed", history_size=10)
+        sensor = Frame("sensor", Pose(position=array([0, 0, 1])), "plate")
+        ball = Frame("ball", Pose(position=array([1, 0, 0])), "fixed", history_size=10)
+
+        frame_mgr = FrameManager(fixed_frame)
+        frame_mgr.add_frame(plate)
+        frame_mgr.add_frame(sensor)
+        frame_mgr.add_frame(ball)
+
+        for i in range(20):
+            frame_mgr.record(0.1 * i)
+            plate.rotate(quaternion_x(9, False))
+            ball.translate(array([0, 0.1, 0]))
+
+        # the sensor has no history: its current pose is used
+        res = Pose(quaternion_x(135, False), array([0, -0.5 * 2 ** 0.5, -0.5 * 2 ** 0.5]))
+        self.assertTrue(frame_mgr.lookup_at(1.5, "fixed", "sensor").is_equal(res))
+
+        res = Pose(quaternion_x(-121.5, False), array([1, 1.35, 0]))
+        res = Pose(res.orientation, res.orientation.to_rot_array() @ array([1, 1.35, 0]))
+        self.assertTrue(frame_mgr.lookup_at(1.35, "plate", "ball").is_equal(res))
+        self.assertRaises(AssertionError, frame_mgr.lookup_at, 0.5, "plate", "ball")
+
+    def test_static_frames(self):
+        random.seed(3)
+
+        def random_pose():
+            quat = Quaternion(random.normal(size=4))
+            quat.normalize()
+            return Pose(quat, random.normal(size=3))
+
+        def build(static: bool, manager_type=FrameManager):
+            # fixed -> mount (static) -> sensor (static) -> lens (static) -> probe
+            #       -> arm -> bracket (static) -> tool (static)
+            random.seed(3)
+            frame_mgr = manager_type(Frame("fixed", Pose(), ""))
+            frame_mgr.add_frame(Frame("mount", random_pose(), "fixed", static=static))
+            frame_mgr.add_frame(Frame("sensor", random_pose(), "mount", static=static))
+            frame_mgr.add_frame(Frame("lens", random_pose(), "sensor", static=static))
+            frame_mgr.add_frame(Frame("probe", random_pose(), "lens"))
+            frame_mgr.add_frame(Frame("arm", random_pose(), "fixed"))
+            frame_mgr.add_frame(Frame("bracket", random_pose(), "arm", static=static))
+            frame_mgr.add_frame(Frame("tool", random_pose(), "bracket", static=static))
+            return frame_mgr
+
+        def check(frame_mgr, ref_mgr):
+            for from_name in ref_mgr.frames:
+                for to_name in ref_mgr.frames:
+                    self.assertTrue(frame_mgr.get_relative_pose(from_name, to_name).is_equal(
+                        ref_mgr.get_relative_pose(from_name, to_name)))
+            poses = frame_mgr.get_all_frame_poses()
+            ref_poses = ref_mgr.get_all_frame_poses()
+            for name in ref_mgr.frames:
+                self.assertTrue(poses[name].is_equal(ref_poses[name]))
+
+        for manager_type in (FrameManager, ArrayFrameManager):
+            frame_mgr = build(True, manager_type)
+            ref_mgr = build(False, manager_type)
+            check(frame_mgr, ref_mgr)
+
+            # the chains are precomposed up to the closest moving ancestor
+            self.assertEqual(frame_mgr._static_chain("lens")[0], "fixed")
+            self.assertEqual(frame_mgr._static_chain("tool")[0], "arm")
+            self.assertTrue(frame_mgr.get_world_pose("lens").is_equal(ref_mgr.get_world_pose("lens")))
+
+            # moving a frame above a chain does not rebuild it
+            tool_chain = frame_mgr._static_chain("tool")
+            for mgr in (frame_mgr, ref_mgr):
+                mgr.frames["arm"].rotate(quaternion_x(30, False))
+                mgr.frames["probe"].translate(array([0, 1, 0]))
+            self.assertIs(frame_mgr._static_chain("tool"), tool_chain)
+            self.assertTrue(frame_mgr.get_world_pose("tool").is_equal(ref_mgr.get_world_pose("tool")))
+            check(frame_mgr, ref_mgr)
+
+            # editing a static frame rebuilds the chains going through it
+            for mgr in (frame_mgr, ref_mgr):
+                mgr.frames["sensor"].translate(array([1, 0, 0]))
+                mgr.frames["bracket"].pose = Pose(quaternion_z(45, False), array([0, 0, 2]))
+            self.assertIsNot(frame_mgr._static_chain("tool"), tool_chain)
+            self.assertTrue(frame_mgr.get_world_pose("lens").is_equal(ref_mgr.get_world_pose("lens")))
+            check(frame_mgr, ref_mgr)
+
+        # deep static chain (longer than the recursion limit)
+        frame_mgr = FrameManager(Frame("fixed", Pose(), ""))
+        frame_mgr.add_frame(Frame("base", Pose(), "fixed"))
+        for i in range(3000):
+            ref_frame = "static_{0}".format(i - 1) if i > 0 else "base"
+            frame_mgr.add_frame(Frame("static_{0}".format(i), Pose(position=array([1, 0, 0])),
+                                      ref_frame, static=True))
+        self.assertEqual(frame_mgr._static_chain("static_2999")[0], "base")
+        self.assertTrue(frame_mgr.get_relative_pose("base", "static_2999").is_equal(
+            Pose(position=array([3000, 0, 0]))))
+        frame_mgr.frames["static_1000"].translate(array([0, 1, 0]))
+        self.assertTrue(frame_mgr.get_world_pose("static_2999").is_equal(Pose(position=array([3000, 1, 0]))))
+
+        # static frames edited in bulk through the local poses
+        frame_mgr = build(True, ArrayFrameManager)
+        ref_mgr = build(False, ArrayFrameManager)
+        check(frame_mgr, ref_mgr)
+        for mgr in (frame_mgr, ref_mgr):
+            mgr.local_poses.positions[mgr.frame_ids["sensor"]] += [0, 0, 1]
+            mgr.mark_all_dirty()
+        check(frame_mgr, ref_mgr)
+
+
+class TestArrayFrameManager(unittest.TestCase):
+    def build_trees(self, size: int):
+        """
+        Returns a FrameManager and an ArrayFrameManager holding the same random tree
+        """
+        rand = random.RandomState(1)
+        frame_mgr = FrameManager(Frame("fixed", Pose(), ""))
+        array_frame_mgr = ArrayFrameManager(Frame("fixed", Pose(), ""), capacity=4)
+
+        names = ["fixed"]
+        for i in range(size):
+            quat = Quaternion(rand.normal(size=4))
+            quat.normalize()
+            pose = Pose(quat, rand.normal(size=3))
+            ref_frame = names[rand.randint(len(names))]
+            frame_mgr.add_frame(Frame("frame_{0}".format(i), Pose(pose.orientation, pose.position), ref_frame))
+            array_frame_mgr.add_frame(Frame("frame_{0}".format(i), pose, ref_frame))
+            names.append("frame_{0}".format(i))
+
+        return frame_mgr, array_frame_mgr
+
+    def assert_same_poses(self, frame_mgr, array_frame_mgr):
+        poses = frame_mgr.get_all_frame_poses()
+        array_poses = array_frame_mgr.get_all_frame_poses()
+        self.assertEqual(sorted(poses), sorted(array_poses))
+        for name, pose in poses.items():
+            self.assertTrue(pose.is_equal(array_poses[name]), name)
+
+    def test_world_poses(self):
+        frame_mgr, array_frame_mgr = self.build_trees(300)
+        self.assert_same_poses(frame_mgr, array_frame_mgr)
+
+        for name in ["frame_0", "frame_10", "frame_150"]:
+            frame_mgr.frames[name].translate(array([1, 2, 3]))
+            array_frame_mgr.frames[name].translate(array([1, 2, 3]))
+            frame_mgr.frames[name].rotate(quaternion_x(0.3))
+            array_frame_mgr.frames[name].rotate(quaternion_x(0.3))
+        self.assert_same_poses(frame_mgr, array_frame_mgr)
+
+        frame_mgr.frames["frame_3"].pose = Pose(quaternion_z(0.2), array([0, 0, 1]))
+        array_frame_mgr.frames["frame_3"].pose = Pose(quaternion_z(0.2), array([0, 0, 1]))
+        self.assertTrue(frame_mgr.get_world_pose("frame_3").is_equal(array_frame_mgr.get_world_pose("frame_3")))
+        self.assert_same_poses(frame_mgr, array_frame_mgr)
+
+        self.assertTrue(frame_mgr.get_relative_pose("frame_7", "frame_200").is_equal(
+            array_frame_mgr.get_relative_pose("frame_7", "frame_200")))
+
+    def test_deep_chain_update(self):
+        frame_mgr = FrameManager(Frame("fixed", Pose(), ""))
+        array_frame_mgr = ArrayFrameManager(Frame("fixed", Pose(), ""))
+        for i in range(50):
+            ref_frame = "frame_{0}".format(i - 1) if i > 0 else "fixed"
+            for mgr in (frame_mgr, array_frame_mgr):
+                mgr.add_frame(Frame("frame_{0}".format(i), Pose(quaternion_x(0.1), array([1, 0, 0])), ref_frame))
+        self.assert_same_poses(frame_mgr, array_frame_mgr)
+        self.assertFalse(array_frame_mgr._dirty_mask[0:51].any())
+
+        # a clean query does not touch the world poses
+        world_poses = array_frame_mgr.get_world_pose_array()
+        orientations = world_poses.orientations.array.copy()
+        self.assertTrue(array_frame_mgr.get_world_pose("frame_49").is_equal(frame_mgr.get_world_pose("frame_49")))
+        self.assertTrue((world_poses.orientations.array == orientations).all())
+
+        # only the levels below the dirty frame are recomputed
+        for mgr in (frame_mgr, array_frame_mgr):
+            mgr.frames["frame_40"].translate(array([0, 0, 1]))
+        self.assertEqual(array_frame_mgr._dirty_mask[0:51].sum(), 10)
+        self.assert_same_poses(frame_mgr, array_frame_mgr)
+        self.assertFalse(array_frame_mgr._dirty_mask[0:51].any())
+
+    def test_local_poses(self):
+        frame_mgr, array_frame_mgr = self.build_trees(50)
+
+        # the poses of the frames view the local poses arrays
+        array_frame_mgr.local_poses.positions[5] += 1.0
+        self.assertTrue(allclose(array_frame_mgr.frames[array_frame_mgr.frame_names[5]].pose.position.ravel(),
+                                 array_frame_mgr.local_poses.positions[5]))
+
+        array_frame_mgr.local_poses.translate(array([0, 0, 1]))
+        array_frame_mgr.mark_all_dirty()
+        for name in frame_mgr.frame_names:
+            frame_mgr.frames[name].translate(array([0, 0, 1]))
+        frame_mgr.frames[frame_mgr.frame_names[5]].translate(array([1, 1, 1]))
+        self.assert_same_poses(frame_mgr, array_frame_mgr)
+
+        world_poses = array_frame_mgr.get_world_pose_array()
+        self.assertEqual(len(world_poses), 51)
+        self.assertTrue(world_poses[10].is_equal(frame_mgr.get_world_pose(frame_mgr.frame_names[10])))
+
+    def test_solid(self):
+        array_frame_mgr = ArrayFrameManager(Frame("fixed", Pose(), ""), capacity=1)
+        array_frame_mgr.add_frame(Frame("frame_1", Pose(quaternion_z(90, False), array([1, 0, 0])), "fixed"))
+        solid = Solid("solid", pose=Pose(), ref_frame="frame_1")
+        array_frame_mgr.add_frame(solid.frame)
+
+        solid.translate(array([1, 0, 0]))
+        self.assertTrue(array_frame_mgr.get_world_pose(solid.frame.name).is_equal(
+            Pose(quaternion_z(90, False), array([1, 1, 0]))))
+
+        solid.set_pose(Pose(position=array([0, 0, 3])))
+        self.assertIs(solid.pose, solid.frame.pose)
+        self.assertTrue(array_frame_mgr.get_world_pose(solid.frame.name).is_equal(
+            Pose(quaternion_z(90, False), array([1, 0, 3]))))
+
+        solid.set_position(array([0, 0, 1]))
+        solid.set_orientation(quaternion_z(-90, False))
+        self.assertTrue(array_frame_mgr.get_world_pose(solid.frame.name).is_equal(Pose(position=array([1, 0, 1]))))
+
+
+
+class TestFrameSnapshot(unittest.TestCase):
+    def build_frame_mgr(self, frame_mgr_class):
+        frame_mgr = frame_mgr_class(Frame("fixed", Pose(), ""))
+        frame_mgr.add_frame(Frame("frame_1", Pose(position=array([1, 0, 0])), "fixed"))
+        frame_mgr.add_frame(Frame("frame_2", Pose(position=array([0, 1, 0])), "fixed"))
+        frame_mgr.add_frame(Frame("frame_3", Pose(position=array([0, 0, 1])), "frame_1"))
+        return frame_mgr
+
+    def test_snapshot(self):
+        for frame_mgr_class in [FrameManager, ArrayFrameManager]:
+            frame_mgr = self.build_frame_mgr(frame_mgr_class)
+            snapshot = frame_mgr.snapshot()
+            self.assertIs(frame_mgr.snapshot(), snapshot)
+            self.assertTrue(snapshot.get_world_pose("frame_3").is_equal(Pose(position=array([1, 0, 1]))))
+
+            with frame_mgr.updating():
+                frame_mgr.frames["frame_1"].rotate(quaternion_z(90, False))
+                frame_mgr.add_frame(Frame("frame_4", Pose(), "frame_3"))
+
+            # the old snapshot is unchanged
+            self.assertTrue(snapshot.get_world_pose("frame_3").is_equal(Pose(position=array([1, 0, 1]))))
+            self.assertNotIn("frame_4", snapshot)
+
+            new_snapshot = frame_mgr.snapshot()
+            self.assertEqual(new_snapshot.version, snapshot.version + 1)
+            self.assertTrue(new_snapshot.get_world_pose("frame_4").is_equal(
+                Pose(quaternion_z(90, False), array([1, 0, 1]))))
+            self.assertTrue(new_snapshot.get_relative_pose("frame_2", "frame_4").is_equal(
+                frame_mgr.get_relative_pose("frame_2", "frame_4")))
+            self.assertEqual(sorted(new_snapshot.get_all_frame_poses()), sorted(frame_mgr.frames))
+
+            # the snapshot is read-only
+            self.assertRaises(ValueError, new_snapshot.get_world_pose("frame_1").translate, array([1, 0, 0]))
+
+    def test_concurrent_updates(self):
+        frame_mgr = self.build_frame_mgr(FrameManager)
+        frame_1 = frame_mgr.frames["frame_1"]
+        frame_2 = frame_mgr.frames["frame_2"]
+        stop = threading.Event()
+
+        def writer():
+            # frame_1 and frame_2 always move together
+            while not stop.is_set():
+                with frame_mgr.updating():
+                    frame_1.translate(array([0, 0, 0.1]))
+                    frame_2.translate(array([0, 0, 0.1]))
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            versions = set()
+            deadline = time.time() + 5.0
+            while len(versions) < 20 and time.time() < deadline:
+                snapshot = frame_mgr.snapshot()
+                versions.add(snapshot.version)
+                self.assertAlmostEqual(snapshot.get_world_pose("frame_1").position[2, 0],
+                                       snapshot.get_world_pose("frame_2").position[2, 0])
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertGreater(len(versions), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
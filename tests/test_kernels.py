@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+
+from quaternion_sim.geometry import kernels
+from quaternion_sim.geometry.quaternion import Quaternion, slerp, DOT_THRESHOLD
+
+
+def random_quaternions(shape, seed: int = 0) -> np.ndarray:
+    quats = np.random.RandomState(seed).normal(size=shape + (4,))
+    return quats / np.linalg.norm(quats, axis=-1)[..., np.newaxis]
+
+
+class KernelsTests(object):
+    """
+    Tests run against each backend, the subclasses select the backend
+    """
+    BACKEND = "numpy"
+
+    def setUp(self):
+        self.previous_backend = kernels.get_backend()
+        kernels.set_backend(self.BACKEND)
+
+    def tearDown(self):
+        kernels.set_backend(self.previous_backend)
+
+    def test_mul(self):
+        left = random_quaternions((3, 5), 1)
+        right = random_quaternions((5,), 2)
+
+        res = kernels.quat_mul(left, right)
+        self.assertEqual(res.shape, (3, 5, 4))
+        for i in range(3):
+            for j in range(5):
+                self.assertEqual(Quaternion(res[i, j]), Quaternion(left[i, j]) * Quaternion(right[j]))
+
+        out = left.copy()
+        kernels.quat_mul(out, right, out=out)
+        self.assertTrue(np.allclose(out, res))
+
+    def test_normalize(self):
+        quats = np.random.RandomState(0).normal(size=(6, 4))
+        quats[2] = 0.0
+
+        res = kernels.quat_normalize(quats)
+        self.assertTrue(np.allclose(np.linalg.norm(res, axis=-1), 1.0))
+        self.assertTrue(np.allclose(res[2], [1, 0, 0, 0]))
+        self.assertTrue(np.allclose(res[0], quats[0] / np.linalg.norm(quats[0])))
+
+        kernels.quat_normalize(quats, out=quats)
+        self.assertTrue(np.allclose(quats, res))
+
+    def test_rot_matrix_euler(self):
+        quats = random_quaternions((7,), 3)
+
+        mats = kernels.quat_to_rot_matrix(quats)
+        angles = kernels.quat_to_euler_angles(quats)
+        for quat, mat, angle in zip(quats, mats, angles):
+            self.assertTrue(np.allclose(mat, Quaternion(quat).to_rot_matrix()))
+            self.assertTrue(np.allclose(angle, Quaternion(quat).to_euler_angles()))
+
+        res = kernels.quat_from_euler_angles(angles[:, 0], angles[:, 1], angles[:, 2])
+        self.assertTrue(np.allclose(kernels.quat_to_rot_matrix(res), mats))
+        self.assertEqual(kernels.quat_from_euler_angles(0.1, 0.2, 0.3).shape, (4,))
+
+    def test_rotate_vectors(self):
+        quats = random_quaternions((4,), 4)
+        points = np.random.RandomState(5).normal(size=(4, 6, 3))
+
+        res = kernels.quat_rotate_vectors(quats[:, np.newaxis], points)
+        for i in range(4):
+            self.assertTrue(np.allclose(res[i], points[i] @ Quaternion(quats[i]).to_rot_matrix().T))
+
+        kernels.quat_rotate_vectors(quats[:, np.newaxis], points, out=points)
+        self.assertTrue(np.allclose(points, res))
+
+    def test_slerp(self):
+        starts = random_quaternions((8,), 6)
+        ends = random_quaternions((8,), 7)
+        ends[0] = starts[0]
+        coeffs = np.linspace(0, 1, 8)
+
+        for shortest_path in [False, True]:
+            res = kernels.quat_slerp(starts, ends, coeffs, shortest_path, DOT_THRESHOLD)
+            for i in range(8):
+                self.assertEqual(Quaternion(res[i]),
+                                 slerp(Quaternion(starts[i]), Quaternion(ends[i]), coeffs[i], shortest_path))
+
+
+class TestNumpyKernels(KernelsTests, unittest.TestCase):
+    BACKEND = "numpy"
+
+
+@unittest.skipUnless("numba" in kernels.available_backends(), "Numba is not installed")
+class TestNumbaKernels(KernelsTests, unittest.TestCase):
+    BACKEND = "numba"
+
+
+class TestBackendSelection(unittest.TestCase):
+    def test_set_backend(self):
+        previous_backend = kernels.get_backend()
+        try:
+            self.assertEqual(kernels.set_backend("numpy"), "numpy")
+            self.assertEqual(kernels.get_backend(), "numpy")
+            self.assertEqual(kernels.set_backend("auto"), kernels.available_backends()[-1])
+            self.assertRaises(AssertionError, kernels.set_backend, "fortran")
+            if "numba" not in kernels.available_backends():
+                self.assertRaises(ImportError, kernels.set_backend, "numba")
+        finally:
+            kernels.set_backend(previous_backend)
+
+
+if __name__ == '__main__':
+    unittest.main()
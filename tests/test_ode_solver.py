@@ -0,0 +1,203 @@
+import unittest
+
+import numpy as np
+
+from quaternion_sim.geometry.quaternion import Quaternion, quaternion_z
+from quaternion_sim.ode_solver import DormandPrince45, Runge_Kutta_45, RKMK4, rigid_body_derivative, \
+                                      rkmk4_attitude_step, STATE_SIZE, ORIENTATION, ANG_VELOCITY
+
+
+def oscillators(pulsations: np.ndarray):
+    def derivative(_, y):
+        return np.stack([y[..., 1], -pulsations ** 2 * y[..., 0]], axis=-1)
+    return derivative
+
+
+class TestDormandPrince45(unittest.TestCase):
+    def test_exponential(self):
+        solver = DormandPrince45(lambda t, y: -y, 0.0, np.array([1.0, 2.0]), rtol=1e-8, atol=1e-10)
+        res = solver.integrate(5.0)
+        self.assertEqual(solver.t, 5.0)
+        self.assertTrue(np.allclose(res, np.exp(-5.0) * np.array([1.0, 2.0]), rtol=1e-6))
+
+        # first stage reused (FSAL): 6 evaluations per try and 2 for the initialization
+        n_steps = solver.n_rejected
+        solver_steps = DormandPrince45(lambda t, y: -y, 0.0, np.array([1.0, 2.0]), rtol=1e-8, atol=1e-10)
+        while solver_steps.t < 5.0:
+            solver_steps.step(5.0)
+            n_steps += 1
+        self.assertEqual(solver.n_evaluations, 2 + 6 * n_steps)
+
+    def test_dense_output(self):
+        solver = DormandPrince45(lambda t, y: -y, 0.0, np.array([1.0]), rtol=1e-8, atol=1e-10)
+        solver.step()
+        self.assertTrue(np.allclose(solver.dense_output(solver.t_old), solver.y_old))
+        self.assertTrue(np.allclose(solver.dense_output(solver.t), solver.y))
+
+        times = np.linspace(solver.t_old, solver.t, 7)
+        res = solver.dense_output(times)
+        self.assertEqual(res.shape, (7, 1))
+        self.assertTrue(np.allclose(res[:, 0], np.exp(-times), atol=1e-7))
+        self.assertRaises(AssertionError, solver.dense_output, solver.t + 1.0)
+
+    def test_batch(self):
+        pulsations = np.array([1.0, 2.0, 3.0])
+        y_0 = np.stack([np.ones(3), np.zeros(3)], axis=1)
+        solver = DormandPrince45(oscillators(pulsations), 0.0, y_0, rtol=1e-9, atol=1e-12)
+        res = solver.integrate(2.0)
+        self.assertEqual(res.shape, (3, 2))
+        self.assertTrue(np.allclose(res[:, 0], np.cos(2.0 * pulsations), atol=1e-7))
+        self.assertTrue(np.allclose(res[:, 1], -pulsations * np.sin(2.0 * pulsations), atol=1e-7))
+
+        times = np.linspace(solver.t_old, solver.t, 4)
+        self.assertEqual(solver.dense_output(times).shape, (4, 3, 2))
+        self.assertTrue(np.allclose(solver.dense_output(times)[:, :, 0],
+                                    np.cos(np.outer(times, pulsations)), atol=1e-6))
+
+    def test_step_size(self):
+        # nothing happens: the steps grow quickly
+        solver = DormandPrince45(lambda t, y: np.zeros_like(y), 0.0, np.ones(3), max_step=50.0)
+        solver.integrate(1000.0)
+        self.assertLess(solver.n_evaluations, 200)
+        self.assertEqual(solver.h, 50.0)
+
+        # the steps follow the time scale of the solution
+        slow = DormandPrince45(oscillators(1.0), 0.0, np.array([1.0, 0.0]))
+        fast = DormandPrince45(oscillators(20.0), 0.0, np.array([1.0, 0.0]))
+        slow.integrate(1.0)
+        fast.integrate(1.0)
+        self.assertLess(slow.n_evaluations, fast.n_evaluations)
+
+    def test_failures(self):
+        # the derivative becomes nan
+        def nan_after(t, y):
+            return np.full_like(y, np.nan) if t > 0.5 else -y
+
+        solver = DormandPrince45(nan_after, 0.0, np.ones(2))
+        self.assertRaisesRegex(RuntimeError, "not finite", solver.integrate, 1.0)
+        self.assertLessEqual(solver.t, 0.5)
+
+        # the derivative changes at every evaluation: no step size meets the tolerances
+        signs = [1.0]
+
+        def noise(t, y):
+            signs[0] = -signs[0]
+            return signs[0] * np.ones_like(y)
+
+        solver = DormandPrince45(noise, 0.0, np.zeros(1), rtol=1e-15, atol=1e-20, first_step=0.1)
+        self.assertRaisesRegex(RuntimeError, "step size", solver.integrate, 1.0)
+
+
+class TestRigidBody(unittest.TestCase):
+    def test_free_motion(self):
+        integrator = Runge_Kutta_45(mass=2.0)
+        position, velocity, orientation, ang_vel = integrator.compute_next_step(
+            10.0, np.zeros(3), np.array([1.0, 0.0, 0.0]), Quaternion(),
+            np.array([0.0, 0.0, 0.5]), np.array([0.0, 0.0, -4.0]), np.zeros(3))
+
+        self.assertTrue(np.allclose(position.ravel(), [10.0, 0.0, -100.0]))
+        self.assertTrue(np.allclose(velocity.ravel(), [1.0, 0.0, -20.0]))
+        self.assertTrue(np.allclose(orientation.to_rot_matrix(), quaternion_z(5.0).to_rot_matrix(), atol=1e-6))
+        self.assertTrue(np.allclose(ang_vel.ravel(), [0.0, 0.0, 0.5]))
+
+    def test_torque_free_conservation(self):
+        inertias = np.array([np.diag([1.0, 2.0, 3.0]), np.diag([2.0, 2.0, 1.0])])
+        states = np.zeros((2, STATE_SIZE))
+        states[:, ORIENTATION] = [1.0, 0.0, 0.0, 0.0]
+        states[:, ANG_VELOCITY] = [[0.1, 2.0, 0.05], [1.0, 0.5, 3.0]]
+
+        def derivative(_, y):
+            return rigid_body_derivative(y, np.ones(2), inertias, np.zeros((2, 3)), np.zeros((2, 3)))
+
+        def invariants(y):
+            ang_vels = y[:, ANG_VELOCITY]
+            momentum = np.einsum("nij,nj->ni", inertias, ang_vels)
+            rot_matrices = np.array([Quaternion(quat).to_rot_array() for quat in y[:, ORIENTATION]])
+            # kinetic energy and angular momentum in the fixed frame
+            return np.sum(ang_vels * momentum, axis=1), np.einsum("nij,nj->ni", rot_matrices, momentum)
+
+        solver = DormandPrince45(derivative, 0.0, states, rtol=1e-9, atol=1e-12)
+        energies, momenta = invariants(states)
+        res = solver.integrate(20.0)
+        new_energies, new_momenta = invariants(res)
+
+        self.assertTrue(np.allclose(new_energies, energies, rtol=1e-6))
+        self.assertTrue(np.allclose(new_momenta, momenta, atol=1e-6))
+        self.assertTrue(np.allclose(np.linalg.norm(res[:, ORIENTATION], axis=1), 1.0, atol=1e-8))
+
+
+
+class TestRKMK4(unittest.TestCase):
+    def reference(self, quat: np.ndarray, ang_vel: np.ndarray, inertia: np.ndarray, d_time: float) -> np.ndarray:
+        """
+        Torque-free state after d_time integrated with tight tolerances
+        """
+        state = np.zeros(STATE_SIZE)
+        state[ORIENTATION] = quat
+        state[ANG_VELOCITY] = ang_vel
+        solver = DormandPrince45(lambda t, y: rigid_body_derivative(y, 1.0, inertia, np.zeros(3), np.zeros(3)),
+                                 0.0, state, rtol=1e-12, atol=1e-14)
+        return solver.integrate(d_time)
+
+    def test_constant_rotation(self):
+        # spinning around a principal axis: the exponential map is exact whatever the step
+        integrator = RKMK4(np.diag([1.0, 2.0, 3.0]), max_step=10.0)
+        orientation, ang_vel = integrator.compute_next_step(10.0, Quaternion(), np.array([0, 0, 1.5]), np.zeros(3))
+        self.assertTrue(np.allclose(orientation.to_rot_matrix(), quaternion_z(15.0).to_rot_matrix()))
+        self.assertTrue(np.allclose(ang_vel.ravel(), [0, 0, 1.5]))
+
+        # constant moment
+        integrator = RKMK4(2.0 * np.identity(3))
+        orientation, ang_vel = integrator.compute_next_step(2.0, Quaternion(), np.zeros(3), np.array([0, 0, 1.0]))
+        self.assertTrue(np.allclose(orientation.to_rot_matrix(), quaternion_z(1.0).to_rot_matrix()))
+        self.assertTrue(np.allclose(ang_vel.ravel(), [0, 0, 1.0]))
+
+    def test_unit_norm_order(self):
+        inertia = np.diag([1.0, 2.0, 3.0])
+        quat = np.array([1.0, 0.0, 0.0, 0.0])
+        ang_vel = np.array([0.1, 2.0, 0.05])
+        res = self.reference(quat, ang_vel, inertia, 2.0)
+
+        errors = []
+        for n_steps in (20, 40):
+            quats, ang_vels = quat, ang_vel
+            for _ in range(n_steps):
+                quats, ang_vels = rkmk4_attitude_step(quats, ang_vels, inertia, np.zeros(3), 2.0 / n_steps)
+                # unit norm by construction
+                self.assertAlmostEqual(np.linalg.norm(quats), 1.0, places=14)
+            errors.append(np.linalg.norm(Quaternion(quats).to_rot_array() -
+                                         Quaternion(res[ORIENTATION]).to_rot_array()))
+            self.assertTrue(np.allclose(ang_vels, res[ANG_VELOCITY], atol=1e-4))
+
+        # 4th order: halving the step divides the error by about 16
+        self.assertGreater(errors[0] / errors[1], 10.0)
+
+    def test_batch(self):
+        inertias = np.array([np.diag([1.0, 2.0, 3.0]), np.diag([2.0, 2.0, 1.0])])
+        quats = np.array([[1.0, 0.0, 0.0, 0.0], quaternion_z(0.3)[:]])
+        ang_vels = np.array([[0.1, 2.0, 0.05], [1.0, 0.5, 3.0]])
+        moments = np.array([[0.0, 0.0, 0.0], [0.1, 0.0, 0.0]])
+
+        new_quats, new_ang_vels = rkmk4_attitude_step(quats, ang_vels, inertias, moments, 0.05)
+        for i in range(2):
+            new_quat, new_ang_vel = rkmk4_attitude_step(quats[i], ang_vels[i], inertias[i], moments[i], 0.05)
+            self.assertTrue(np.allclose(new_quats[i], new_quat))
+            self.assertTrue(np.allclose(new_ang_vels[i], new_ang_vel))
+
+    def test_geometric_option(self):
+        inertia = np.diag([1.0, 2.0, 3.0])
+        integrator = Runge_Kutta_45(mass=2.0, inertia=inertia, attitude_step=0.01)
+        position, velocity, orientation, ang_vel = integrator.compute_next_step(
+            2.0, np.zeros(3), np.array([1.0, 0.0, 0.0]), Quaternion(),
+            np.array([0.1, 2.0, 0.05]), np.array([0.0, 0.0, -4.0]), np.zeros(3))
+
+        res = self.reference(np.array([1.0, 0.0, 0.0, 0.0]), np.array([0.1, 2.0, 0.05]), inertia, 2.0)
+        self.assertTrue(np.allclose(position.ravel(), [2.0, 0.0, -4.0]))
+        self.assertTrue(np.allclose(velocity.ravel(), [1.0, 0.0, -4.0]))
+        self.assertTrue(np.allclose(orientation.to_rot_array(), Quaternion(res[ORIENTATION]).to_rot_array(),
+                                    atol=1e-6))
+        self.assertTrue(np.allclose(ang_vel.ravel(), res[ANG_VELOCITY], atol=1e-6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import copy
+import unittest
+
+from numpy import array, allclose, identity, random
+
+from quaternion_sim.geometry.quaternion import Quaternion, quaternion_x, quaternion_z, quaternion_axis_theta
+from quaternion_sim.geometry.pose import Pose
+
+
+class TestPose(unittest.TestCase):
+    def test_translate(self):
+        pose = Pose()
+        pose.translate(array([1, 2, 3]))
+        pose.translate(array([1.0, 2.0, 3.0]).reshape(3, 1))
+
+        self.assertTrue(allclose(pose.position, array([2, 4, 6]).reshape(3, 1)))
+
+    def test_rotate(self):
+        quat_x = quaternion_x(90, False)
+        quat_z = quaternion_z(90, False)
+
+        pose_1 = Pose(quat_x)
+        pose_2 = Pose(quat_x)
+        pose_1.rotate(quat_z)
+
+        self.assertEqual(pose_1.orientation, quat_z * quat_x)
+        # the orientation given to the constructor must not be modified
+        self.assertEqual(pose_2.orientation, quat_x)
+        self.assertEqual(quat_x, quaternion_x(90, False))
+        self.assertEqual(Pose().orientation, Quaternion())
+
+    def test_transform(self):
+        pose = Pose(quaternion_axis_theta(array([1, 2, 3]), 0.4), array([1, -2, 0.5]))
+        transform = pose.to_transform()
+
+        self.assertTrue(allclose(transform[0:3, 0:3], pose.orientation.to_rot_matrix()))
+        self.assertTrue(allclose(transform[0:3, 3], [1, -2, 0.5]))
+        self.assertTrue(allclose(transform[3], [0, 0, 0, 1]))
+        self.assertIs(pose.to_transform(), transform)
+        self.assertTrue(Pose.from_transform(transform).is_equal(pose))
+
+        pose.translate(array([1, 0, 0]))
+        self.assertTrue(allclose(pose.to_transform()[0:3, 3], [2, -2, 0.5]))
+        pose.rotate(quaternion_x(0.2))
+        self.assertTrue(allclose(pose.to_transform()[0:3, 0:3], pose.orientation.to_rot_matrix()))
+
+    def test_compose_inverse(self):
+        pose_1 = Pose(quaternion_axis_theta(array([1, 2, 3]), 0.4), array([1, -2, 0.5]))
+        pose_2 = Pose(quaternion_axis_theta(array([-1, 0, 2]), 1.4), array([0, 3, 1]))
+
+        pose = pose_1.compose(pose_2)
+        self.assertTrue(allclose(pose.to_transform(), pose_1.to_transform() @ pose_2.to_transform()))
+
+        self.assertTrue(pose_1.compose(pose_1.inverse()).is_equal(Pose()))
+        self.assertTrue(pose_1.inverse().compose(pose_1).is_equal(Pose()))
+        self.assertTrue(allclose(pose_1.inverse().to_transform() @ pose_1.to_transform(), identity(4)))
+
+    def test_copy(self):
+        pose = Pose(quaternion_axis_theta(array([1, 2, 3]), 0.4), array([1, -2, 0.5]))
+        for res in (pose.copy(), copy.copy(pose), copy.deepcopy(pose)):
+            self.assertTrue(res.is_equal(pose))
+            res.translate(array([1, 0, 0]))
+            res.rotate(quaternion_x(0.2))
+            self.assertTrue(allclose(pose.position, array([1, -2, 0.5]).reshape(3, 1)))
+            self.assertEqual(pose.orientation, quaternion_axis_theta(array([1, 2, 3]), 0.4))
+
+        out = Pose()
+        orientation, position = out.orientation, out.position
+        self.assertIs(pose.copy(out), out)
+        self.assertIs(out.orientation, orientation)
+        self.assertIs(out.position, position)
+        self.assertTrue(out.is_equal(pose))
+        self.assertTrue(allclose(out.to_transform(), pose.to_transform()))
+
+    def test_transform_points(self):
+        pose = Pose(quaternion_axis_theta(array([1, 2, 3]), 0.4), array([1, -2, 0.5]))
+        points = random.RandomState(0).normal(size=(10, 3))
+
+        res = pose.transform_points(points)
+        for point, point_res in zip(points, res):
+            self.assertTrue(allclose(pose.to_transform() @ (list(point) + [1]), list(point_res) + [1]))
+
+        out = points.copy()
+        pose.transform_points(points, out)
+        self.assertTrue(allclose(out, res))
+
+
+if __name__ == '__main__':
+    unittest.main()
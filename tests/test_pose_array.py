@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+
+from quaternion_sim.geometry.quaternion import Quaternion, quaternion_z, slerp
+from quaternion_sim.geometry.quaternion_array import QuaternionArray
+from quaternion_sim.geometry.pose import Pose
+from quaternion_sim.geometry.pose_array import PoseArray
+
+
+def random_poses(size: int, seed: int = 0) -> PoseArray:
+    random = np.random.RandomState(seed)
+    quats = random.normal(size=(size, 4))
+    quats /= np.linalg.norm(quats, axis=1).reshape(-1, 1)
+    return PoseArray(quats, random.normal(size=(size, 3)))
+
+
+class TestPoseArray(unittest.TestCase):
+    def test_constructors(self):
+        poses = PoseArray(positions=[[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(len(poses), 2)
+        self.assertEqual(poses.orientations, QuaternionArray.identity(2))
+
+        poses = PoseArray.from_poses([Pose(quaternion_z(0.3), np.array([1, 2, 3])), Pose()])
+        self.assertTrue(poses[0].is_equal(Pose(quaternion_z(0.3), np.array([1, 2, 3]))))
+        self.assertTrue(poses[1].is_equal(Pose()))
+
+        self.assertTrue(np.all(PoseArray.identity(3).is_equal(Pose())))
+
+    def test_views(self):
+        poses = PoseArray.identity(3)
+        pose = poses[1]
+        pose.translate(np.array([1, 2, 3]))
+        pose.rotate(quaternion_z(0.5))
+
+        self.assertTrue(np.allclose(poses.positions[1], [1, 2, 3]))
+        self.assertEqual(poses.orientations[1], quaternion_z(0.5))
+        self.assertTrue(poses[0].is_equal(Pose()))
+
+        poses[2] = Pose(quaternion_z(0.1), np.array([0, 0, 1]))
+        self.assertTrue(poses[2].is_equal(Pose(quaternion_z(0.1), np.array([0, 0, 1]))))
+
+        self.assertEqual(len(poses[1:]), 2)
+
+    def test_compose_inverse_relative(self):
+        poses_1 = random_poses(10, 1)
+        poses_2 = random_poses(10, 2)
+
+        composed = poses_1.compose(poses_2)
+        inverses = poses_1.inverse()
+        relatives = poses_1.relative(poses_2)
+
+        for i in range(10):
+            self.assertTrue(composed[i].is_equal(poses_1[i].compose(poses_2[i])))
+            self.assertTrue(inverses[i].is_equal(poses_1[i].inverse()))
+            self.assertTrue(relatives[i].is_equal(poses_1[i].inverse().compose(poses_2[i])))
+
+        self.assertTrue(np.all(poses_1.compose(inverses).is_equal(Pose())))
+        self.assertTrue(np.all(poses_1.compose(relatives).is_equal(poses_2)))
+
+        composed = poses_1.compose(poses_2[0])
+        for i in range(10):
+            self.assertTrue(composed[i].is_equal(poses_1[i].compose(poses_2[0])))
+
+    def test_interpolate(self):
+        poses_1 = random_poses(10, 1)
+        poses_2 = random_poses(10, 2)
+        coeffs = np.linspace(0, 1, 10)
+
+        poses = poses_1.interpolate(poses_2, coeffs)
+        for i in range(10):
+            quat = slerp(poses_1[i].orientation, poses_2[i].orientation, coeffs[i], True)
+            position = poses_1.positions[i] * (1 - coeffs[i]) + poses_2.positions[i] * coeffs[i]
+            self.assertTrue(poses[i].is_equal(Pose(quat, position)))
+
+    def test_is_equal(self):
+        poses = random_poses(4)
+        other = PoseArray(-poses.orientations.array, poses.positions)
+        self.assertTrue(np.all(poses.is_equal(other)))
+
+        other.positions[1] += 1.0
+        other.orientations[2] = Quaternion([0, 1, 0, 0])
+        self.assertEqual(poses.is_equal(other).tolist(), [True, False, False, True])
+
+    def test_transform(self):
+        poses = random_poses(5)
+        points = np.random.RandomState(3).normal(size=(5, 7, 3))
+        transforms = poses.to_transform()
+
+        res = poses.transform_points(points)
+        for i in range(5):
+            self.assertTrue(np.allclose(transforms[i], poses[i].to_transform()))
+            self.assertTrue(np.allclose(res[i], poses[i].transform_points(points[i])))
+
+        res = poses.transform_points(points[:, 0])
+        for i in range(5):
+            self.assertTrue(np.allclose(res[i], poses[i].transform_points(points[i, 0:1])[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
+import copy
 import unittest
 from math import sqrt
 import numpy as np
-from quaternion_sim.geometry.quaternion import Quaternion, slerp
+from quaternion_sim.geometry.quaternion import Quaternion, slerp, rotate_vectors, quaternion_axis_theta, \
+                                                quaternion_x, quaternion_y, quaternion_z, quaternion_log, \
+                                                quaternion_exp, integrate_angular_velocity
 
 
 class TestQuaternion(unittest.TestCase):
@@ -63,6 +66,125 @@ class TestQuaternion(unittest.TestCase):
         self.assertEqual(quat.q2, 14)
         self.assertEqual(quat.q3, 44)
 
+    def test_quat_mult_inplace(self):
+        quat_left = Quaternion([1, 2, 3, 4])
+        quat_right = Quaternion([5, -6, 7, -8])
+        res = Quaternion([28, -48, 14, 44])
+
+        out = Quaternion()
+        self.assertIs(quat_left.multiply(quat_right, out), out)
+        self.assertEqual(out, res)
+        self.assertEqual(quat_left.multiply(quat_right), res)
+
+        quat = Quaternion([1, 2, 3, 4])
+        quat.imul(quat_right)
+        self.assertEqual(quat, res)
+
+        quat = Quaternion([5, -6, 7, -8])
+        quat.rotate_inplace(quat_left)
+        self.assertEqual(quat, res)
+
+        quat_left.multiply(quat_right, out=quat_right)
+        self.assertEqual(quat_right, res)
+
+
+    def test_rotate_vectors(self):
+        quat = quaternion_axis_theta(np.array([1, -2, 0.5]), 0.7)
+        points = np.random.RandomState(0).normal(size=(2, 5, 3))
+        res = np.einsum("ij,mnj->mni", np.asarray(quat.to_rot_matrix()), points)
+
+        self.assertTrue(np.allclose(rotate_vectors(quat, points), res))
+        self.assertTrue(np.allclose(rotate_vectors(quat, points[0]), res[0]))
+
+        out = points.copy()
+        self.assertIs(rotate_vectors(quat, out, out), out)
+        self.assertTrue(np.allclose(out, res))
+
+    def test_from_rot_matrix(self):
+        quats = [Quaternion(),
+                 quaternion_x(180, False),
+                 quaternion_y(180, False),
+                 quaternion_z(180, False),
+                 quaternion_axis_theta(np.array([1, 1, 0]), 180, False),
+                 quaternion_axis_theta(np.array([1, -2, 3]), 0.3),
+                 quaternion_axis_theta(np.array([-1, 0.5, 2]), 179.9, False),
+                 # pitch of 90 degrees: gimbal lock for the Euler angles
+                 Quaternion.from_euler_angles(0.3, np.pi / 2, -0.2)]
+
+        for quat in quats:
+            res = Quaternion.from_rot_matrix(quat.to_rot_matrix())
+            self.assertAlmostEqual(res.get_norm(), 1.0)
+            self.assertGreaterEqual(res.q0, 0.0)
+            self.assertTrue(res == quat or res == -quat, [res, quat])
+
+    def test_log_exp(self):
+        quat = quaternion_axis_theta(np.array([1, 2, -1]), 2.5)
+        log = quaternion_log(quat)
+        self.assertAlmostEqual(log.q0, 0.0)
+        self.assertTrue(np.allclose(log[1:4], 2.5 * np.array([1, 2, -1]) / sqrt(6)))
+        self.assertEqual(quaternion_exp(log), quat)
+
+        self.assertEqual(quaternion_log(Quaternion()), Quaternion([0, 0, 0, 0]))
+        self.assertEqual(quaternion_exp(Quaternion([0, 0, 0, 0])), Quaternion())
+
+        # small angles keep their precision
+        quat = quaternion_axis_theta(np.array([0, 0, 1]), 1e-9)
+        self.assertAlmostEqual(quaternion_log(quat).q3 / 1e-9, 1.0, places=6)
+        self.assertAlmostEqual(quaternion_exp(Quaternion([0, 0, 0, 1e-9])).q3 / 0.5e-9, 1.0, places=6)
+
+    def test_integrate_angular_velocity(self):
+        quat = quaternion_x(0.3)
+        ang_vel = np.array([0, 0, 2.0]).reshape(3, 1)
+
+        res = quat
+        for i in range(100):
+            res = integrate_angular_velocity(res, ang_vel, 0.01)
+        self.assertEqual(res, quaternion_z(2.0) * quat)
+        self.assertAlmostEqual(res.get_norm(), 1.0)
+
+        res = integrate_angular_velocity(quat, ang_vel, 1.0, body=True)
+        self.assertEqual(res, quat * quaternion_z(2.0))
+
+        out = Quaternion(quat[:])
+        self.assertIs(integrate_angular_velocity(out, ang_vel, 1.0, out=out), out)
+        self.assertEqual(out, quaternion_z(2.0) * quat)
+
+    def test_rot_matrix_cache(self):
+        quat = quaternion_x(0.5)
+        matrix = quat.to_rot_matrix()
+        self.assertIs(quat.to_rot_matrix(), matrix)
+        self.assertIs(quat.to_rot_array(), quat.to_rot_array())
+        self.assertFalse(quat.to_rot_array().flags.writeable)
+
+        quat.inverse()
+        self.assertTrue(np.allclose(quat.to_rot_matrix(), quaternion_x(-0.5).to_rot_matrix()))
+
+        quat[0] = 2.0
+        quat.normalize()
+        self.assertTrue(np.allclose(quat.to_rot_matrix(), quat.get_normalized().to_rot_matrix()))
+
+        quat.imul(quaternion_z(0.3))
+        self.assertTrue(np.allclose(quat.to_rot_array(), Quaternion(quat[:]).to_rot_array()))
+
+        # writing through a view of the buffer
+        view = quat[:]
+        view[:] = quaternion_y(0.2)[:]
+        self.assertTrue(np.allclose(quat.to_rot_array(), quaternion_y(0.2).to_rot_array()))
+
+    def test_copy(self):
+        quat = quaternion_x(0.5)
+        quat.to_rot_array()
+        for res in (quat.copy(), copy.copy(quat), copy.deepcopy(quat)):
+            self.assertEqual(res, quat)
+            self.assertFalse(np.shares_memory(res[:], quat[:]))
+
+        # the buffer of out is reused and its cached rotation matrix invalidated
+        out = quaternion_z(0.2)
+        out.to_rot_array()
+        buffer = out._array
+        self.assertIs(quat.copy(out), out)
+        self.assertIs(out._array, buffer)
+        self.assertTrue(np.allclose(out.to_rot_array(), quat.to_rot_array()))
 
     def test_slerp(self):
         """
@@ -0,0 +1,197 @@
+import unittest
+import numpy as np
+
+from quaternion_sim.geometry.quaternion import Quaternion, quaternion_axis_theta, lerp, nlerp, slerp, \
+                                                log_interpolation, quaternion_log, quaternion_exp, \
+                                                integrate_angular_velocity
+from quaternion_sim.geometry.quaternion_array import QuaternionArray, lerp_array, nlerp_array, slerp_array, \
+                                                      log_interpolation_array
+
+
+def random_quaternions(size: int, seed: int = 0) -> np.ndarray:
+    quats = np.random.RandomState(seed).normal(size=(size, 4))
+    return quats / np.linalg.norm(quats, axis=1).reshape(-1, 1)
+
+
+class TestQuaternionArray(unittest.TestCase):
+    def test_constructors(self):
+        quats = QuaternionArray([[1, 2, 3, 4], [5, 6, 7, 8]])
+        self.assertEqual(len(quats), 2)
+        self.assertTrue(np.allclose(quats.q0, [1, 5]))
+        self.assertTrue(np.allclose(quats.q3, [4, 8]))
+
+        quats = QuaternionArray([Quaternion([1, 2, 3, 4]), Quaternion()])
+        self.assertEqual(quats[0], Quaternion([1, 2, 3, 4]))
+        self.assertEqual(quats[1], Quaternion())
+
+        quats = QuaternionArray(np.array([1, 2, 3, 4]))
+        self.assertEqual(quats.array.shape, (1, 4))
+
+        self.assertEqual(QuaternionArray.identity(3), QuaternionArray([[1, 0, 0, 0]] * 3))
+
+    def test_row_views(self):
+        quats = QuaternionArray.identity(2)
+        quat = quats[1]
+        self.assertTrue(np.allclose(quat.to_rot_array(), np.identity(3)))
+
+        quats[1] = quaternion_axis_theta(np.array([0, 0, 1]), 0.4)
+        self.assertEqual(quat, quaternion_axis_theta(np.array([0, 0, 1]), 0.4))
+        self.assertTrue(np.allclose(quat.to_rot_array(), quats.to_rot_matrix()[1]))
+
+        quat.inverse()
+        self.assertEqual(quats[1], quaternion_axis_theta(np.array([0, 0, 1]), -0.4))
+
+    def test_quat_mult(self):
+        left = random_quaternions(20, 1)
+        right = random_quaternions(20, 2)
+        quats = QuaternionArray(left) * QuaternionArray(right)
+
+        for i in range(20):
+            self.assertEqual(quats[i], Quaternion(left[i]) * Quaternion(right[i]))
+
+        quats = QuaternionArray([[1, 2, 3, 4]]) * QuaternionArray([[5, -6, 7, -8]])
+        self.assertEqual(quats[0], Quaternion([28, -48, 14, 44]))
+
+    def test_broadcast_quaternion(self):
+        array = random_quaternions(10)
+        quat = quaternion_axis_theta(np.array([1, 2, 3]), 0.3)
+
+        right = QuaternionArray(array) * quat
+        left = quat * QuaternionArray(array)
+        self.assertIsInstance(left, QuaternionArray)
+
+        for i in range(10):
+            self.assertEqual(right[i], Quaternion(array[i]) * quat)
+            self.assertEqual(left[i], quat * Quaternion(array[i]))
+
+    def test_scalar_mult(self):
+        quats = QuaternionArray([[1, 2, 3, 4], [1, 1, 1, 1]])
+        self.assertEqual(2.0 * quats, QuaternionArray([[2, 4, 6, 8], [2, 2, 2, 2]]))
+        self.assertEqual(quats * np.array([1.0, -1.0]), QuaternionArray([[1, 2, 3, 4], [-1, -1, -1, -1]]))
+
+    def test_inverse_normalize(self):
+        quats = QuaternionArray([[1, 2, 3, 4], [0, 0, 0, 0]])
+        self.assertEqual(quats.get_inverse(), QuaternionArray([[1, -2, -3, -4], [0, 0, 0, 0]]))
+
+        quats.normalize()
+        self.assertTrue(np.allclose(quats.get_norm(), [1, 1]))
+        self.assertEqual(quats[0], Quaternion([1, 2, 3, 4]).get_normalized())
+        self.assertEqual(quats[1], Quaternion.identity())
+
+        quats.inverse()
+        self.assertEqual(quats[0], Quaternion([1, 2, 3, 4]).get_normalized().get_inverse())
+
+    def test_dot(self):
+        array = random_quaternions(5)
+        quat = Quaternion([1, 2, 3, 4])
+        dots = QuaternionArray(array).dot(quat)
+        self.assertTrue(np.allclose(dots, [quat.dot(Quaternion(row)) for row in array]))
+
+    def test_to_rot_matrix(self):
+        array = random_quaternions(10)
+        matrices = QuaternionArray(array).to_rot_matrix()
+        self.assertEqual(matrices.shape, (10, 3, 3))
+
+        for i in range(10):
+            self.assertTrue(np.allclose(matrices[i], Quaternion(array[i]).to_rot_matrix()))
+
+    def test_rotate_vectors(self):
+        array = random_quaternions(4)
+        matrices = QuaternionArray(array).to_rot_matrix()
+        points = np.random.RandomState(1).normal(size=(4, 6, 3))
+
+        res = QuaternionArray(array).rotate_vectors(points)
+        self.assertTrue(np.allclose(res, np.einsum("mij,mnj->mni", matrices, points)))
+
+        out = np.empty((4, 3))
+        res = QuaternionArray(array).rotate_vectors(points[:, 0], out=out)
+        self.assertIs(res, out)
+        self.assertTrue(np.allclose(res, np.einsum("mij,mj->mi", matrices, points[:, 0])))
+
+    def test_from_rot_matrix(self):
+        array = random_quaternions(50)
+        array[0] = [0, 1, 0, 0]
+        array[1] = [0, 0, 0, 1]
+        array *= np.sign(array[:, 0:1] + 1e-12)
+
+        quats = QuaternionArray.from_rot_matrix(QuaternionArray(array).to_rot_matrix())
+        self.assertEqual(quats, QuaternionArray(array))
+
+    def test_log_exp(self):
+        array = random_quaternions(10)
+        logs = quaternion_log(QuaternionArray(array))
+        self.assertIsInstance(logs, QuaternionArray)
+
+        for i in range(10):
+            self.assertEqual(logs[i], quaternion_log(Quaternion(array[i])))
+        self.assertEqual(quaternion_exp(logs), QuaternionArray(array))
+
+    def test_integrate_angular_velocity(self):
+        array = random_quaternions(10)
+        ang_vels = np.random.RandomState(1).normal(size=(10, 3))
+        d_times = np.linspace(0.001, 0.1, 10)
+
+        for body in [False, True]:
+            quats = QuaternionArray(array)
+            res = integrate_angular_velocity(quats, ang_vels, d_times, body=body, out=quats)
+            self.assertIs(res, quats)
+            self.assertTrue(np.allclose(quats.get_norm(), 1.0))
+            for i in range(10):
+                self.assertEqual(quats[i], integrate_angular_velocity(Quaternion(array[i]), ang_vels[i],
+                                                                      d_times[i], body=body))
+
+    def test_euler_angles(self):
+        array = random_quaternions(10)
+        angles = QuaternionArray(array).to_euler_angles()
+
+        for i in range(10):
+            self.assertTrue(np.allclose(angles[i], Quaternion(array[i]).to_euler_angles()))
+
+        quats = QuaternionArray.from_euler_angles(angles[:, 0], angles[:, 1], angles[:, 2])
+        for i in range(10):
+            self.assertEqual(quats[i], Quaternion.from_euler_angles(*angles[i]))
+            self.assertTrue(np.allclose(quats[i].to_rot_matrix(), Quaternion(array[i]).to_rot_matrix()))
+
+
+class TestInterpolationArray(unittest.TestCase):
+    def setUp(self):
+        self.starts = random_quaternions(8, 3)
+        self.ends = random_quaternions(8, 4)
+        # close orientations use the nlerp fallback of slerp
+        self.ends[0] = (self.starts[0] + 0.001) / np.linalg.norm(self.starts[0] + 0.001)
+        self.ends[1] = -self.starts[1]
+        self.coeffs = np.linspace(0.0, 1.0, 8)
+
+    def check_interpolation(self, func_array, func, **kwargs):
+        res = func_array(QuaternionArray(self.starts), QuaternionArray(self.ends), self.coeffs, **kwargs)
+        self.assertEqual(len(res), 8)
+        for i in range(8):
+            self.assertEqual(res[i], func(Quaternion(self.starts[i]), Quaternion(self.ends[i]),
+                                          self.coeffs[i], **kwargs))
+
+        start = Quaternion(self.starts[2])
+        end = Quaternion(self.ends[2])
+        res = func_array(start, end, self.coeffs, **kwargs)
+        for i in range(8):
+            self.assertEqual(res[i], func(start, end, self.coeffs[i], **kwargs))
+
+        res = func_array(QuaternionArray(self.starts), end, 0.3, **kwargs)
+        for i in range(8):
+            self.assertEqual(res[i], func(Quaternion(self.starts[i]), end, 0.3, **kwargs))
+
+    def test_lerp(self):
+        self.check_interpolation(lerp_array, lerp)
+
+    def test_nlerp(self):
+        self.check_interpolation(nlerp_array, nlerp)
+
+    def test_slerp(self):
+        self.check_interpolation(slerp_array, slerp)
+        self.check_interpolation(slerp_array, slerp, shortest_path=True)
+
+    def test_log_interpolation(self):
+        self.check_interpolation(log_interpolation_array, log_interpolation)
+
+
+if __name__ == '__main__':
+    unittest.main()
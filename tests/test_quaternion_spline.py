@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+
+from quaternion_sim.geometry.quaternion import Quaternion, quaternion_z, quaternion_axis_theta, slerp
+from quaternion_sim.geometry.quaternion_array import QuaternionArray
+from quaternion_sim.geometry.quaternion_spline import QuaternionSpline
+
+
+class TestQuaternionSpline(unittest.TestCase):
+    def setUp(self):
+        self.times = [0.0, 1.0, 2.5, 3.0, 5.0]
+        self.keyframes = [Quaternion(),
+                          quaternion_axis_theta(np.array([1, 0, 0]), 0.5),
+                          quaternion_axis_theta(np.array([1, 1, 0]), 1.2),
+                          quaternion_axis_theta(np.array([0, 1, 1]), -0.7),
+                          quaternion_axis_theta(np.array([0, 0, 1]), 2.0)]
+        self.spline = QuaternionSpline(self.times, self.keyframes)
+
+    def test_keyframes(self):
+        quats = self.spline.evaluate(self.times)
+        for quat, keyframe in zip(quats, self.keyframes):
+            self.assertTrue(np.allclose(quat.to_rot_matrix(), keyframe.to_rot_matrix()))
+
+        self.assertEqual(self.spline.evaluate(-1.0)[0], self.spline.evaluate(0.0)[0])
+        self.assertEqual(self.spline.evaluate(10.0)[0], self.spline.evaluate(5.0)[0])
+
+    def test_segment_indices(self):
+        indices = self.spline.segment_indices([-1.0, 0.0, 0.5, 1.0, 2.7, 5.0, 6.0])
+        self.assertEqual(indices.tolist(), [0, 0, 0, 1, 2, 3, 3])
+
+    def test_two_keyframes(self):
+        spline = QuaternionSpline([0.0, 2.0], self.keyframes[1:3])
+        quats = spline.evaluate([0.5, 1.0, 1.5])
+        for quat, coeff in zip(quats, [0.25, 0.5, 0.75]):
+            self.assertEqual(quat, slerp(self.keyframes[1], self.keyframes[2], coeff))
+
+    def test_constant_angular_velocity(self):
+        times = np.arange(6, dtype=float)
+        spline = QuaternionSpline(times, QuaternionArray([quaternion_z(0.4 * t)[:] for t in times]))
+
+        samples = np.linspace(0.0, 5.0, 23)
+        quats = spline.evaluate(samples)
+        for quat, t in zip(quats, samples):
+            self.assertEqual(quat, quaternion_z(0.4 * t))
+
+        ang_vels = spline.angular_velocity(samples)
+        self.assertTrue(np.allclose(ang_vels, [0, 0, 0.4], atol=1e-6))
+        self.assertTrue(np.allclose(spline.angular_velocity(samples, body=True), [0, 0, 0.4], atol=1e-6))
+
+    def test_angular_velocity_outside(self):
+        times = np.arange(6, dtype=float)
+        spline = QuaternionSpline(times, QuaternionArray([quaternion_z(0.4 * t)[:] for t in times]))
+
+        with np.errstate(invalid="raise", divide="raise"):
+            ang_vels = spline.angular_velocity([-2.0, 0.0, 5.0, 7.0])
+        self.assertTrue(np.allclose(ang_vels[[0, 3]], 0.0))
+        # one-sided differences at the ends
+        self.assertTrue(np.allclose(ang_vels[[1, 2]], [0, 0, 0.4], atol=1e-6))
+
+    def test_angular_velocity_continuity(self):
+        for t in self.times[1:-1]:
+            ang_vels = self.spline.angular_velocity([t - 1e-5, t + 1e-5], step=1e-6)
+            self.assertTrue(np.allclose(ang_vels[0], ang_vels[1], atol=1e-3), ang_vels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+
+from quaternion_sim.geometry.quaternion import quaternion_x, quaternion_y, quaternion_z, quaternion_axis_theta
+from quaternion_sim.geometry.rotation_matrix import RxMatrix, RyMatrix, RzMatrix, RMatrix
+from quaternion_sim.geometry.matrix_vector_utils import tensor_product, cross_product_matrix, matrix_vector_mul
+
+
+class TestRotationMatrix(unittest.TestCase):
+    def test_axis_matrices(self):
+        for theta in [-2.0, 0.3, 1.2]:
+            self.assertIsInstance(RxMatrix(theta), np.matrix)
+            self.assertTrue(np.allclose(RxMatrix(theta), quaternion_x(theta).to_rot_matrix()))
+            self.assertTrue(np.allclose(RyMatrix(theta), quaternion_y(theta).to_rot_matrix()))
+            self.assertTrue(np.allclose(RzMatrix(theta), quaternion_z(theta).to_rot_matrix()))
+
+        thetas = np.linspace(-3, 3, 7)
+        for func in [RxMatrix, RyMatrix, RzMatrix]:
+            mats = func(thetas)
+            self.assertEqual(mats.shape, (7, 3, 3))
+            for theta, mat in zip(thetas, mats):
+                self.assertTrue(np.allclose(mat, func(theta)))
+
+    def test_rodrigues(self):
+        axis = np.array([1.0, -2.0, 0.5])
+        self.assertTrue(np.allclose(RMatrix(axis, 0.7), quaternion_axis_theta(axis, 0.7).to_rot_matrix()))
+        self.assertTrue(np.allclose(RMatrix(np.zeros(3), 0.7), np.identity(3)))
+
+        axes = np.random.RandomState(0).normal(size=(6, 3))
+        axes[2] = 0.0
+        thetas = np.linspace(-1, 2, 6)
+        mats = RMatrix(axes, thetas)
+        self.assertEqual(mats.shape, (6, 3, 3))
+        for axis, theta, mat in zip(axes, thetas, mats):
+            self.assertTrue(np.allclose(mat, RMatrix(axis, theta)))
+
+        self.assertTrue(np.allclose(RMatrix(axes[0], thetas)[4], RMatrix(axes[0], thetas[4])))
+        self.assertTrue(np.allclose(RMatrix(axes, 0.5)[1], RMatrix(axes[1], 0.5)))
+
+    def test_column_vectors(self):
+        axis = np.array([1.0, -2.0, 0.5])
+        column = axis.reshape(3, 1)
+
+        self.assertEqual(RMatrix(column, 0.5).shape, (3, 3))
+        self.assertTrue(np.allclose(RMatrix(column, 0.5), RMatrix(axis, 0.5)))
+        self.assertTrue(np.allclose(RMatrix(np.array([[0.0], [0.0], [1.0]]), 0.5), RzMatrix(0.5)))
+        self.assertEqual(tensor_product(column, column).shape, (3, 3))
+        self.assertTrue(np.allclose(tensor_product(column, column), np.outer(axis, axis)))
+        self.assertTrue(np.allclose(cross_product_matrix(column), cross_product_matrix(axis)))
+        self.assertRaises(AssertionError, RMatrix, np.ones((3, 2)), 0.5)
+
+    def test_matrix_vector_utils(self):
+        vecs = np.random.RandomState(1).normal(size=(5, 3))
+        others = np.random.RandomState(2).normal(size=(5, 3))
+
+        self.assertTrue(np.allclose(tensor_product(vecs[0], others[0]), np.outer(vecs[0], others[0])))
+        self.assertTrue(np.allclose(cross_product_matrix(vecs[0]) @ others[0], np.cross(vecs[0], others[0])))
+
+        tensors = tensor_product(vecs, others)
+        cross_mats = cross_product_matrix(vecs)
+        products = matrix_vector_mul(cross_mats, others)
+        self.assertEqual(tensors.shape, (5, 3, 3))
+        self.assertEqual(products.shape, (5, 3))
+        for i in range(5):
+            self.assertTrue(np.allclose(tensors[i], tensor_product(vecs[i], others[i])))
+            self.assertTrue(np.allclose(cross_mats[i], cross_product_matrix(vecs[i])))
+            self.assertTrue(np.allclose(products[i], np.cross(vecs[i], others[i])))
+
+        self.assertEqual(matrix_vector_mul(cross_mats[0], others[0]).shape, (3, 1))
+        self.assertTrue(np.allclose(matrix_vector_mul(cross_mats[0], others)[3], np.cross(vecs[0], others[3])))
+
+
+if __name__ == '__main__':
+    unittest.main()
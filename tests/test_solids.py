@@ -0,0 +1,94 @@
+import unittest
+
+from numpy import array, allclose, identity
+
+from quaternion_sim.frames import Frame, FrameManager, ArrayFrameManager
+from quaternion_sim.geometry.quaternion import quaternion_x, quaternion_z
+from quaternion_sim.geometry.pose import Pose
+from quaternion_sim.solids import Solid, SolidRegistry
+
+
+class TestSolidRegistry(unittest.TestCase):
+    def test_views(self):
+        registry = SolidRegistry(capacity=1)
+        solids = [Solid("solid_{0}".format(i),
+                        pose=Pose(quaternion_z(10 * i, False), array([i, 0, 0])),
+                        vel=array([0, i, 0]),
+                        mass=1.0 + i,
+                        inertia=(1.0 + i) * identity(3))
+                  for i in range(5)]
+        # the arrays grow while the solids are added
+        for i, solid in enumerate(solids):
+            self.assertEqual(registry.add_solid(solid), i)
+        self.assertEqual(len(registry), 5)
+        self.assertRaises(AssertionError, registry.add_solid, solids[0])
+
+        self.assertTrue(allclose(registry.poses.positions[:, 0], range(5)))
+        self.assertTrue(allclose(registry.velocities[:, 1], range(5)))
+        self.assertTrue(allclose(registry.masses, [1, 2, 3, 4, 5]))
+        self.assertTrue(allclose(registry.inertias[4], 5 * identity(3)))
+
+        # the solids view the arrays
+        solids[2].translate(array([0, 0, 1]))
+        solids[2].rotate(quaternion_x(90, False))
+        solids[2].vel = array([1, 1, 1])
+        solids[2].mass = 10.0
+        solids[2].set_inertia(2 * identity(3))
+        self.assertTrue(registry.poses[2].is_equal(
+            Pose(quaternion_x(90, False) * quaternion_z(20, False), array([2, 0, 1]))))
+        self.assertTrue(allclose(registry.velocities[2], [1, 1, 1]))
+        self.assertEqual(registry.masses[2], 10.0)
+        self.assertTrue(allclose(registry.inertias[2], 2 * identity(3)))
+
+        registry.velocities[3] = [0, 0, 2]
+        registry.poses.positions[3] = [0, 0, 0]
+        self.assertTrue(allclose(solids[3].vel, array([0, 0, 2]).reshape(3, 1)))
+        self.assertTrue(allclose(solids[3].get_position(), 0.0))
+
+        solids[3].set_pose(Pose(quaternion_x(30, False), array([1, 2, 3])))
+        solids[3].reset_vels()
+        self.assertTrue(registry.poses[3].is_equal(Pose(quaternion_x(30, False), array([1, 2, 3]))))
+        self.assertTrue(allclose(registry.velocities[3], 0.0))
+
+    def test_integrate(self):
+        fixed_frame = Frame("fixed", Pose(), "")
+        frame_mgr = FrameManager(fixed_frame)
+        registry = SolidRegistry()
+        solids = []
+        for i in range(4):
+            solid = Solid("solid_{0}".format(i), pose=Pose(position=array([i, 0, 0])),
+                          vel=array([0, 1.0, 0]), ang_vel=array([0, 0, 0.5 * i]), ref_frame="fixed")
+            frame_mgr.add_frame(solid.frame)
+            registry.add_solid(solid)
+            solids.append(solid)
+        frame_mgr.get_all_frame_poses()
+
+        references = [solid.copy() for solid in solids]
+        registry.integrate(0.1)
+        for solid, reference in zip(solids, references):
+            reference.translate(0.1 * reference.vel)
+            reference.integrate_ang_vel(0.1)
+            self.assertTrue(solid.get_pose().is_equal(reference.get_pose()))
+            # the frame manager sees the new poses
+            self.assertTrue(frame_mgr.get_world_pose(solid.frame.name).is_equal(reference.get_pose()))
+
+    def test_array_frame_manager(self):
+        # the pose of a frame can only view the arrays of one container, whatever the order of registration
+        frame_mgr = ArrayFrameManager(Frame("fixed", Pose(), ""))
+        registry = SolidRegistry()
+        solid = Solid("solid_0", pose=Pose(position=array([1, 0, 0])), ref_frame="fixed")
+        frame_mgr.add_frame(solid.frame)
+        self.assertRaises(AssertionError, registry.add_solid, solid)
+        self.assertEqual(len(registry), 0)
+
+        solid = Solid("solid_1", pose=Pose(position=array([2, 0, 0])), ref_frame="fixed")
+        registry.add_solid(solid)
+        self.assertRaises(AssertionError, frame_mgr.add_frame, solid.frame)
+        self.assertNotIn("solid_1", frame_mgr.frames)
+        # the solid still views its row of the registry
+        solid.translate(array([0, 1, 0]))
+        self.assertTrue(allclose(registry.poses.positions[0], [2, 1, 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()